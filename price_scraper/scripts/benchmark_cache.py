@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark Firecrawl cache storage formats on a synthetic catalog.
+
+Pages are generated from real cached pages (the legacy JSON entries in
+data/firecrawl_cache by default): the site chrome at the top and bottom of
+each page is kept and the product section in between is made unique per
+page (words shuffled, numbers added), which is how a full-catalog crawl of
+one site looks to the cache.
+
+For each format the benchmark reports on-disk size, the ratio against the
+legacy one-JSON-file-per-URL format, and set/get latency. Reads start from a
+fresh backend, so the first reads of dictionaries hit disk.
+
+Usage:
+    uv run python scripts/benchmark_cache.py
+    uv run python scripts/benchmark_cache.py --pages 2000 --templates data/firecrawl_cache
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.cache_backends import JsonFileBackend, SQLiteBackend
+from src.utils.cache_codec import available_compressors
+from src.utils.firecrawl_cache import FirecrawlCache
+
+
+def load_templates(templates_dir: str) -> List[Dict[str, Any]]:
+    """Cached Firecrawl results to build synthetic pages from."""
+    templates = [record.firecrawl_result for record in JsonFileBackend(templates_dir).iter_records()]
+    if not templates:
+        raise SystemExit(f"No cached pages found in {templates_dir}")
+    return templates
+
+
+def vary_text(text: str, page: int) -> str:
+    """Keep the chrome at both ends of a page and make the product section in between unique."""
+    rng = random.Random(page)
+    lines = text.split('\n')
+    head, tail = len(lines) * 15 // 100, len(lines) * 45 // 100
+    body = []
+    for line in lines[head:len(lines) - tail]:
+        words = line.split(' ')
+        rng.shuffle(words)
+        body.append(' '.join(words + [str(rng.randint(1, 10 ** 6))]) if line.strip() else line)
+    return '\n'.join(lines[:head] + body + lines[len(lines) - tail:])
+
+
+def make_pages(templates: List[Dict[str, Any]], count: int) -> Dict[str, Dict[str, Any]]:
+    """Synthetic catalog of `count` pages keyed by URL."""
+    pages = {}
+    for page in range(count):
+        template = templates[page % len(templates)]
+        data = dict(template.get('data') or {})
+        for field_name in ('markdown', 'html'):
+            if isinstance(data.get(field_name), str):
+                data[field_name] = vary_text(data[field_name], page)
+        metadata = dict(data.get('metadata') or {})
+        metadata['title'] = f"{metadata.get('title', 'Product')} #{page}"
+        data['metadata'] = metadata
+        url = f"https://example.com/product/item-{page}"
+        pages[url] = {**template, 'data': data}
+    return pages
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_format(label: str, make_backend, pages: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Write and read back every page with one storage format."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        cache = FirecrawlCache(str(cache_dir), ttl_hours=24, backend=make_backend(cache_dir))
+
+        set_times = []
+        for url, result in pages.items():
+            started = time.perf_counter()
+            cache.set(url, result)
+            set_times.append(time.perf_counter() - started)
+        cache.close()
+        size = directory_size(cache_dir)
+
+        # Read back with a fresh backend so nothing is served from memory at first
+        cache = FirecrawlCache(str(cache_dir), ttl_hours=24, backend=make_backend(cache_dir))
+        urls = list(pages)
+        random.Random(42).shuffle(urls)
+        get_times = []
+        for url in urls:
+            started = time.perf_counter()
+            result = cache.get(url)
+            get_times.append(time.perf_counter() - started)
+            assert result == pages[url], f"{label}: round trip changed {url}"
+        cache.close()
+
+    return {
+        'label': label,
+        'size': size,
+        'set_mean': statistics.mean(set_times),
+        'set_p95': percentile(set_times, 0.95),
+        'get_mean': statistics.mean(get_times),
+        'get_p95': percentile(get_times, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Firecrawl cache storage formats")
+    parser.add_argument('--pages', type=int, default=1000, help="Synthetic pages to cache (default: 1000)")
+    parser.add_argument('--templates', default="data/firecrawl_cache",
+                        help="Directory of legacy JSON cache entries to build pages from")
+    args = parser.parse_args()
+
+    # Keep per-entry cache logging out of the timings
+    import logging
+    logging.getLogger('src.utils.firecrawl_cache').setLevel(logging.WARNING)
+
+    pages = make_pages(load_templates(args.templates), args.pages)
+
+    formats = [
+        ("legacy json (indent=2)", lambda d: JsonFileBackend(str(d))),
+        ("sqlite, uncompressed", lambda d: SQLiteBackend(str(d / "cache.sqlite3"), compression="none")),
+    ]
+    for compression in available_compressors():
+        if compression == "none":
+            continue
+        formats.append((f"sqlite, {compression}", lambda d, c=compression: SQLiteBackend(
+            str(d / "cache.sqlite3"), compression=c, dictionary=False)))
+        formats.append((f"sqlite, {compression} + dict", lambda d, c=compression: SQLiteBackend(
+            str(d / "cache.sqlite3"), compression=c, dictionary=True)))
+
+    print(f"📦 Caching {args.pages} synthetic pages built from {args.templates}\n")
+    print(f"{'Format':<32} {'Size':>10} {'Ratio':>7} {'set mean':>10} {'set p95':>10} {'get mean':>10} {'get p95':>10}")
+
+    baseline = None
+    for label, make_backend in formats:
+        r = run_format(label, make_backend, pages)
+        baseline = baseline or r['size']
+        print(f"{r['label']:<32} {r['size'] / 1024 / 1024:>8.1f}MB {baseline / r['size']:>6.1f}x "
+              f"{r['set_mean'] * 1000:>8.2f}ms {r['set_p95'] * 1000:>8.2f}ms "
+              f"{r['get_mean'] * 1000:>8.2f}ms {r['get_p95'] * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark BaseCrawler concurrency against a latency-injected Firecrawl stub.
+
+No Firecrawl credits are used: every scrape sleeps for a fixed latency and
+returns a canned page, so the measured speedup shows how well concurrent
+scrapes overlap in wall-clock time.
+
+The stub also implements the batch scrape endpoints, so `--bulk` compares
+crawl_multiple with a single crawl_bulk batch job.
+
+Usage:
+    uv run python scripts/benchmark_crawler.py
+    uv run python scripts/benchmark_crawler.py --urls 20 --latency 0.5 --concurrency 1 2 5
+    uv run python scripts/benchmark_crawler.py --bulk
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.models.product import Product
+from src.utils.firecrawl_formats import FormatProfile
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class StubFirecrawlApp:
+    """Stand-in for FirecrawlApp that blocks for a fixed latency per scrape."""
+
+    def __init__(self, latency: float, batch_workers: int = 10):
+        self.latency = latency
+        self.batch_workers = batch_workers
+        self.calls = 0
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    def _document(self, url: str) -> SimpleNamespace:
+        """Build a canned page for a URL."""
+        return SimpleNamespace(
+            success=True,
+            markdown=f"# Stub page for {url}",
+            html="<html></html>",
+            metadata={'title': f"Stub Product {url.rsplit('-', 1)[-1]}", 'sourceURL': url},
+            links=[],
+        )
+
+    def scrape_url(self, url: str, **kwargs: Any) -> SimpleNamespace:
+        """Simulate a blocking Firecrawl scrape."""
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._document(url)
+
+    def async_batch_scrape_urls(self, urls: List[str], **kwargs: Any) -> SimpleNamespace:
+        """Simulate submitting a batch scrape job."""
+        self.calls += 1
+        job_id = f"job-{len(self._jobs)}"
+        self._jobs[job_id] = {'urls': list(urls), 'started': time.monotonic()}
+        return SimpleNamespace(success=True, id=job_id, invalidURLs=[])
+
+    def check_batch_scrape_status(self, job_id: str) -> SimpleNamespace:
+        """Simulate a status check; pages complete `batch_workers` at a time."""
+        self.calls += 1
+        job = self._jobs[job_id]
+        elapsed = time.monotonic() - job['started']
+        done = min(len(job['urls']), int(elapsed / self.latency) * self.batch_workers)
+        return SimpleNamespace(
+            success=True,
+            status='completed' if done == len(job['urls']) else 'scraping',
+            completed=done,
+            total=len(job['urls']),
+            data=[self._document(url) for url in job['urls'][:done]],
+        )
+
+    def check_batch_scrape_errors(self, job_id: str) -> SimpleNamespace:
+        """Simulate the batch errors endpoint (the stub never fails)."""
+        return SimpleNamespace(errors=[], robotsBlocked=[])
+
+
+class BenchmarkCrawler(BaseCrawler):
+    """Crawler wired to the stub Firecrawl app."""
+
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        site_config = {
+            'base_url': 'https://bench.invalid',
+            'currency': 'GBP',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__('benchmark', site_config, use_cache=False)
+
+    def _initialize_firecrawl(self):
+        """Use the stub instead of the real Firecrawl client."""
+        self.firecrawl_app = StubFirecrawlApp(self.latency)
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        metadata = firecrawl_data.get('data', {}).get('metadata', {})
+        return Product(
+            name=metadata.get('title', ''),
+            url=url,
+            site_name=self.site_name,
+            currency=self.currency
+        )
+
+
+async def run_once(urls: List[str], latency: float, concurrency: int, bulk: bool = False) -> float:
+    """Crawl all URLs once and return the elapsed wall-clock time."""
+    crawler = BenchmarkCrawler(latency)
+    start = time.perf_counter()
+    if bulk:
+        results = await crawler.crawl_bulk(urls, poll_interval=latency / 2)
+    else:
+        results = await crawler.crawl_multiple(urls, max_concurrent=concurrency)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for r in results if not r.success)
+    if failed:
+        logger.warning(f"{failed} stub crawls failed")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawler concurrency against a Firecrawl stub")
+    parser.add_argument("--urls", type=int, default=20, help="Number of URLs to crawl (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Injected latency per scrape in seconds (default: 0.5)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 2, 5],
+        help="Concurrency levels to compare (default: 1 2 5)"
+    )
+    parser.add_argument("--bulk", action="store_true", help="Also time crawl_bulk with one batch job")
+    args = parser.parse_args()
+
+    urls = [f"https://bench.invalid/product/item_pid-PP-{i}" for i in range(args.urls)]
+
+    print("="*60)
+    print(f"CRAWLER BENCHMARK: {args.urls} URLs, {args.latency}s latency per scrape")
+    print("="*60)
+
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed = await run_once(urls, args.latency, concurrency)
+        if baseline is None:
+            baseline = elapsed
+        speedup = baseline / elapsed if elapsed else 0.0
+        print(f"  concurrency={concurrency:<3} elapsed={elapsed:6.2f}s  speedup={speedup:5.2f}x  "
+              f"ideal={args.urls * args.latency / concurrency:6.2f}s")
+
+    if args.bulk:
+        elapsed = await run_once(urls, args.latency, 0, bulk=True)
+        print(f"  bulk job        elapsed={elapsed:6.2f}s  speedup={baseline / elapsed:5.2f}x")
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
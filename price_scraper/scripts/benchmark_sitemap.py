@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark sitemap parsing and categorization on a synthetic sitemap.
+
+A sitemap of `--entries` product URLs is generated with breadcrumbs in the
+shape of the 24MX/XLMoto ones (English and local breadcrumb, malformed
+`&gtgt;` separators), most of them outside the configured categories, so
+every keyword has to be tried for most entries.
+
+The benchmark reports the streaming parse rate, then categorizes every
+entry three ways: with the keyword loop categorize_entry used to run
+(substring checks per keyword), with the compiled CategoryMatcher without
+memoization (the cost per distinct breadcrumb), and through the parser,
+which memoizes results by breadcrumb. Entries are processed in batches
+straight from the stream, so memory stays bounded at any sitemap size.
+Entries the keyword loop and the matcher disagree on are counted; they are
+word-boundary differences such as "oil" inside "foil".
+
+With --workers, the sitemap is also split into `--shards` files under a
+sitemap index and categorized through iter_categorized_entries with each
+given number of worker processes, to check whether parallel parsing pays
+off on the machine before passing --workers to parse_sitemaps.py.
+
+Usage:
+    uv run python scripts/benchmark_sitemap.py
+    uv run python scripts/benchmark_sitemap.py --entries 200000 --keep data/xml/synthetic_sitemap.xml
+    uv run python scripts/benchmark_sitemap.py --entries 400000 --workers 1 2 4
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processors.category_matcher import CategoryMatcher
+from src.processors.sitemap_parser import SitemapEntry, SitemapParser
+
+SECTIONS = [
+    ("Motocross Gear", "Equipement Cross"), ("Street Gear", "Equipement Route"),
+    ("Motocross Parts", "Pieces Cross"), ("Street Parts", "Pieces Route"),
+    ("Accessories", "Accessoires"), ("Leisure", "Loisirs"),
+]
+PRODUCTS = [
+    ("Helmets", "Casques"), ("Tyres", "Pneus"), ("Engine oil", "Huile moteur"), ("Brake pads", "Plaquettes de frein"),
+    ("Drive chains", "Chaines"), ("Air filters", "Filtres a air"), ("Gloves", "Gants"), ("Boots", "Bottes"),
+    ("Jackets", "Vestes"), ("Goggles", "Lunettes"), ("Foil stickers", "Autocollants"), ("Graphics kits", "Kits deco"),
+    ("Hoodies", "Sweats"), ("Protection", "Protections"), ("Handlebars", "Guidons"), ("Sprockets", "Pignons"),
+    ("Luggage", "Bagagerie"), ("Tools", "Outillage"), ("Base layers", "Sous-vetements"), ("Caps", "Casquettes"),
+]
+
+
+def generate_sitemap(path: Path, entries: int, seed: int = 0, first: int = 0) -> None:
+    """Write a synthetic sitemap with `entries` product URLs, numbered from `first`."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for i in range(first, first + entries):
+            section_eng, section_local = rng.choice(SECTIONS)
+            product_eng, product_local = rng.choice(PRODUCTS)
+            f.write(
+                f"<url><loc>https://www.24mx.com/{product_eng.lower().replace(' ', '-')}-{i}_pid-PP-{i}</loc>"
+                f"<lastmod>2025-{1 + i % 12:02d}-{1 + i % 28:02d}</lastmod>"
+                f"<breadCrumb_eng>Home &gtgt; {section_eng} &gtgt; {product_eng}</breadCrumb_eng>"
+                f"<breadCrumb_local>Accueil &gtgt; {section_local} &gtgt; {product_local}</breadCrumb_local></url>\n"
+            )
+        f.write('</urlset>\n')
+
+
+def generate_sharded_sitemap(directory: Path, entries: int, shards: int) -> Path:
+    """Write a sitemap index over `shards` synthetic sitemaps holding `entries` product URLs between them."""
+    directory.mkdir(parents=True, exist_ok=True)
+    per_shard = -(-entries // shards)
+    locations = []
+    for shard in range(shards):
+        first = shard * per_shard
+        generate_sitemap(directory / f"shard-{shard}.xml", max(0, min(per_shard, entries - first)), shard, first)
+        locations.append(f"shard-{shard}.xml")
+    index = directory / "sitemap_index.xml"
+    index.write_text('<?xml version="1.0" encoding="UTF-8"?>\n'
+                     '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                     + ''.join(f"<sitemap><loc>{location}</loc></sitemap>\n" for location in locations)
+                     + '</sitemapindex>\n', encoding='utf-8')
+    return index
+
+
+def legacy_categorize(categories: Dict[str, Dict[str, Any]], entry: SitemapEntry) -> Optional[str]:
+    """The keyword loop categorize_entry used before CategoryMatcher."""
+    breadcrumb_text = f"{entry.breadcrumb_eng} {entry.breadcrumb_local}".lower()
+    for category_name, category_config in categories.items():
+        for keyword in category_config.get('keywords', []):
+            if keyword.lower() in breadcrumb_text:
+                return category_name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sitemap parsing and categorization")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Product URLs in the synthetic sitemap")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Entries categorized per timed batch")
+    parser.add_argument("--keep", help="Write the synthetic sitemap here and keep it (default: temporary file)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[],
+                        help="Also time categorizing a sharded copy with each of these worker counts")
+    parser.add_argument("--shards", type=int, default=16, help="Sitemap files of the sharded copy")
+    args = parser.parse_args()
+
+    sitemap_parser = SitemapParser()
+    categories = sitemap_parser.categories
+    unmemoized = CategoryMatcher(categories, cache_size=0)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(args.keep) if args.keep else Path(temp_dir) / "synthetic_sitemap.xml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        print(f"📄 Generating a {args.entries:,}-entry sitemap at {path}")
+        started = time.perf_counter()
+        generate_sitemap(path, args.entries)
+        print(f"   {path.stat().st_size / 1024 / 1024:.0f} MB in {time.perf_counter() - started:.1f}s")
+
+        print("\n⏱️  Streaming parse")
+        started = time.perf_counter()
+        parsed = sum(1 for _ in sitemap_parser.iter_entries(str(path)))
+        parse_seconds = time.perf_counter() - started
+        print(f"   {parsed:,} entries in {parse_seconds:.1f}s ({parsed / parse_seconds:,.0f} entries/s)")
+
+        print("\n⏱️  Categorization")
+        compiled_seconds = unmemoized_seconds = legacy_seconds = 0.0
+        breadcrumbs = set()
+        compiled_counts: Counter = Counter()
+        legacy_counts: Counter = Counter()
+        disagreements: Counter = Counter()
+        stream = sitemap_parser.iter_entries(str(path))
+        while True:
+            batch: List[SitemapEntry] = list(itertools.islice(stream, args.batch_size))
+            if not batch:
+                break
+
+            started = time.perf_counter()
+            compiled = [sitemap_parser.categorize_entry(entry) for entry in batch]
+            compiled_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            for entry in batch:
+                unmemoized.match(f"{entry.breadcrumb_eng}\n{entry.breadcrumb_local}")
+            unmemoized_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            legacy = [legacy_categorize(categories, entry) for entry in batch]
+            legacy_seconds += time.perf_counter() - started
+
+            breadcrumbs.update((entry.breadcrumb_eng, entry.breadcrumb_local) for entry in batch)
+            compiled_counts.update(compiled)
+            legacy_counts.update(legacy)
+            for entry, new, old in zip(batch, compiled, legacy, strict=True):
+                if new != old:
+                    disagreements[(entry.breadcrumb_eng.rsplit('>', 1)[-1].strip(), old, new)] += 1
+
+    print(f"   Distinct breadcrumbs: {len(breadcrumbs):,}")
+    print(f"   Keyword loop:                  {legacy_seconds:6.2f}s ({parsed / legacy_seconds:,.0f} entries/s)")
+    print(f"   Compiled matcher:              {unmemoized_seconds:6.2f}s ({parsed / unmemoized_seconds:,.0f} entries/s, "
+          f"{legacy_seconds / unmemoized_seconds:.1f}x)")
+    print(f"   Compiled matcher, memoized:    {compiled_seconds:6.2f}s ({parsed / compiled_seconds:,.0f} entries/s, "
+          f"{legacy_seconds / compiled_seconds:.1f}x)")
+
+    print("\n📊 Entries per category (keyword loop / compiled matcher)")
+    for category in list(categories) + [None]:
+        print(f"   {category or 'uncategorized':<14} {legacy_counts[category]:>9,} / {compiled_counts[category]:,}")
+
+    if disagreements:
+        print("\n🔍 Entries categorized differently (word boundaries)")
+        for (breadcrumb, old, new), count in disagreements.most_common(10):
+            print(f"   {breadcrumb!r}: {old} -> {new} ({count:,} entries)")
+
+    if args.workers:
+        print(f"\n⏱️  Categorizing {args.shards} shards (os.cpu_count() = {os.cpu_count()})")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = generate_sharded_sitemap(Path(temp_dir), args.entries, args.shards)
+            for workers in args.workers:
+                started = time.perf_counter()
+                matched = sum(1 for _ in sitemap_parser.iter_categorized_entries(str(index), workers))
+                seconds = time.perf_counter() - started
+                print(f"   {workers:>2} worker(s): {seconds:6.2f}s ({args.entries / seconds:,.0f} entries/s, "
+                      f"{matched:,} categorized)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Export the Firecrawl cache to a portable bundle, or import one.
+
+Bundles are single .tar.zst (needs zstandard) or .tar.gz files that can warm
+the cache of another machine, e.g. a new worker or a CI box that then runs
+offline with FIRECRAWL_REPLAY=1.
+
+Usage:
+    uv run python scripts/cache_bundle.py export data/cache_bundle.tar.gz
+    uv run python scripts/cache_bundle.py export bundle.tar.zst --sites 24mx xlmoto --max-age-hours 24
+    uv run python scripts/cache_bundle.py import bundle.tar.zst
+"""
+
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.cache_bundle import BundleError
+from src.utils.config import config
+from src.utils.firecrawl_cache import FirecrawlCache
+
+
+def site_urls(site_names):
+    """Base URLs of sites named in sites.yaml."""
+    if not site_names:
+        return None
+    urls = []
+    for site_name in site_names:
+        site_config = config.get_site_config(site_name)
+        if site_config is None or not site_config.get('base_url'):
+            raise SystemExit(f"❌ Unknown site '{site_name}', expected one of {config.get_site_names()}")
+        urls.append(site_config['base_url'])
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import Firecrawl cache bundles")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('bundle', help="Bundle file (.tar.zst or .tar.gz)")
+    parser.add_argument('--sites', nargs='+', help="Only include these sites (names from sites.yaml)")
+    parser.add_argument('--max-age-hours', type=float, help="Only include entries cached within this many hours")
+    args = parser.parse_args()
+
+    cache = FirecrawlCache.from_config()
+    sites = site_urls(args.sites)
+    max_age = timedelta(hours=args.max_age_hours) if args.max_age_hours is not None else None
+
+    try:
+        if args.action == 'export':
+            count = cache.export_bundle(args.bundle, sites=sites, max_age=max_age)
+            size_mb = Path(args.bundle).stat().st_size / 1024 / 1024
+            print(f"📦 Exported {count} cache entries to {args.bundle} ({size_mb:.1f} MB)")
+        else:
+            imported, skipped = cache.import_bundle(args.bundle, sites=sites, max_age=max_age)
+            print(f"📥 Imported {imported} cache entries from {args.bundle} ({skipped} skipped)")
+    except BundleError as e:
+        raise SystemExit(f"❌ {e}") from e
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
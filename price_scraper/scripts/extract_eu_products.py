@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 """
-Extract product names from all EU URLs and generate search terms CSV.
+Extract product names from all product URLs and generate search terms CSV.
 
 Usage:
     uv run python scripts/extract_eu_products.py
+    uv run python scripts/extract_eu_products.py --resume
+    uv run python scripts/extract_eu_products.py --delta data/sitemap_deltas/24mx_20250101_060000.csv
 """
 
 import sys
+import argparse
 import asyncio
 import csv
 import re
@@ -17,10 +20,14 @@ from typing import Dict, Any, List
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.base_crawler import BaseCrawler, CrawlResult
+from src.crawlers.scheduler import (
+    CrawlScheduler, ScheduledResult, load_jobs_from_csv, load_jobs_from_diff, update_product_statuses
+)
 from src.models.product import Product, Currency
+from src.storage.crawl_journal import CrawlJournal
+from src.utils.firecrawl_formats import FormatProfile
 from src.utils.logger import get_logger
-from src.utils.config import config
 
 logger = get_logger(__name__)
 
@@ -28,11 +35,12 @@ logger = get_logger(__name__)
 class ProductExtractor(BaseCrawler):
     """Product extractor that focuses on getting clean product names."""
     
+    format_profile = FormatProfile.METADATA
+    
     async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
         """Extract product data focusing on clean names for search."""
         
         # Get the scraped content
-        markdown = firecrawl_data.get('data', {}).get('markdown', '')
         metadata = firecrawl_data.get('data', {}).get('metadata', {})
         
         # Extract title from multiple sources
@@ -88,25 +96,6 @@ class ProductExtractor(BaseCrawler):
         return self._sanitize_text(title)
 
 
-def load_product_urls() -> List[Dict[str, str]]:
-    """Load product URLs from our products.csv."""
-    products_file = Path("config/products.csv")
-    
-    if not products_file.exists():
-        logger.error(f"Products file not found: {products_file}")
-        return []
-    
-    products = []
-    with open(products_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get('site') in ['24mx', 'xlmoto'] and row.get('product_url'):
-                products.append(row)
-    
-    logger.info(f"Loaded {len(products)} EU product URLs")
-    return products
-
-
 def generate_search_terms(product_name: str) -> List[str]:
     """Generate multiple search term variations for a product."""
     if not product_name:
@@ -140,97 +129,114 @@ def generate_search_terms(product_name: str) -> List[str]:
     return unique_terms
 
 
+def build_output_row(product_row: Dict[str, str], result: CrawlResult) -> Dict[str, str]:
+    """Build the output CSV row for one crawled product."""
+    row = {
+        'original_url': product_row['product_url'],
+        'site': product_row['site'],
+        'category': product_row.get('category', ''),
+        'original_breadcrumb': product_row.get('breadcrumb', ''),
+        'extracted_name': '',
+        'search_term_1': '',
+        'search_term_2': '',
+        'search_term_3': '',
+        'extraction_status': f'failed: {result.error_message}'
+    }
+    
+    if result.success and result.product:
+        search_terms = generate_search_terms(result.product.name)
+        row.update({
+            'extracted_name': result.product.name,
+            'search_term_1': search_terms[0] if len(search_terms) > 0 else '',
+            'search_term_2': search_terms[1] if len(search_terms) > 1 else '',
+            'search_term_3': search_terms[2] if len(search_terms) > 2 else '',
+            'extraction_status': 'success'
+        })
+    
+    return row
+
+
 async def main():
-    """Extract product names from all EU URLs."""
-    print("🚀 Extracting Product Names from EU Sites")
+    """Extract product names from every URL in products.csv."""
+    parser = argparse.ArgumentParser(description="Extract product names and search terms")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs the crawl journal already records as done"
+    )
+    parser.add_argument(
+        "--journal",
+        default="data/crawl_journal.jsonl",
+        help="Crawl journal path (default: data/crawl_journal.jsonl)"
+    )
+    parser.add_argument(
+        "--delta",
+        help="Only crawl the added and modified products of a sitemap delta (see parse_sitemaps.py --incremental)"
+    )
+    args = parser.parse_args()
+    
+    print("🚀 Extracting Product Names from All Sites")
     
-    # Load products
-    products = load_product_urls()
-    if not products:
+    # Load the whole products.csv workload (every configured site), or just a sitemap delta
+    jobs = load_jobs_from_diff(args.delta) if args.delta else load_jobs_from_csv()
+    if not jobs:
         print("❌ No products found to process")
         return
     
-    print(f"📋 Processing {len(products)} products")
+    # Every outcome is journaled as it happens, so an interrupted run can resume
+    journal = CrawlJournal(args.journal)
+    if args.resume:
+        done_urls = journal.completed_urls()
+        remaining = [job for job in jobs if job.url not in done_urls]
+        print(f"♻️  Resuming: {len(jobs) - len(remaining)} already done, {len(remaining)} remaining")
+    else:
+        journal.reset()
+        remaining = jobs
+    
+    print(f"📋 Processing {len(remaining)} products")
     
     # Create output directory
     output_dir = Path("data")
     output_dir.mkdir(exist_ok=True)
     
-    # Results storage
-    extracted_products = []
+    # All sites run concurrently, each with its own worker pool and rate budget
+    scheduler = CrawlScheduler(ProductExtractor)
+    scheduler.add_jobs(remaining)
     
-    # Process each site separately to respect rate limits
-    for site in ['xlmoto', '24mx']:
-        site_products = [p for p in products if p['site'] == site]
-        if not site_products:
-            continue
-            
-        print(f"\n📡 Processing {len(site_products)} products from {site.upper()}")
-        
-        # Setup crawler for this site
-        site_config = config.sites['sites']['eu'][site]
-        extractor = ProductExtractor(site, site_config)
+    def record(scheduled: ScheduledResult) -> None:
+        result = scheduled.result
+        journal.record(
+            site=scheduled.job.site,
+            url=scheduled.job.url,
+            status=CrawlJournal.SUCCESS if result.success and result.product else CrawlJournal.FAILED,
+            error=result.error_message,
+            data=build_output_row(scheduled.job.row, result)
+        )
         
-        # Process in smaller batches to be respectful
-        batch_size = 5
-        for i in range(0, len(site_products), batch_size):
-            batch = site_products[i:i+batch_size]
-            urls = [p['product_url'] for p in batch]
-            
-            print(f"  Processing batch {i//batch_size + 1}/{(len(site_products)-1)//batch_size + 1} ({len(batch)} URLs)")
-            
-            try:
-                results = await extractor.crawl_multiple(urls, max_concurrent=2)
-                
-                for j, result in enumerate(results):
-                    original_product = batch[j]
-                    
-                    if result.success and result.product:
-                        search_terms = generate_search_terms(result.product.name)
-                        
-                        extracted_products.append({
-                            'original_url': original_product['product_url'],
-                            'site': original_product['site'],
-                            'category': original_product.get('category', ''),
-                            'original_breadcrumb': original_product.get('breadcrumb', ''),
-                            'extracted_name': result.product.name,
-                            'search_term_1': search_terms[0] if len(search_terms) > 0 else '',
-                            'search_term_2': search_terms[1] if len(search_terms) > 1 else '',
-                            'search_term_3': search_terms[2] if len(search_terms) > 2 else '',
-                            'extraction_status': 'success'
-                        })
-                        
-                        print(f"    ✅ {result.product.name[:60]}...")
-                    else:
-                        extracted_products.append({
-                            'original_url': original_product['product_url'],
-                            'site': original_product['site'],
-                            'category': original_product.get('category', ''),
-                            'original_breadcrumb': original_product.get('breadcrumb', ''),
-                            'extracted_name': '',
-                            'search_term_1': '',
-                            'search_term_2': '',
-                            'search_term_3': '',
-                            'extraction_status': f'failed: {result.error_message}'
-                        })
-                        
-                        print(f"    ❌ Failed: {original_product['product_url']}")
-                
-            except Exception as e:
-                logger.error(f"Batch processing failed: {e}")
-                # Add failed entries for this batch
-                for product in batch:
-                    extracted_products.append({
-                        'original_url': product['product_url'],
-                        'site': product['site'],
-                        'category': product.get('category', ''),
-                        'original_breadcrumb': product.get('breadcrumb', ''),
-                        'extracted_name': '',
-                        'search_term_1': '',
-                        'search_term_2': '',
-                        'search_term_3': '',
-                        'extraction_status': f'batch_failed: {str(e)}'
-                    })
+        if result.success and result.product:
+            print(f"    ✅ [{scheduled.job.site}] {result.product.name[:60]}...")
+        else:
+            print(f"    ❌ [{scheduled.job.site}] Failed: {scheduled.job.url}")
+    
+    try:
+        await scheduler.run(on_result=record)
+    finally:
+        journal.close()
+    
+    # Build the output from the journal so resumed runs include earlier results
+    journal_records = journal.load()
+    extracted_products = [
+        journal_records[job.url]['data']
+        for job in jobs
+        if job.url in journal_records
+    ]
+    
+    # Only this run's products: journal entries of products removed since must not revive them
+    update_product_statuses({
+        job.url: 'done' if journal_records[job.url]['status'] == CrawlJournal.SUCCESS else 'failed'
+        for job in jobs
+        if job.url in journal_records
+    })
     
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -23,6 +23,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.crawlers.base_crawler import BaseCrawler
 from src.models.product import Product, Currency
 from src.services.ai_search_generator import AISearchGenerator
+from src.utils.firecrawl_formats import FormatProfile
 from src.utils.logger import get_logger
 from src.utils.config import config
 
@@ -32,6 +33,8 @@ logger = get_logger(__name__)
 class AIEnhancedProductExtractor(BaseCrawler):
     """Product extractor enhanced with AI-powered search term generation."""
     
+    format_profile = FormatProfile.MARKDOWN
+    
     def __init__(self, site_name: str, site_config: Dict[str, Any]):
         """Initialize with AI search generator."""
         super().__init__(site_name, site_config)
@@ -19,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.crawlers.base_crawler import BaseCrawler
 from src.models.product import Product, Currency
+from src.utils.firecrawl_formats import FormatProfile
 from src.utils.logger import get_logger
 from src.utils.config import config
 
@@ -28,11 +29,12 @@ logger = get_logger(__name__)
 class ProductExtractor(BaseCrawler):
     """Product extractor that focuses on getting clean product names."""
     
+    format_profile = FormatProfile.METADATA
+    
     async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
         """Extract product data focusing on clean names for search."""
         
         # Get the scraped content
-        markdown = firecrawl_data.get('data', {}).get('markdown', '')
         metadata = firecrawl_data.get('data', {}).get('metadata', {})
         
         # Extract title from multiple sources
@@ -177,7 +179,7 @@ async def main():
         urls = [p['product_url'] for p in site_products]
         
         try:
-            results = await extractor.crawl_multiple(urls, max_concurrent=2)
+            results = await extractor.crawl_multiple(urls)
             
             for j, result in enumerate(results):
                 original_product = site_products[j]
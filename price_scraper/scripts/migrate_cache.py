@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Migrate Firecrawl cache entries between storage backends.
+
+By default copies the legacy one-JSON-file-per-URL cache in
+data/firecrawl_cache/*.json into the SQLite database configured in
+settings.yaml. Cache keys, timestamps and stored fields are preserved, so
+entries keep their remaining TTL.
+
+Usage:
+    uv run python scripts/migrate_cache.py
+    uv run python scripts/migrate_cache.py --skip-expired --delete-source
+    uv run python scripts/migrate_cache.py --source sqlite --target json
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.cache_backends import BACKENDS, create_backend, migrate_records
+from src.utils.config import config
+from src.utils.firecrawl_cache import FirecrawlCache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    cache_config = config.settings.get('firecrawl_cache', {}) or {}
+
+    parser = argparse.ArgumentParser(description="Migrate Firecrawl cache entries between backends")
+    parser.add_argument('--cache-dir', default=cache_config.get('directory', "data/firecrawl_cache"),
+                        help="Cache directory (default: from settings.yaml)")
+    parser.add_argument('--source', choices=sorted(BACKENDS), default='json',
+                        help="Backend to read entries from (default: json)")
+    parser.add_argument('--target', choices=sorted(BACKENDS), default='sqlite',
+                        help="Backend to write entries to (default: sqlite)")
+    parser.add_argument('--skip-expired', action='store_true',
+                        help="Do not copy entries older than the configured TTL")
+    parser.add_argument('--delete-source', action='store_true',
+                        help="Remove the source entries after a successful copy")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        parser.error("--source and --target must differ")
+
+    source = create_backend(args.source, args.cache_dir)
+    target_options = FirecrawlCache.backend_options({**cache_config, 'backend': args.target})
+    target = create_backend(args.target, args.cache_dir, **target_options)
+
+    skip_before = None
+    if args.skip_expired:
+        skip_before = datetime.now() - timedelta(hours=cache_config.get('ttl_hours', 24))
+
+    print(f"📦 Migrating cache entries in {args.cache_dir}: {args.source} → {args.target}")
+    before = source.stats()
+    copied = migrate_records(source, target, skip_before=skip_before)
+    after = target.stats()
+
+    print(f"   Source entries: {before['total_entries']} ({before['total_size_bytes'] / 1024:.1f} KB)")
+    print(f"   Copied:         {copied}")
+    print(f"   Target entries: {after['total_entries']} ({after['total_size_bytes'] / 1024:.1f} KB)")
+
+    if args.delete_source:
+        removed = source.clear()
+        print(f"🗑️  Removed {removed} source entries")
+
+    source.close()
+    target.close()
+    logger.info(f"Migrated {copied} cache entries from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,72 @@
 """
 Script to parse XML sitemaps and extract categorized product URLs.
 
+Sitemaps are read from the `sites` block of config/categories.yaml. Each
+one can be a plain or gzipped sitemap or a sitemap index; with --workers the
+shards of an index are parsed in parallel.
+
+With --incremental the sitemaps are diffed against the state saved by the
+previous run instead: the added, modified and removed products are written to
+a delta CSV in data/sitemap_deltas/ (crawl it with extract_eu_products.py
+--delta) and removed products are marked 'removed' in products.csv.
+
 Usage:
     uv run python scripts/parse_sitemaps.py
     uv run python scripts/parse_sitemaps.py --site 24mx
     uv run python scripts/parse_sitemaps.py --site xlmoto
+    uv run python scripts/parse_sitemaps.py --site 24mx --sitemap data/xml/24mx/sitemap_index.xml --workers 8
+    uv run python scripts/parse_sitemaps.py --incremental
 """
 
 import argparse
+import csv
 import sys
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List
+
+import yaml
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.crawlers.scheduler import update_product_statuses
 from src.processors.sitemap_parser import SitemapParser
+from src.processors.sitemap_state import REMOVED, SitemapDiff, SitemapState
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def removed_products(delta_path: str) -> List[str]:
+    """Product URLs a sitemap delta lists as removed."""
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        return [row['product_url'] for row in csv.DictReader(f) if row.get('change') == REMOVED]
+
+
+def print_diff_summary(diffs: Dict[str, SitemapDiff]) -> None:
+    """Print the changes found by an incremental run and retire removed products."""
+    print("\n" + "="*50)
+    print("SITEMAP DIFF SUMMARY")
+    print("="*50)
+    
+    for site_name, diff in diffs.items():
+        print(f"\n{site_name.upper()}:")
+        if diff.aborted:
+            print(f"  ⚠️  Diff rejected, state left unchanged: {diff.aborted}")
+            continue
+        if diff.baseline:
+            print("  First run: every product counts as added")
+        print(f"  Added: {diff.added}  Modified: {diff.modified}  Removed: {diff.removed}  Unchanged: {diff.unchanged}")
+        if diff.delta_path:
+            print(f"  Delta: {diff.delta_path}")
+            if diff.removed:
+                retired = update_product_statuses(dict.fromkeys(removed_products(diff.delta_path), 'removed'))
+                print(f"  Marked {retired} products in products.csv as removed")
+    
+    print("="*50)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Parse XML sitemaps and extract product URLs")
     parser.add_argument(
@@ -29,33 +76,66 @@ def main():
         default="both",
         help="Which site to process (default: both)"
     )
+    parser.add_argument(
+        "--sitemap",
+        help="Sitemap, gzipped sitemap or sitemap index (file or URL) to use instead of the configured one"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes parsing sitemap index shards in parallel (default: 1; see scripts/benchmark_sitemap.py "
+             "--workers for whether more pay off on this machine)"
+    )
     parser.add_argument(
         "--output",
         default="config/products.csv",
         help="Output CSV file path (default: config/products.csv)"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Write only the products changed since the previous run to data/sitemap_deltas/"
+    )
+    parser.add_argument(
+        "--state",
+        default="data/sitemap_state.sqlite3",
+        help="Sitemap state database used by --incremental (default: data/sitemap_state.sqlite3)"
+    )
     
     args = parser.parse_args()
+    if args.sitemap and args.site == "both":
+        parser.error("--sitemap needs --site to say which site it belongs to")
     
     sitemap_parser = SitemapParser()
     
+    with open(sitemap_parser.categories_config_path, 'r', encoding='utf-8') as f:
+        site_configs = (yaml.safe_load(f) or {}).get('sites', {})
+    
     results = {}
+    diffs = {}
+    state = SitemapState(args.state) if args.incremental else None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    if args.site in ["24mx", "both"]:
-        xml_path = "data/xml/24mx_sitemap.xml"
-        if Path(xml_path).exists():
-            logger.info("Processing 24MX sitemap...")
-            results["24mx"] = sitemap_parser.process_sitemap(xml_path, "24mx")
+    for site_name in ["24mx", "xlmoto"]:
+        if args.site not in [site_name, "both"]:
+            continue
+        xml_path = args.sitemap or site_configs.get(site_name, {}).get('xml_file', f"data/xml/{site_name}_sitemap.xml")
+        if not (xml_path.startswith(('http://', 'https://')) or Path(xml_path).exists()):
+            logger.warning(f"{site_name} sitemap not found at {xml_path}")
+        elif args.incremental:
+            logger.info(f"Diffing {site_name} sitemap...")
+            diffs[site_name] = sitemap_parser.diff_sitemap(
+                xml_path, site_name, state=state, workers=args.workers,
+                delta_path=f"data/sitemap_deltas/{site_name}_{timestamp}.csv"
+            )
         else:
-            logger.warning(f"24MX sitemap not found at {xml_path}")
+            logger.info(f"Processing {site_name} sitemap...")
+            results[site_name] = sitemap_parser.process_sitemap(xml_path, site_name, workers=args.workers)
     
-    if args.site in ["xlmoto", "both"]:
-        xml_path = "data/xml/xlmoto_sitemap.xml"
-        if Path(xml_path).exists():
-            logger.info("Processing XLMoto sitemap...")
-            results["xlmoto"] = sitemap_parser.process_sitemap(xml_path, "xlmoto")
-        else:
-            logger.warning(f"XLMoto sitemap not found at {xml_path}")
+    if args.incremental:
+        print_diff_summary(diffs)
+        return
     
     # Print summary
     print("\n" + "="*50)
@@ -66,6 +146,12 @@ def main():
         print(f"\n{site_name.upper()}:")
         print(f"  Total URLs extracted: {stats.get('total_entries', 0)}")
         
+        scan = stats.get('scan')
+        if scan:
+            read_share = f" ({scan['bytes_read'] / scan['total_bytes']:.1%} of the file)" if scan.get('total_bytes') else ""
+            print(f"  Entries scanned: {scan['entries_scanned']}{read_share}"
+                  f"{', stopped early: every category full' if scan['stopped_early'] else ''}")
+        
         categories = stats.get('categories', {})
         for category, category_stats in categories.items():
             print(f"  {category}: {category_stats['count']}/{category_stats['limit']} URLs")
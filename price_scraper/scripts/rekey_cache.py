@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Re-key Firecrawl cache entries by canonical URL.
+
+Cache keys are derived from canonical URLs (see src/utils/url_canonical.py),
+so entries written under the raw URL by older versions, or before a site's
+`url_canonical` rules in sites.yaml changed, are no longer found. This moves
+them to their canonical keys in place; when several entries turn out to be
+the same page, the most recently cached one is kept.
+
+Usage:
+    uv run python scripts/rekey_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.firecrawl_cache import FirecrawlCache
+
+
+def main():
+    cache = FirecrawlCache.from_config()
+    before = cache.get_cache_stats()['total_entries']
+
+    print(f"🔑 Re-keying {before} cache entries in {cache.cache_dir} ({cache.backend.name} backend)")
+    moved, dropped = cache.rekey_entries()
+    after = cache.get_cache_stats()['total_entries']
+    cache.close()
+
+    print(f"   Moved to canonical keys: {moved}")
+    print(f"   Duplicates dropped:      {dropped}")
+    print(f"   Entries now:             {after}")
+
+
+if __name__ == "__main__":
+    main()
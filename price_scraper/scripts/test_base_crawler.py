@@ -141,7 +141,7 @@ async def test_batch_crawl():
     print(f"Testing batch crawl with {len(test_urls)} URLs...")
     
     try:
-        results = await crawler.crawl_multiple(test_urls, max_concurrent=2)
+        results = await crawler.crawl_multiple(test_urls)
         
         print(f"\n📊 Batch Results:")
         successful = sum(1 for r in results if r.success)
@@ -1,17 +1,83 @@
 import asyncio
+import functools
+import os
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, FrozenSet, List, Any, AsyncIterator, Callable, Iterable, Set, Tuple
 from dataclasses import dataclass
 from firecrawl import FirecrawlApp
 
 from src.models.product import Product, ProductStatus, Currency
+from src.crawlers.concurrency import concurrency_controllers
+from src.crawlers.errors import (
+    PERMANENT_STATUS_CODES, PageGoneError, get_status_code, is_account_error, is_permanent_failure,
+    is_retryable_error, is_throttling_error, is_timeout_error, page_status_code
+)
+from src.crawlers.retry import RetryPolicy, circuit_breakers
 from src.utils.logger import get_logger
 from src.utils.config import config
-from src.utils.firecrawl_cache import FirecrawlCache
+from src.utils.failure_cache import PERMANENT, TRANSIENT, FailureCache, get_failure_cache
+from src.utils.firecrawl_cache import FirecrawlCache, get_firecrawl_cache
+from src.utils.firecrawl_formats import FormatProfile, profile_fields, firecrawl_formats, filter_result_fields
+from src.utils.rate_limiter import rate_limiters
+from src.utils.single_flight import SingleFlight
+from src.utils.url_canonical import canonicalize_url
 
 logger = get_logger(__name__)
 
+# Shared pool for the blocking Firecrawl SDK calls (created lazily)
+_firecrawl_executor: Optional[ThreadPoolExecutor] = None
+
+# In-flight Firecrawl scrapes shared by every crawler in the process
+firecrawl_requests = SingleFlight("firecrawl")
+
+
+class ReplayMissError(Exception):
+    """Raised in replay mode for a URL the cache cannot serve."""
+
+
+class KnownFailureError(Exception):
+    """Raised instead of scraping a URL the negative cache says is still failing."""
+
+
+def replay_enabled() -> bool:
+    """
+    Whether crawlers run in strict replay mode.
+    
+    Set with the FIRECRAWL_REPLAY environment variable (1/true/yes) or
+    `firecrawl_cache.replay` in settings.yaml; the environment variable wins.
+    """
+    env_value = os.getenv("FIRECRAWL_REPLAY")
+    if env_value is not None:
+        return env_value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool((config.settings.get('firecrawl_cache', {}) or {}).get('replay', False))
+
+
+def get_firecrawl_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide thread pool used to run blocking Firecrawl calls.
+    
+    The pool is sized from `crawling.max_concurrent_requests` in settings.yaml,
+    which bounds how many Firecrawl requests can be in flight at once.
+    """
+    global _firecrawl_executor
+    if _firecrawl_executor is None:
+        max_workers = config.settings.get('crawling', {}).get('max_concurrent_requests', 5)
+        _firecrawl_executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='firecrawl'
+        )
+        logger.debug(f"Created Firecrawl thread pool with {max_workers} workers")
+    return _firecrawl_executor
+
+
+def _timed_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, float]:
+    """Call func, returning its result and how long the call itself took (excluding any queueing before it)."""
+    started = time.monotonic()
+    result = func(*args, **kwargs)
+    return result, time.monotonic() - started
+
 
 @dataclass
 class CrawlResult:
@@ -21,58 +87,73 @@ class CrawlResult:
     error_message: Optional[str] = None
     retry_count: int = 0
     firecrawl_data: Optional[Dict[str, Any]] = None
+    url: Optional[str] = None
 
 
-class RateLimiter:
-    """Simple rate limiter for Firecrawl requests."""
+class BaseCrawler(ABC):
+    """
+    Abstract base crawler for product data extraction using Firecrawl.
     
-    def __init__(self, requests_per_second: float = 2.0, delay_between_requests: float = 0.5):
-        self.requests_per_second = requests_per_second
-        self.delay_between_requests = delay_between_requests
-        self.last_request_time = 0.0
+    URLs whose scrape failed recently are skipped without calling Firecrawl
+    while their negative cache entry lasts: gone pages (404/410) for days,
+    URLs that exhausted their retries for a few minutes.
     
-    async def wait_if_needed(self):
-        """Wait if necessary to respect rate limits."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.delay_between_requests:
-            wait_time = self.delay_between_requests - time_since_last
-            await asyncio.sleep(wait_time)
-        
-        self.last_request_time = time.time()
-
-
-class BaseCrawler(ABC):
-    """Abstract base crawler for product data extraction using Firecrawl."""
+    In replay mode pages are served only from the Firecrawl cache, whatever
+    their age: Firecrawl is never called (no API key is needed) and a URL the
+    cache cannot serve fails with ReplayMissError. Together with a cache bundle
+    this makes end-to-end runs reproducible offline.
+    """
+    
+    # Page content the extractor reads; only these formats are fetched and cached
+    format_profile: FormatProfile = FormatProfile.FULL
+    
+    # A batch scrape job is abandoned after this many seconds plus some per URL it holds
+    batch_job_base_timeout: float = 300.0
+    batch_job_timeout_per_url: float = 2.0
     
-    def __init__(self, site_name: str, site_config: Dict[str, Any], use_cache: bool = True):
+    def __init__(self, site_name: str, site_config: Dict[str, Any], use_cache: bool = True,
+                 retry_policy: Optional[RetryPolicy] = None, replay: Optional[bool] = None):
         self.site_name = site_name
         self.site_config = site_config
         self.use_cache = use_cache
+        self.replay = replay_enabled() if replay is None else replay
+        if self.replay and not use_cache:
+            raise ValueError("Replay mode needs the Firecrawl cache (use_cache=True)")
         self.base_url = site_config.get('base_url', '')
         self.currency = Currency(site_config.get('currency', 'EUR'))
         
-        # Rate limiting
-        rate_config = site_config.get('rate_limit', {})
-        self.rate_limiter = RateLimiter(
-            requests_per_second=rate_config.get('requests_per_second', 2.0),
-            delay_between_requests=rate_config.get('delay_between_requests', 0.5)
-        )
+        # Rate limiting (shared with every other crawler hitting the same host)
+        self.rate_limiter = rate_limiters.for_site(site_name, site_config)
+        
+        # Adaptive concurrency window (shared by all crawlers for this site)
+        self.concurrency = concurrency_controllers.for_site(site_name, site_config)
+        
+        # Retries and fail-fast behaviour for unhealthy sites
+        self.retry_policy = retry_policy or RetryPolicy.from_config()
+        self.circuit_breaker = circuit_breakers.for_site(site_name)
         
         # Firecrawl configuration
-        self.max_retries = 3
         self.firecrawl_app: Optional[FirecrawlApp] = None
         
         # Initialize caching
+        self.cache: Optional[FirecrawlCache]
         if self.use_cache:
-            self.cache = FirecrawlCache()
+            self.cache = get_firecrawl_cache()
             logger.debug(f"Initialized Firecrawl cache for {self.site_name}")
         else:
             self.cache = None
         
-        # Initialize Firecrawl
-        self._initialize_firecrawl()
+        # Remember failing URLs so later crawls skip them
+        negative_settings = (config.settings.get('firecrawl_cache', {}) or {}).get('negative_cache', {}) or {}
+        self.failures: Optional[FailureCache]
+        if self.use_cache and negative_settings.get('enabled', True):
+            self.failures = get_failure_cache()
+        else:
+            self.failures = None
+        
+        # Initialize Firecrawl (replay never calls it)
+        if not self.replay:
+            self._initialize_firecrawl()
         
         logger.info(f"Initialized Firecrawl crawler for {site_name} with base URL: {self.base_url}")
     
@@ -86,63 +167,194 @@ class BaseCrawler(ABC):
             logger.error(f"Failed to initialize Firecrawl: {e}")
             raise
     
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking Firecrawl SDK call in the shared thread pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_firecrawl_executor(),
+            functools.partial(func, *args, **kwargs)
+        )
+    
+    @property
+    def fields(self) -> FrozenSet[str]:
+        """Data fields required by this crawler's format profile."""
+        return profile_fields(self.format_profile)
+    
+    async def _fields_to_fetch(self, urls: Iterable[str]) -> FrozenSet[str]:
+        """
+        Fields to request for URLs that missed the cache.
+        
+        Includes whatever their existing cache entries already hold, so upgrading
+        an entry for this extractor never drops formats other extractors rely on.
+        """
+        fields = set(self.fields)
+        if self.cache:
+            fields |= await self.cache.aget_cached_fields(urls)
+        return frozenset(fields)
+    
+    def _scrape_options(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """Firecrawl request options shared by single and batch scrapes."""
+        return {
+            'formats': firecrawl_formats(fields),
+            'wait_for': 10000,  # Wait 10 seconds for page to load
+            'timeout': 30000,   # Total timeout of 30 seconds
+        }
+    
+    def _to_firecrawl_result(self, document: Any, fields: Iterable[str]) -> Dict[str, Any]:
+        """Convert a Firecrawl response or batch document to the cached dict format."""
+        return filter_result_fields({
+            'success': getattr(document, 'success', True),
+            'data': {
+                'markdown': getattr(document, 'markdown', ''),
+                'html': getattr(document, 'html', ''),
+                'metadata': getattr(document, 'metadata', {}),
+                'links': getattr(document, 'links', []),
+            }
+        }, fields)
+    
     async def _scrape_with_firecrawl(self, url: str) -> Dict[str, Any]:
-        """Scrape URL using Firecrawl with caching, rate limiting and retries."""
+        """Scrape URL using Firecrawl with caching, request coalescing, rate limiting and retries."""
+        
+        if self.replay:
+            # Replay always has a cache (see __init__)
+            cached_result = await self.cache.aget(url, fields=self.fields, ignore_ttl=True) if self.cache else None
+            if not cached_result:
+                raise ReplayMissError(f"Replay mode: no cached page with {sorted(self.fields)} for {url}")
+            return cached_result
         
-        # Check cache first
+        # Check cache first (stale entries may be served while they are refreshed in the background)
         if self.cache:
-            cached_result = self.cache.get(url)
+            cached_result = await self.cache.aget(url, fields=self.fields, refresh=functools.partial(self._fetch, url))
             if cached_result:
                 return cached_result
         
-        await self.rate_limiter.wait_if_needed()
+        return await self._fetch(url)
+    
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        """Fetch URL from Firecrawl for this crawler's fields, caching the result."""
+        if self.replay:
+            raise ReplayMissError(f"Replay mode: not fetching {url} from Firecrawl")
+        self._check_known_failure(url)
+        key = canonicalize_url(url)
+        fields = await self._fields_to_fetch([url])
+        
+        # Concurrent requests for the same page share one Firecrawl call, whatever formats each needs
+        result = await firecrawl_requests.do(key, lambda: self._fetch_uncached(url, fields))
+        if self.fields <= set(result.get('data', {}) or {}):
+            return result
         
-        last_exception = None
+        # Joined a call for fewer formats: its result is cached now, so this one fetches the union
+        fields = await self._fields_to_fetch([url])
+        return await firecrawl_requests.do(key, lambda: self._fetch_uncached(url, fields))
+    
+    async def _fetch_uncached(self, url: str, fields: FrozenSet[str]) -> Dict[str, Any]:
+        """Scrape a page unless a flight that finished just before this one has cached it."""
+        if self.cache:
+            cached_result = await self.cache.aget(url, fields=fields)
+            if cached_result:
+                return cached_result
+        return await self._fetch_from_firecrawl(url, fields)
+    
+    def _check_known_failure(self, url: str) -> None:
+        """Raise KnownFailureError if the URL failed recently."""
+        failure = self.failures.get(url) if self.failures else None
+        if failure:
+            raise KnownFailureError(
+                f"Skipping {url}: {failure.kind} failure at {failure.failed_at:%Y-%m-%d %H:%M} "
+                f"(retry after {failure.expires_at:%Y-%m-%d %H:%M}): {failure.error}"
+            )
+    
+    def _record_failure(self, url: str, error: BaseException) -> None:
+        """Remember a failed scrape in the negative cache, classified as permanent or transient."""
+        # Throttling and account errors (401/402/403) say nothing about the URL itself
+        if not self.failures or is_throttling_error(error) or is_account_error(error):
+            return
+        kind = PERMANENT if is_permanent_failure(error) else TRANSIENT
+        self.failures.record(url, kind, status_code=get_status_code(error), error=str(error))
+    
+    async def _fetch_from_firecrawl(self, url: str, fields: FrozenSet[str]) -> Dict[str, Any]:
+        """Fetch URL from Firecrawl with rate limiting and retries, caching the result."""
+        policy = self.retry_policy
+        last_exception: Optional[Exception] = None
+        delay = policy.base_delay
+        attempts = 0
         
-        for attempt in range(self.max_retries):
+        for attempt in range(policy.max_attempts):
+            # Fail fast while the site is known to be down
+            self.circuit_breaker.before_request()
+            await self.rate_limiter.acquire()
+            policy.budget.record_request()
+            attempts += 1
+            
             try:
-                logger.debug(f"Scraping {url} with Firecrawl (attempt {attempt + 1}/{self.max_retries})")
+                logger.debug(f"Scraping {url} with Firecrawl (attempt {attempt + 1}/{policy.max_attempts})")
                 
-                # Use Firecrawl to scrape the page with timeout for page loading
-                result = self.firecrawl_app.scrape_url(
+                # Use Firecrawl to scrape the page with timeout for page loading. Latency is timed
+                # inside the worker thread: waiting for a thread of the shared pool says nothing about the site
+                result, latency = await self._run_blocking(
+                    _timed_call,
+                    self.firecrawl_app.scrape_url,
                     url,
-                    wait_for=10000,  # Wait 10 seconds for page to load
-                    timeout=30000,   # Total timeout of 30 seconds
+                    **self._scrape_options(fields)
                 )
                 
                 if result and hasattr(result, 'success') and result.success:
                     logger.debug(f"Successfully scraped {url}")
+                    self.concurrency.record_success(latency)
+                    self.circuit_breaker.record_success()
+                    
+                    # The site answered, but the product page no longer exists: retrying won't help
+                    status_code = page_status_code(result)
+                    if status_code in PERMANENT_STATUS_CODES:
+                        last_exception = PageGoneError(url, status_code)
+                        break
+                    
+                    if self.failures:
+                        self.failures.forget(url)
+                    
                     # Convert ScrapeResponse to dict format for consistency
-                    firecrawl_result = {
-                        'success': result.success,
-                        'data': {
-                            'markdown': getattr(result, 'markdown', ''),
-                            'html': getattr(result, 'html', ''),
-                            'metadata': getattr(result, 'metadata', {}),
-                            'links': getattr(result, 'links', []),
-                        }
-                    }
+                    firecrawl_result = self._to_firecrawl_result(result, fields)
                     
                     # Cache the successful result
                     if self.cache:
-                        self.cache.set(url, firecrawl_result)
+                        await self.cache.aset(url, firecrawl_result, fields=fields)
                     
                     return firecrawl_result
                 else:
                     error_msg = getattr(result, 'error', 'Unknown Firecrawl error') if result else 'Empty result from Firecrawl'
-                    logger.warning(f"Firecrawl scraping failed for {url}: {error_msg}")
                     last_exception = Exception(error_msg)
-                
+                    self.concurrency.record_failure()
+                    self.circuit_breaker.record_failure()
+            
             except Exception as e:
                 last_exception = e
-                wait_time = (2 ** attempt) + 1
-                logger.warning(f"Firecrawl request failed for {url}, waiting {wait_time}s before retry {attempt + 1}/{self.max_retries}: {e}")
-                await asyncio.sleep(wait_time)
+                if is_throttling_error(e):
+                    self.concurrency.record_throttled()
+                elif is_timeout_error(e):
+                    self.concurrency.record_timeout()
+                else:
+                    self.concurrency.record_failure()
+                
+                # Errors about this URL (e.g. 404) say nothing about the site's health; account
+                # errors fail every request, so they count against it to fail fast
+                if is_retryable_error(e) or is_account_error(e):
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+            
+            if not policy.should_retry(attempt, last_exception):
+                break
+            
+            delay = policy.next_delay(delay, last_exception)
+            logger.warning(f"Firecrawl request failed for {url}, waiting {delay:.1f}s before retry "
+                           f"{attempt + 1}/{policy.max_attempts - 1}: {last_exception}")
+            await asyncio.sleep(delay)
         
         # All retries failed
-        error_msg = f"Failed to scrape {url} with Firecrawl after {self.max_retries} attempts"
+        error_msg = f"Failed to scrape {url} with Firecrawl after {attempts} attempts"
         if last_exception:
             error_msg += f": {str(last_exception)}"
+            self._record_failure(url, last_exception)
         logger.error(error_msg)
         raise Exception(error_msg)
     
@@ -175,6 +387,28 @@ class BaseCrawler(ABC):
         
         return text.strip()
     
+    async def _build_crawl_result(self, url: str, firecrawl_result: Dict[str, Any]) -> CrawlResult:
+        """Extract and validate product data from a scraped page."""
+        # Extract product data (implemented by subclasses)
+        product = await self._extract_product_data(url, firecrawl_result)
+        
+        # Validate data
+        if not self._validate_product_data(product):
+            return CrawlResult(
+                success=False,
+                error_message="Product data validation failed",
+                firecrawl_data=firecrawl_result,
+                url=url
+            )
+        
+        logger.info(f"Successfully extracted product: {product.name}")
+        return CrawlResult(
+            success=True,
+            product=product,
+            firecrawl_data=firecrawl_result,
+            url=url
+        )
+    
     async def crawl_product(self, url: str) -> CrawlResult:
         """
         Main method to crawl a product URL and extract data using Firecrawl.
@@ -186,29 +420,14 @@ class BaseCrawler(ABC):
             # Scrape page with Firecrawl
             firecrawl_result = await self._scrape_with_firecrawl(url)
             
-            # Extract product data (implemented by subclasses)
-            product = await self._extract_product_data(url, firecrawl_result)
-            
-            # Validate data
-            if not self._validate_product_data(product):
-                return CrawlResult(
-                    success=False,
-                    error_message="Product data validation failed",
-                    firecrawl_data=firecrawl_result
-                )
-            
-            logger.info(f"Successfully extracted product: {product.name}")
-            return CrawlResult(
-                success=True,
-                product=product,
-                firecrawl_data=firecrawl_result
-            )
-            
+            return await self._build_crawl_result(url, firecrawl_result)
+        
         except Exception as e:
             logger.error(f"Failed to crawl {url}: {str(e)}")
             return CrawlResult(
                 success=False,
-                error_message=str(e)
+                error_message=str(e),
+                url=url
             )
     
     @abstractmethod
@@ -220,24 +439,51 @@ class BaseCrawler(ABC):
         Args:
             url: The product URL that was scraped
             firecrawl_data: The result from Firecrawl containing markdown, html, metadata, etc.
-            
+        
         Returns:
             Product object with extracted data
         """
         pass
     
-    async def crawl_multiple(self, urls: List[str], max_concurrent: int = 3) -> List[CrawlResult]:
+    async def wait_for_refreshes(self) -> int:
+        """
+        Wait for background refreshes of stale cache entries to finish.
+        
+        Stale pages are served at once and re-fetched in the background; the
+        crawl methods below wait for those re-fetches before returning, so an
+        event loop shut down afterwards (e.g. by asyncio.run) does not cancel
+        a scrape that was already paid for before its result is cached.
+        
+        Returns:
+            Number of refreshes waited for
+        """
+        if not self.cache:
+            return 0
+        refreshed = await self.cache.wait_for_refreshes()
+        if refreshed:
+            logger.info(f"Waited for {refreshed} background cache refreshes ({self.site_name})")
+        return refreshed
+    
+    async def crawl_multiple(self, urls: List[str], max_concurrent: Optional[int] = None) -> List[CrawlResult]:
         """
         Crawl multiple URLs concurrently.
-        Note: Lower concurrency limit for Firecrawl to respect rate limits.
+        
+        By default concurrency follows the site's adaptive (AIMD) window, which grows
+        while requests are healthy and shrinks on 429s, timeouts and rising latency.
+        Pass `max_concurrent` to use a fixed limit instead.
         """
         logger.info(f"Starting batch crawl of {len(urls)} URLs for {self.site_name}")
         
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def crawl_with_semaphore(url: str) -> CrawlResult:
-            async with semaphore:
-                return await self.crawl_product(url)
+        if max_concurrent is not None:
+            semaphore = asyncio.Semaphore(max_concurrent)
+            
+            async def crawl_with_semaphore(url: str) -> CrawlResult:
+                async with semaphore:
+                    return await self.crawl_product(url)
+        else:
+            async def crawl_with_semaphore(url: str) -> CrawlResult:
+                async with self.concurrency.slot():
+                    return await self.crawl_product(url)
         
         results = await asyncio.gather(
             *[crawl_with_semaphore(url) for url in urls],
@@ -251,12 +497,288 @@ class BaseCrawler(ABC):
                 logger.error(f"Unexpected error crawling {urls[i]}: {result}")
                 processed_results.append(CrawlResult(
                     success=False,
-                    error_message=str(result)
+                    error_message=str(result),
+                    url=urls[i]
                 ))
             else:
                 processed_results.append(result)
         
         successful = sum(1 for r in processed_results if r.success)
-        logger.info(f"Batch crawl completed: {successful}/{len(urls)} successful")
+        flight_stats = firecrawl_requests.get_stats()
+        logger.info(f"Batch crawl completed: {successful}/{len(urls)} successful "
+                    f"(concurrency window: {self.concurrency.window}, "
+                    f"Firecrawl scrapes: {flight_stats['executed']}, coalesced: {flight_stats['coalesced']})")
+        
+        await self.wait_for_refreshes()
+        return processed_results
+    
+    async def iter_crawl(self, urls: Iterable[str],
+                         max_concurrent: Optional[int] = None) -> AsyncIterator[CrawlResult]:
+        """
+        Crawl URLs concurrently, yielding each result as soon as it completes.
+        
+        Unlike crawl_multiple, URLs are pulled from the iterable lazily and only
+        as many crawls as the concurrency window allows are in flight at a time,
+        so memory stays bounded and the caller can process the first result
+        while the rest are still being crawled. Results come in completion order;
+        use `result.url` to match them to their input. Once every result has been
+        yielded, the iterator waits for background cache refreshes before ending.
+        
+        Args:
+            urls: URLs to crawl (any iterable, including generators)
+            max_concurrent: Fixed concurrency limit (default: the site's adaptive window)
+        """
+        url_iter = iter(urls)
+        exhausted = False
+        pending: Set[asyncio.Task] = set()
+        task_urls: Dict[asyncio.Task, str] = {}
+        
+        async def crawl_one(url: str) -> CrawlResult:
+            if max_concurrent is not None:
+                return await self.crawl_product(url)
+            async with self.concurrency.slot():
+                return await self.crawl_product(url)
+        
+        try:
+            while True:
+                limit = max_concurrent or self.concurrency.window
+                while not exhausted and len(pending) < limit:
+                    url = next(url_iter, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    task = asyncio.create_task(crawl_one(url))
+                    task_urls[task] = url
+                    pending.add(task)
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url = task_urls.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"Unexpected error crawling {url}: {e}")
+                        result = CrawlResult(success=False, error_message=str(e), url=url)
+                    yield result
+            
+            await self.wait_for_refreshes()
+        finally:
+            # Consumer stopped early: don't leave crawls running in the background
+            for task in pending:
+                task.cancel()
+            # Let them unwind (releasing slots, refunding rate limit tokens) before returning
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def crawl_bulk(self, urls: List[str], poll_interval: float = 5.0,
+                         max_urls_per_job: int = 1000, job_timeout: Optional[float] = None) -> List[CrawlResult]:
+        """
+        Crawl many URLs with Firecrawl batch scrape jobs instead of one request per URL.
+        
+        Cached pages are served directly. The remaining URLs are submitted as batch
+        jobs whose status is polled asynchronously; each page is cached and extracted
+        as soon as it shows up in the job status, not when the whole job finishes.
+        Pages are fetched by Firecrawl's own workers, so the per-site rate limiter
+        only applies to the job submission and status calls. Failed status checks
+        are retried with backoff; a job still unfinished after its timeout is
+        abandoned and its missing pages fail.
+        
+        Args:
+            urls: Product URLs to crawl
+            poll_interval: Seconds between job status checks
+            max_urls_per_job: Maximum URLs submitted in a single batch job
+            job_timeout: Seconds to wait for each job (default: batch_job_base_timeout
+                plus batch_job_timeout_per_url for every URL in the job)
+        
+        Returns:
+            One CrawlResult per input URL, in input order
+        """
+        logger.info(f"Starting bulk crawl of {len(urls)} URLs for {self.site_name}")
+        
+        results: Dict[str, CrawlResult] = {}
+        pending: List[str] = []
+        
+        # URLs of the same page are crawled once, under the first URL given for it
+        first_urls: Dict[str, str] = {}
+        for url in urls:
+            first_urls.setdefault(canonicalize_url(url), url)
+        unique_urls = list(first_urls.values())
+        if self.cache:
+            cached_results = await asyncio.gather(*(
+                self.cache.aget(url, fields=self.fields, ignore_ttl=self.replay,
+                                refresh=None if self.replay else functools.partial(self._fetch, url))
+                for url in unique_urls
+            ))
+        else:
+            cached_results = [None] * len(unique_urls)
+        
+        for url, cached_result in zip(unique_urls, cached_results, strict=True):
+            if cached_result:
+                results[url] = await self._safe_build_crawl_result(url, cached_result)
+            else:
+                pending.append(url)
+        
+        served = len(results)
+        
+        # Recently failed URLs are not submitted again
+        if self.failures and not self.replay:
+            to_scrape = []
+            for url in pending:
+                try:
+                    self._check_known_failure(url)
+                    to_scrape.append(url)
+                except KnownFailureError as e:
+                    results[url] = CrawlResult(success=False, error_message=str(e), url=url)
+            pending = to_scrape
+        
+        logger.info(f"Bulk crawl: {served} served from cache, {len(results) - served} known failures skipped, "
+                    f"{len(pending)} to scrape")
+        
+        if self.replay:
+            for url in pending:
+                results[url] = CrawlResult(
+                    success=False,
+                    error_message=f"Replay mode: no cached page with {sorted(self.fields)} for {url}",
+                    url=url
+                )
+            pending = []
+        
+        for i in range(0, len(pending), max_urls_per_job):
+            chunk = pending[i:i + max_urls_per_job]
+            try:
+                timeout = job_timeout or self.batch_job_base_timeout + self.batch_job_timeout_per_url * len(chunk)
+                await self._run_batch_job(chunk, await self._fields_to_fetch(chunk), results, poll_interval, timeout)
+            except Exception as e:
+                logger.error(f"Batch scrape job failed for {self.site_name}: {e}")
+            
+            for url in chunk:
+                if url not in results:
+                    results[url] = CrawlResult(
+                        success=False,
+                        error_message=f"Firecrawl batch job returned no page for {url}",
+                        url=url
+                    )
+        
+        successful = sum(1 for r in results.values() if r.success)
+        logger.info(f"Bulk crawl completed: {successful}/{len(results)} successful")
+        
+        await self.wait_for_refreshes()
+        return [results[first_urls[canonicalize_url(url)]] for url in urls]
+    
+    async def _safe_build_crawl_result(self, url: str, firecrawl_result: Dict[str, Any]) -> CrawlResult:
+        """Build a crawl result, converting extraction errors into failed results."""
+        try:
+            return await self._build_crawl_result(url, firecrawl_result)
+        except Exception as e:
+            logger.error(f"Failed to extract {url}: {str(e)}")
+            return CrawlResult(
+                success=False,
+                error_message=str(e),
+                firecrawl_data=firecrawl_result,
+                url=url
+            )
+    
+    async def _run_batch_job(self, urls: List[str], fields: FrozenSet[str], results: Dict[str, CrawlResult],
+                             poll_interval: float, timeout: float) -> None:
+        """Submit one batch scrape job and process its pages as they complete, for at most `timeout` seconds."""
+        await self.rate_limiter.acquire()
+        job = await self._run_blocking(
+            self.firecrawl_app.async_batch_scrape_urls,
+            urls,
+            **self._scrape_options(fields)
+        )
+        
+        if not job or not getattr(job, 'success', False) or not getattr(job, 'id', None):
+            error_msg = getattr(job, 'error', None) or 'Empty response from Firecrawl'
+            raise Exception(f"Failed to start batch scrape job: {error_msg}")
+        
+        logger.info(f"Submitted Firecrawl batch job {job.id} with {len(urls)} URLs")
+        deadline = time.monotonic() + timeout
+        
+        # Firecrawl may normalize the URLs it reports (e.g. trailing slashes), so match canonical forms
+        lookup = {canonicalize_url(url): url for url in urls}
+        
+        for invalid_url in getattr(job, 'invalidURLs', None) or []:
+            url = lookup.get(canonicalize_url(invalid_url))
+            if url is not None:
+                results[url] = CrawlResult(
+                    success=False,
+                    error_message="URL rejected by Firecrawl batch scrape",
+                    url=url
+                )
+        
+        job_status = None
+        delay = poll_interval
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                job_status = 'timed out'
+                break
+            await asyncio.sleep(min(delay, remaining))
+            await self.rate_limiter.acquire()
+            try:
+                status = await self._run_blocking(self.firecrawl_app.check_batch_scrape_status, job.id)
+            except Exception as e:
+                # The job keeps running on Firecrawl's side: check again later rather than give up on it
+                delay = self.retry_policy.next_delay(max(delay, poll_interval), e)
+                logger.warning(f"Status check of batch job {job.id} failed, retrying in {delay:.1f}s: {e}")
+                continue
+            delay = poll_interval
+            
+            for document in getattr(status, 'data', None) or []:
+                metadata = getattr(document, 'metadata', None) or {}
+                source_url = metadata.get('sourceURL') or metadata.get('url') or getattr(document, 'url', None)
+                url = lookup.get(canonicalize_url(source_url or ''))
+                if url is None or url in results:
+                    continue
+                
+                status_code = page_status_code(document)
+                if status_code in PERMANENT_STATUS_CODES:
+                    error = PageGoneError(url, status_code)
+                    self._record_failure(url, error)
+                    results[url] = CrawlResult(success=False, error_message=str(error), url=url)
+                    continue
+                
+                if self.failures:
+                    self.failures.forget(url)
+                firecrawl_result = self._to_firecrawl_result(document, fields)
+                if self.cache:
+                    await self.cache.aset(url, firecrawl_result, fields=fields)
+                results[url] = await self._safe_build_crawl_result(url, firecrawl_result)
+            
+            job_status = getattr(status, 'status', None)
+            logger.debug(f"Batch job {job.id}: {job_status}, "
+                         f"{getattr(status, 'completed', 0)}/{getattr(status, 'total', len(urls))} pages")
+            
+            if job_status in ('completed', 'failed', 'cancelled'):
+                break
+        
+        if job_status == 'timed out':
+            logger.warning(f"Firecrawl batch job {job.id} did not finish within {timeout:g}s, "
+                           f"abandoning {sum(1 for url in urls if url not in results)} pending pages")
+        elif job_status != 'completed':
+            logger.warning(f"Firecrawl batch job {job.id} ended with status '{job_status}'")
+        
+        # Record Firecrawl's reason for any URL that never produced a page
+        missing = [url for url in urls if url not in results]
+        if missing:
+            try:
+                errors = await self._run_blocking(self.firecrawl_app.check_batch_scrape_errors, job.id)
+                for error in getattr(errors, 'errors', None) or []:
+                    url = lookup.get(canonicalize_url(error.get('url') or ''))
+                    if url is not None and url not in results:
+                        results[url] = CrawlResult(success=False, error_message=error.get('error'), url=url)
+                        self._record_failure(url, Exception(error.get('error') or 'Unknown Firecrawl error'))
+            except Exception as e:
+                logger.warning(f"Could not fetch errors for batch job {job.id}: {e}")
         
-        return processed_results
\ No newline at end of file
+        if job_status == 'timed out':
+            for url in urls:
+                if url not in results:
+                    results[url] = CrawlResult(
+                        success=False,
+                        error_message=f"Firecrawl batch job {job.id} timed out after {timeout:g}s",
+                        url=url
+                    )
@@ -0,0 +1,229 @@
+"""
+Adaptive (AIMD) concurrency control for crawling.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from src.utils.logger import get_logger
+from src.utils.config import config
+
+logger = get_logger(__name__)
+
+
+class AdaptiveConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease concurrency window for one site.
+
+    The window grows by roughly one slot per window's worth of healthy requests
+    and is cut multiplicatively on throttling (429), timeouts, a rising p95
+    latency or a falling success rate. Decreases are rate limited by a cooldown
+    so that a burst of failures from one window only counts once.
+    """
+
+    def __init__(self, name: str, initial: int = 2, min_limit: int = 1, max_limit: int = 5,
+                 decrease_factor: float = 0.5, sample_size: int = 50,
+                 latency_tolerance: float = 2.0, min_success_rate: float = 0.8,
+                 cooldown_seconds: float = 5.0):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Name used in logs and snapshots (usually the site name)
+            initial: Starting window size
+            min_limit: Smallest window size
+            max_limit: Largest window size
+            decrease_factor: Multiplier applied to the window on congestion
+            sample_size: Number of recent requests used for p95 and success rate
+            latency_tolerance: Decrease when p95 exceeds this multiple of the best p95 seen
+            min_success_rate: Decrease when the recent success rate drops below this
+            cooldown_seconds: Minimum time between two decreases
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.min_success_rate = min_success_rate
+        self.cooldown_seconds = cooldown_seconds
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=sample_size)
+        self._outcomes: Deque[bool] = deque(maxlen=sample_size)
+        self._baseline_p95: Optional[float] = None
+        self._last_decrease = 0.0
+        self._decreases = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def window(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily (and per event loop) so the controller can outlive asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+            self._in_flight = 0
+        return self._condition
+
+    async def acquire(self) -> None:
+        """Wait for a free slot in the current window."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.window)
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        """Return a slot and wake up waiters if the window allows it."""
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def _p95(self) -> Optional[float]:
+        if len(self._latencies) < 10:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def _success_rate(self) -> float:
+        if not self._outcomes:
+            return 1.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+
+        previous = self.window
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self._decreases += 1
+        # Latency samples from the larger window no longer describe the new one
+        self._latencies.clear()
+        logger.info(f"Concurrency for {self.name}: {previous} -> {self.window} ({reason})")
+
+    def _increase(self) -> None:
+        previous = self.window
+        self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+        if self.window != previous:
+            logger.debug(f"Concurrency for {self.name}: {previous} -> {self.window}")
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and its latency."""
+        self._latencies.append(latency)
+        self._outcomes.append(True)
+
+        p95 = self._p95()
+        if p95 is not None:
+            if self._baseline_p95 is None or p95 < self._baseline_p95:
+                self._baseline_p95 = p95
+            elif p95 > self._baseline_p95 * self.latency_tolerance:
+                self._decrease(f"p95 latency {p95:.1f}s vs baseline {self._baseline_p95:.1f}s")
+                return
+
+        if self._success_rate() >= self.min_success_rate:
+            self._increase()
+
+    def record_throttled(self) -> None:
+        """Record a request rejected for rate limiting (HTTP 429)."""
+        self._outcomes.append(False)
+        self._decrease("throttled")
+
+    def record_timeout(self) -> None:
+        """Record a request that timed out."""
+        self._outcomes.append(False)
+        self._decrease("timeout")
+
+    def record_failure(self) -> None:
+        """Record any other failed request."""
+        self._outcomes.append(False)
+        if len(self._outcomes) >= 10 and self._success_rate() < self.min_success_rate:
+            self._decrease(f"success rate {self._success_rate():.0%}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current controller state for logging and metrics."""
+        p95 = self._p95()
+        return {
+            'name': self.name,
+            'window': self.window,
+            'in_flight': self._in_flight,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'p95_latency_seconds': round(p95, 3) if p95 is not None else None,
+            'success_rate': round(self._success_rate(), 3),
+            'decreases': self._decreases,
+        }
+
+
+class ConcurrencyControllerRegistry:
+    """Process-wide registry of adaptive concurrency controllers keyed by site."""
+
+    def __init__(self) -> None:
+        self._controllers: Dict[str, AdaptiveConcurrencyController] = {}
+        self._lock = threading.Lock()
+
+    def for_site(self, site_name: str, site_config: Dict[str, Any]) -> AdaptiveConcurrencyController:
+        """
+        Get the controller for a site, creating it from sites.yaml on first use.
+
+        Uses `rate_limit.initial_concurrency`, `rate_limit.min_concurrent` and
+        `rate_limit.max_concurrent`; the maximum defaults to, and never exceeds,
+        `crawling.max_concurrent_requests` from settings.yaml.
+        """
+        with self._lock:
+            controller = self._controllers.get(site_name)
+            if controller is None:
+                rate_config = site_config.get('rate_limit', {}) or {}
+                global_max = config.settings.get('crawling', {}).get('max_concurrent_requests', 5)
+                controller = AdaptiveConcurrencyController(
+                    name=site_name,
+                    initial=int(rate_config.get('initial_concurrency', 2)),
+                    min_limit=int(rate_config.get('min_concurrent', 1)),
+                    max_limit=min(int(rate_config.get('max_concurrent', global_max)), global_max),
+                )
+                self._controllers[site_name] = controller
+        return controller
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every controller, keyed by site."""
+        with self._lock:
+            return {name: c.snapshot() for name, c in self._controllers.items()}
+
+
+# Global registry instance
+concurrency_controllers = ConcurrencyControllerRegistry()
+
+
+def report_concurrency() -> None:
+    """Log where each site's concurrency window ended up at the end of a run."""
+    for name, state in concurrency_controllers.snapshot().items():
+        p95 = state['p95_latency_seconds']
+        logger.info(f"Concurrency for {name}: window {state['window']} "
+                    f"(limits {state['min_limit']}-{state['max_limit']}), "
+                    f"p95 latency {f'{p95:.2f}s' if p95 is not None else 'n/a'}, "
+                    f"success rate {state['success_rate']:.0%}, {state['decreases']} decreases")
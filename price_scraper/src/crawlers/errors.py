@@ -0,0 +1,124 @@
+"""
+Helpers for classifying Firecrawl request failures.
+"""
+
+import re
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+_STATUS_CODE_PATTERN = re.compile(r'[Ss]tatus(?: code)?:? (\d{3})')
+
+# Page statuses meaning the product page no longer exists
+PERMANENT_STATUS_CODES = frozenset({404, 410})
+
+# Statuses about the Firecrawl account (bad API key, out of credits, forbidden) rather than the page
+ACCOUNT_STATUS_CODES = frozenset({401, 402, 403})
+
+
+class PageGoneError(Exception):
+    """Raised when Firecrawl reached a page but the site reports it no longer exists."""
+
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"Page is gone (status code {status_code}): {url}")
+        self.url = url
+        self.status_code = status_code
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code behind a Firecrawl error, if there is one.
+
+    The Firecrawl SDK raises `requests.HTTPError` with the response attached;
+    other errors only mention the status code in their message.
+    """
+    response = getattr(error, 'response', None)
+    status_code = getattr(response, 'status_code', None)
+    if isinstance(status_code, int):
+        return status_code
+
+    match = _STATUS_CODE_PATTERN.search(str(error))
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def page_status_code(document: Any) -> Optional[int]:
+    """HTTP status code of the scraped page, from a Firecrawl document's metadata."""
+    metadata = getattr(document, 'metadata', None)
+    if not isinstance(metadata, dict):
+        metadata = (document.get('data') or {}).get('metadata') if isinstance(document, dict) else None
+    status_code = (metadata or {}).get('statusCode')
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_permanent_failure(error: BaseException) -> bool:
+    """Whether the error means the page is gone, so scraping it again later is pointless."""
+    return get_status_code(error) in PERMANENT_STATUS_CODES
+
+
+def is_account_error(error: BaseException) -> bool:
+    """Whether the error is about our Firecrawl account, so every request fails until it is fixed."""
+    return get_status_code(error) in ACCOUNT_STATUS_CODES
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Whether the error means we are sending requests too fast."""
+    if get_status_code(error) == 429:
+        return True
+    return 'rate limit' in str(error).lower()
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Whether the error is a request or page-load timeout."""
+    if isinstance(error, TimeoutError):
+        return True
+    if get_status_code(error) in (408, 504):
+        return True
+    message = str(error).lower()
+    return 'timed out' in message or 'timeout' in message
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the server's Retry-After hint in seconds, if the error carries one.
+
+    Supports both the delay-seconds and the HTTP-date forms of the header.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Whether retrying the same request could succeed.
+
+    Client errors (4xx) are final, except timeouts (408) and throttling (429).
+    Errors without a status code (network problems, unsuccessful scrapes) are retried.
+    """
+    status_code = get_status_code(error)
+    if status_code is None:
+        return True
+    if status_code in (408, 429):
+        return True
+    return not 400 <= status_code < 500
+
@@ -0,0 +1,261 @@
+"""
+Retry policy, retry budget and per-site circuit breakers for Firecrawl requests.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.crawlers.errors import get_retry_after, is_retryable_error
+from src.utils.logger import get_logger
+from src.utils.config import config
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a site whose circuit breaker is open."""
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries for a run.
+
+    Retries are allowed up to `min_retries` plus `ratio` times the number of
+    requests sent, so a widespread outage cannot multiply the load (and the
+    wall time) by the number of attempts per URL.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._requests = 0
+        self._retries = 0
+        self._denied = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Count a request (first attempt or retry) against the budget."""
+        with self._lock:
+            self._requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, returning False if it is exhausted."""
+        with self._lock:
+            if self._retries >= self.min_retries + self.ratio * self._requests:
+                self._denied += 1
+                return False
+            self._retries += 1
+            return True
+
+    def reset(self) -> None:
+        """Start a new run."""
+        with self._lock:
+            self._requests = self._retries = self._denied = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requests, retries spent and retries denied so far."""
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'retries': self._retries,
+                'denied': self._denied,
+            }
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a failed Firecrawl request.
+
+    Backoff uses decorrelated jitter (each delay is drawn between the base delay
+    and three times the previous delay, capped at `max_delay`). A Retry-After
+    hint from the server takes precedence over the computed delay. Client errors
+    other than 408/429 are never retried.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 max_retry_after: float = 120.0, budget: Optional[RetryBudget] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            base_delay: Smallest delay between attempts in seconds
+            max_delay: Largest computed delay between attempts in seconds
+            max_retry_after: Give up instead of honouring a longer Retry-After
+            budget: Shared retry budget (default: the process-wide budget)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else get_retry_budget()
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        """Build the policy from `crawling` settings in settings.yaml."""
+        crawling = config.settings.get('crawling', {})
+        retry_config = crawling.get('retry', {}) or {}
+        return cls(
+            max_attempts=int(crawling.get('max_retries', 3)),
+            base_delay=float(retry_config.get('base_delay_seconds', 1.0)),
+            max_delay=float(retry_config.get('max_delay_seconds', 30.0)),
+            max_retry_after=float(retry_config.get('max_retry_after_seconds', 120.0)),
+        )
+
+    def should_retry(self, attempt: int, error: BaseException) -> bool:
+        """
+        Whether to make another attempt after `error`.
+
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            error: The failure
+        """
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if not is_retryable_error(error):
+            return False
+
+        retry_after = get_retry_after(error)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            logger.warning(f"Retry-After of {retry_after:.0f}s exceeds {self.max_retry_after:.0f}s, not retrying")
+            return False
+
+        if not self.budget.try_spend():
+            logger.warning("Retry budget exhausted for this run, not retrying")
+            return False
+        return True
+
+    def next_delay(self, previous_delay: float, error: BaseException) -> float:
+        """Delay before the next attempt, given the previous delay."""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class CircuitBreaker:
+    """
+    Per-site circuit breaker.
+
+    After `failure_threshold` consecutive site-level failures the circuit opens
+    and requests fail immediately with CircuitOpenError. After `reset_timeout`
+    seconds a single probe request is let through (half-open); its outcome
+    closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError if a request to the site must not be sent now."""
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    self._rejected += 1
+                    raise CircuitOpenError(f"Circuit open for {self.name} after {self._failures} consecutive failures")
+                self.state = self.HALF_OPEN
+                self._probe_started = None
+                logger.info(f"Circuit for {self.name} half-open, sending probe request")
+
+            if self.state == self.HALF_OPEN:
+                # Allow one probe at a time; a stuck probe is replaced after reset_timeout
+                if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                    self._rejected += 1
+                    raise CircuitOpenError(f"Circuit half-open for {self.name}, probe in progress")
+                self._probe_started = now
+
+    def record_success(self) -> None:
+        """Record a request that reached a healthy site."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a site-level failure (5xx, timeout, throttling, failed scrape)."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures; "
+                               f"failing fast for {self.reset_timeout:.0f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'rejected': self._rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Process-wide registry of circuit breakers keyed by site."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def for_site(self, site_name: str) -> CircuitBreaker:
+        """Get the breaker for a site, creating it from settings.yaml on first use."""
+        with self._lock:
+            breaker = self._breakers.get(site_name)
+            if breaker is None:
+                breaker_config = config.settings.get('crawling', {}).get('circuit_breaker', {}) or {}
+                breaker = CircuitBreaker(
+                    name=site_name,
+                    failure_threshold=int(breaker_config.get('failure_threshold', 5)),
+                    reset_timeout=float(breaker_config.get('reset_timeout_seconds', 60.0)),
+                )
+                self._breakers[site_name] = breaker
+        return breaker
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """State of every breaker, keyed by site."""
+        with self._lock:
+            return {name: b.get_stats() for name, b in self._breakers.items()}
+
+
+# Process-wide retry budget (created lazily from settings.yaml)
+_retry_budget: Optional[RetryBudget] = None
+
+
+def get_retry_budget() -> RetryBudget:
+    """Get the retry budget shared by every crawler in the process."""
+    global _retry_budget
+    if _retry_budget is None:
+        retry_config = config.settings.get('crawling', {}).get('retry', {}) or {}
+        _retry_budget = RetryBudget(
+            ratio=float(retry_config.get('budget_ratio', 0.2)),
+            min_retries=int(retry_config.get('min_retry_budget', 10)),
+        )
+    return _retry_budget
+
+
+# Global registry instance
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,261 @@
+import asyncio
+import csv
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.crawlers.base_crawler import BaseCrawler, CrawlResult, firecrawl_requests
+from src.crawlers.concurrency import report_concurrency
+from src.utils.logger import get_logger
+from src.utils.config import config
+from src.utils.failure_cache import report_failures
+from src.utils.firecrawl_cache import report_cache_metrics
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CrawlJob:
+    """A single URL to crawl, with the products.csv row it came from."""
+    site: str
+    url: str
+    index: int = 0
+    row: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ScheduledResult:
+    """Outcome of a scheduled crawl job."""
+    job: CrawlJob
+    result: CrawlResult
+
+
+CrawlerFactory = Callable[[str, Dict[str, Any]], BaseCrawler]
+ResultCallback = Callable[[ScheduledResult], Optional[Awaitable[None]]]
+
+
+def load_jobs_from_csv(products_file: str = "config/products.csv",
+                       sites: Optional[List[str]] = None) -> List[CrawlJob]:
+    """
+    Load crawl jobs from products.csv.
+
+    Products marked 'removed' (gone from the sitemap, see parse_sitemaps.py
+    --incremental) are skipped.
+
+    Args:
+        products_file: Path to the products CSV
+        sites: Only include these sites (default: every site configured in sites.yaml)
+    """
+    products_path = Path(products_file)
+    if not products_path.exists():
+        logger.error(f"Products file not found: {products_path}")
+        return []
+
+    allowed_sites = set(sites) if sites is not None else set(config.get_site_names())
+
+    jobs = []
+    removed = 0
+    with open(products_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            site = row.get('site')
+            url = row.get('product_url')
+            if row.get('status') == 'removed':
+                removed += 1
+            elif site in allowed_sites and url:
+                jobs.append(CrawlJob(site=site, url=url, index=len(jobs), row=row))
+
+    logger.info(f"Loaded {len(jobs)} crawl jobs from {products_path}"
+                f"{f' ({removed} removed products skipped)' if removed else ''}")
+    return jobs
+
+
+def load_jobs_from_diff(delta_file: str, sites: Optional[List[str]] = None) -> List[CrawlJob]:
+    """
+    Load crawl jobs for the products a sitemap diff found added or modified.
+
+    Removed products are not crawled. Each job's row has the products.csv
+    columns, so results can be handled as for load_jobs_from_csv.
+
+    Args:
+        delta_file: Delta CSV written by SitemapParser.diff_sitemap
+        sites: Only include these sites (default: every site configured in sites.yaml)
+    """
+    delta_path = Path(delta_file)
+    if not delta_path.exists():
+        logger.error(f"Sitemap delta not found: {delta_path}")
+        return []
+
+    allowed_sites = set(sites) if sites is not None else set(config.get_site_names())
+
+    jobs = []
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            site = row.get('site')
+            url = row.get('product_url')
+            if site in allowed_sites and url and row.get('change') in ('added', 'modified'):
+                product_row = {
+                    'site': site,
+                    'product_url': url,
+                    'status': 'pending',
+                    'category': row.get('category', ''),
+                    'breadcrumb': row.get('breadcrumb', ''),
+                }
+                jobs.append(CrawlJob(site=site, url=url, index=len(jobs), row=product_row))
+
+    logger.info(f"Loaded {len(jobs)} crawl jobs for changed products from {delta_path}")
+    return jobs
+
+
+def update_product_statuses(statuses: Dict[str, str],
+                            products_file: str = "config/products.csv") -> int:
+    """
+    Write crawl outcomes back to the `status` column of products.csv.
+
+    Args:
+        statuses: New status per product URL
+        products_file: Path to the products CSV
+
+    Returns:
+        Number of rows whose status changed
+    """
+    products_path = Path(products_file)
+    if not products_path.exists() or not statuses:
+        return 0
+
+    with open(products_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        rows = list(reader)
+
+    changed = 0
+    for row in rows:
+        status = statuses.get(row.get('product_url'))
+        if status and row.get('status') != status:
+            row['status'] = status
+            changed += 1
+
+    if changed:
+        with open(products_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        logger.info(f"Updated status of {changed} products in {products_path}")
+
+    return changed
+
+
+class CrawlScheduler:
+    """
+    Runs crawl jobs for all sites concurrently.
+
+    Every site gets its own work queue, crawler and pool of workers. Workers pull
+    the next URL as soon as they finish the previous one, so there are no batch
+    barriers, and sites never wait on each other. Per-site request rates are
+    enforced by the shared host rate limiters used by each crawler, and the
+    number of busy workers follows the site's adaptive concurrency window.
+    """
+
+    def __init__(self, crawler_factory: CrawlerFactory):
+        """
+        Initialize the scheduler.
+
+        Args:
+            crawler_factory: Callable building a crawler from (site_name, site_config)
+        """
+        self.crawler_factory = crawler_factory
+        self._jobs: List[CrawlJob] = []
+
+    def add_jobs(self, jobs: List[CrawlJob]) -> None:
+        """Queue jobs for the next run."""
+        self._jobs.extend(jobs)
+
+    async def _run_site(self, site: str, queue: asyncio.Queue,
+                        results: List[Optional[ScheduledResult]],
+                        on_result: Optional[ResultCallback]) -> None:
+        """Drain one site's queue with its own crawler and worker pool."""
+        site_config = config.get_site_config(site)
+        if site_config is None:
+            logger.warning(f"No configuration for site '{site}', skipping {queue.qsize()} jobs")
+            while not queue.empty():
+                job = queue.get_nowait()
+                results[job.index] = ScheduledResult(
+                    job=job,
+                    result=CrawlResult(success=False, error_message=f"Unknown site: {site}", url=job.url)
+                )
+            return
+
+        crawler = self.crawler_factory(site, site_config)
+        controller = crawler.concurrency
+        start = time.monotonic()
+        logger.info(f"Starting {site}: {queue.qsize()} URLs, concurrency window "
+                    f"{controller.window} (max {controller.max_limit})")
+
+        async def worker() -> None:
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                try:
+                    async with controller.slot():
+                        result = await crawler.crawl_product(job.url)
+                except Exception as e:
+                    logger.error(f"Unexpected error crawling {job.url}: {e}")
+                    result = CrawlResult(success=False, error_message=str(e), url=job.url)
+
+                scheduled = ScheduledResult(job=job, result=result)
+                results[job.index] = scheduled
+
+                if on_result is not None:
+                    callback_result = on_result(scheduled)
+                    if asyncio.iscoroutine(callback_result):
+                        await callback_result
+
+        # Start enough workers for the largest window; the controller decides how many run
+        await asyncio.gather(*[worker() for _ in range(controller.max_limit)])
+        logger.info(f"Finished {site} in {time.monotonic() - start:.1f}s "
+                    f"(concurrency window: {controller.window})")
+
+        # Results were already delivered; let background refreshes of stale cache entries land
+        await crawler.wait_for_refreshes()
+
+    async def run(self, on_result: Optional[ResultCallback] = None) -> List[ScheduledResult]:
+        """
+        Crawl every queued job.
+
+        Args:
+            on_result: Optional callback (sync or async) invoked as each job completes
+
+        Returns:
+            Results in the order the jobs were added
+        """
+        jobs, self._jobs = self._jobs, []
+
+        # Group jobs into one queue per site, indexing them so results keep job order
+        queues: Dict[str, asyncio.Queue] = {}
+        for position, job in enumerate(jobs):
+            job.index = position
+            queues.setdefault(job.site, asyncio.Queue()).put_nowait(job)
+
+        results: List[Optional[ScheduledResult]] = [None] * len(jobs)
+
+        logger.info(f"Scheduling {len(jobs)} jobs across {len(queues)} sites: "
+                    f"{', '.join(f'{site}={q.qsize()}' for site, q in queues.items())}")
+
+        await asyncio.gather(*[
+            self._run_site(site, queue, results, on_result)
+            for site, queue in queues.items()
+        ])
+
+        completed = [r for r in results if r is not None]
+        successful = sum(1 for r in completed if r.result.success)
+        flight_stats = firecrawl_requests.get_stats()
+        logger.info(f"Scheduler completed: {successful}/{len(completed)} successful "
+                    f"(Firecrawl scrapes: {flight_stats['executed']}, coalesced duplicates: {flight_stats['coalesced']})")
+        report_concurrency()
+        report_cache_metrics()
+        report_failures()
+        return completed
@@ -0,0 +1,130 @@
+"""
+Compiled keyword matching of sitemap entries to product categories.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+_MISSING = object()
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """
+    Regex matching any of the keywords, factored as a trie.
+
+    Keywords sharing a prefix share its branch ("filter|filtre" becomes
+    "filt(?:er|re)"), so at each position the regex engine follows one branch
+    per character instead of trying every keyword in turn.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A keyword ending here makes the rest of the branch optional
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class CategoryMatcher:
+    """
+    Finds the category of a breadcrumb text with one compiled regex.
+
+    Every keyword of every category is compiled into a single trie-shaped
+    pattern. Keywords match case-insensitively at the start of a word: "oil"
+    matches "Oil", "oils" and "engine oil" but not "foil". Spaces in a keyword
+    match any whitespace.
+
+    When a text matches keywords of several categories, the category listed
+    first in categories.yaml wins, as with the previous keyword loop.
+
+    Results are memoized by text, since sitemap breadcrumbs repeat across all
+    the products of a category, and that is where the speed comes from: on
+    `scripts/benchmark_sitemap.py --entries 200000` the compiled regex alone is
+    only 1.2x faster than the keyword loop, and 7.9x faster once memoized.
+    A single finditer pass with one group per category, alternated in
+    priority order, was slower than the keyword loop (0.84s against 0.67s
+    for 200k breadcrumbs), so the matcher keeps one trie and a search loop.
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, Any]], cache_size: int = 100000):
+        """
+        Compile the matcher.
+
+        Args:
+            categories: Category configs by name, in priority order (the `categories` block of categories.yaml)
+            cache_size: Distinct texts whose result is memoized (0 disables memoization)
+        """
+        self.category_names: List[str] = []
+        # Priority (index into category_names) of the best category of each keyword
+        keyword_priority: Dict[str, int] = {}
+        for category_name, category_config in categories.items():
+            keywords = [' '.join(keyword.lower().split()) for keyword in category_config.get('keywords') or []]
+            keywords = [keyword for keyword in keywords if keyword]
+            if not keywords:
+                continue
+            for keyword in keywords:
+                keyword_priority.setdefault(keyword, len(self.category_names))
+            self.category_names.append(category_name)
+
+        # The regex reports the longest keyword at a position; every shorter keyword that is
+        # a prefix of it matches there too, so each keyword stands for the best of its prefixes
+        self._priorities: Dict[str, int] = {
+            keyword: min(priority for prefix, priority in keyword_priority.items() if keyword.startswith(prefix))
+            for keyword in keyword_priority
+        }
+        self._pattern: Optional[re.Pattern] = (
+            re.compile(_trie_pattern(list(keyword_priority))) if keyword_priority else None
+        )
+        self.cache_size = cache_size
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def match(self, text: str) -> Optional[str]:
+        """Highest-priority category with a keyword in the text, or None."""
+        if self.cache_size <= 0:
+            return self._match(text)
+        category = self._cache.get(text, _MISSING)
+        if category is _MISSING:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            category = self._cache[text] = self._match(text)
+        return category
+
+    def _match(self, text: str) -> Optional[str]:
+        if self._pattern is None:
+            return None
+        text = text.lower()
+        search = self._pattern.search
+        best: Optional[int] = None
+        position = 0
+        while True:
+            # Searching again from the next character (rather than finditer) also finds
+            # keywords that overlap a previous match, e.g. "oil" inside "engine oil"
+            found = search(text, position)
+            if found is None:
+                break
+            start = found.start()
+            position = start + 1
+            # Keywords only match at the start of a word
+            if start and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                continue
+            keyword = found.group()
+            priority = self._priorities.get(keyword)
+            if priority is None:
+                priority = self._priorities[' '.join(keyword.split())]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return self.category_names[best] if best is not None else None
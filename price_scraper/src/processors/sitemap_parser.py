@@ -1,16 +1,40 @@
 import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from email.utils import formatdate
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Deque, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, cast
 import csv
+import gzip
+import hashlib
+import itertools
+import os
 import yaml
 import html
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from urllib.parse import urlparse
 
+import requests
+
+from src.processors.category_matcher import CategoryMatcher
+from src.processors.sitemap_state import IncompleteSitemapError, SitemapDiff, SitemapState
 from src.utils.logger import get_logger
+from src.utils.url_canonical import canonicalize_url
 
 logger = get_logger(__name__)
 
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Malformed entities found in retailer sitemaps and their fixes
+MALFORMED_ENTITIES = {
+    b'&gtgt;': b'&gt;',  # Fix double gt entity
+    b'&ltlt;': b'&lt;',  # Fix double lt entity if any
+}
+
 
 @dataclass
 class SitemapEntry:
@@ -19,16 +43,158 @@ class SitemapEntry:
     breadcrumb_eng: str
     breadcrumb_local: str
     category: Optional[str] = None
+    lastmod: Optional[str] = None
+
+
+@dataclass
+class ParseProgress:
+    """How far a sitemap stream has been read."""
+    entries: int = 0
+    bytes_read: int = 0
+    total_bytes: Optional[int] = None
+    stopped_early: bool = False  # Reading stopped before the end because every category was full
+    failures: List[str] = field(default_factory=list)  # Sitemap files that could not be fetched or fully parsed
+    
+    @property
+    def fraction(self) -> Optional[float]:
+        """Share of the file read so far, if its size is known."""
+        if not self.total_bytes:
+            return None
+        return min(1.0, self.bytes_read / self.total_bytes)
+    
+    def describe(self) -> str:
+        """Entries and share of the file read, for logs."""
+        fraction = self.fraction
+        return f"{self.entries} entries" + (f" ({fraction:.1%} of the file)" if fraction is not None else "")
+
+
+class EntityFixingReader:
+    """
+    Binary file wrapper that fixes malformed entities while the file is read.
+    
+    Leading whitespace (which XML does not allow before the declaration) is
+    skipped. A few bytes are held back at the end of each chunk so an entity
+    split across two reads is still fixed.
+    """
+    
+    def __init__(self, raw: BinaryIO, chunk_size: int = 1024 * 1024):
+        self.raw = raw
+        self.chunk_size = chunk_size
+        self._tail = b''
+        self._started = False
+        self._holdback = max(len(entity) for entity in MALFORMED_ENTITIES) - 1
+    
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            chunk = self.raw.read(self.chunk_size if size is None or size < 0 else max(size, self.chunk_size))
+            end_of_file = not chunk
+            if not self._started:
+                chunk = chunk.lstrip()
+                self._started = bool(chunk)
+            data = self._tail + chunk
+            for malformed, fixed in MALFORMED_ENTITIES.items():
+                data = data.replace(malformed, fixed)
+            if end_of_file:
+                self._tail = b''
+                return data
+            self._tail = data[-self._holdback:]
+            data = data[:-self._holdback]
+            if data:
+                return data
+
+
+def _open_sitemap(raw: BinaryIO) -> BinaryIO:
+    """Decompressing stream over a sitemap file if it is gzipped, otherwise the file itself."""
+    is_gzip = raw.read(2) == GZIP_MAGIC
+    raw.seek(0)
+    return cast(BinaryIO, gzip.GzipFile(fileobj=raw, mode='rb')) if is_gzip else raw
+
+
+def _sitemap_stem(path: Path) -> str:
+    """File name of a sitemap without its .xml/.gz extensions ("sitemap_index.xml.gz" -> "sitemap_index")."""
+    name = path.name
+    for suffix in ('.gz', '.xml'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+def _download_name(url: str) -> str:
+    """
+    Local file name of a downloaded sitemap, unique per URL.
+    
+    Shards often share a basename under different paths or queries
+    (/de/sitemap.xml.gz, /fr/sitemap.xml.gz, sitemap.xml?page=2), so the name
+    is prefixed with a hash of the whole URL.
+    """
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+    return f"{digest}_{Path(urlparse(url).path).name or 'sitemap.xml'}"
+
+
+def _is_sitemap_index(path: Path) -> bool:
+    """Whether a sitemap file is a sitemap index (<sitemapindex>) rather than a <urlset>."""
+    with open(path, 'rb') as raw:
+        for _, elem in ET.iterparse(EntityFixingReader(_open_sitemap(raw), chunk_size=64 * 1024), events=('start',)):
+            return bool(elem.tag == f"{{{SITEMAP_NAMESPACE}}}sitemapindex")
+    return False
+
+
+# Parser of a worker process, created once per process (see SitemapParser.process_sitemap)
+_worker_parser: Optional["SitemapParser"] = None
+
+
+def _get_worker_parser(categories: Dict) -> "SitemapParser":
+    """Parser of this worker process, using the categories of the parent's parser."""
+    global _worker_parser
+    if _worker_parser is None or _worker_parser.categories != categories:
+        _worker_parser = SitemapParser(categories=categories)
+    return _worker_parser
+
+
+def _filter_shard(categories: Dict, shard: str) -> Tuple[Dict[str, List["SitemapEntry"]], "ParseProgress"]:
+    """Filter one sitemap shard by category in a worker process."""
+    parser = _get_worker_parser(categories)
+    progress = ParseProgress(total_bytes=Path(shard).stat().st_size)
+    entries = parser._iter_file(shard, progress)
+    categorized = parser.filter_by_categories(entries, progress)
+    entries.close()
+    return categorized, progress
+
+
+def _categorize_shard(categories: Dict, shard: str) -> Tuple[List["SitemapEntry"], "ParseProgress"]:
+    """
+    Categorize every entry of one sitemap shard in a worker process.
+    
+    Only entries in a configured category are returned: most of a catalog is
+    outside them, and sending every entry back to the parent costs more than
+    parsing it.
+    """
+    parser = _get_worker_parser(categories)
+    progress = ParseProgress()
+    return list(parser._iter_categorized(parser._iter_file(shard, progress))), progress
 
 
 class SitemapParser:
-    """Parses XML sitemaps and extracts product URLs by category."""
+    """
+    Parses XML sitemaps and extracts product URLs by category.
+    
+    A sitemap can be a single <urlset> file or a sitemap index pointing to
+    shards, and any of them may be gzipped (detected from the content, not
+    the file name). Sitemaps given by URL are downloaded to data/xml/<site>/
+    and shards listed by URL next to their index. Downloaded copies are
+    revalidated on every run: a shard whose lastmod in the index is older than
+    its copy is reused as is, anything else is fetched with a conditional GET
+    (If-Modified-Since), so only changed files are transferred. With several
+    workers, shards are parsed in parallel in a process pool and the results
+    are merged in index order, so they match a sequential run.
+    """
     
-    def __init__(self, categories_config_path: str = "config/categories.yaml"):
-        """Initialize the sitemap parser."""
+    def __init__(self, categories_config_path: str = "config/categories.yaml", categories: Optional[Dict] = None):
+        """Initialize the sitemap parser (with `categories`, the config file is not read)."""
         self.categories_config_path = Path(categories_config_path)
-        self.categories = self._load_categories()
-        
+        self.categories = categories if categories is not None else self._load_categories()
+        self.matcher = CategoryMatcher(self.categories)
+    
     def _load_categories(self) -> Dict:
         """Load category configuration from YAML file."""
         try:
@@ -44,73 +210,282 @@ class SitemapParser:
     
     def parse_xml_file(self, xml_file_path: str) -> List[SitemapEntry]:
         """Parse XML sitemap file and extract all entries."""
-        xml_path = Path(xml_file_path)
+        return list(self.iter_entries(xml_file_path))
+    
+    def sitemap_files(self, xml_file_path: str, failures: Optional[List[str]] = None,
+                      site_name: Optional[str] = None) -> List[str]:
+        """
+        Sitemap files holding the entries of a sitemap, in order.
+        
+        A <urlset> file is returned as is; a sitemap index is expanded
+        (recursively) into its shards, downloading shards given by URL.
+        
+        Args:
+            xml_file_path: Sitemap or sitemap index (file path or http(s) URL)
+            failures: Appended with the sitemaps and shards that had to be skipped
+            site_name: Site the sitemap belongs to; a sitemap URL is downloaded to data/xml/<site_name>/
         
+        Returns:
+            Local sitemap files; empty if the sitemap cannot be found
+        """
+        failures = failures if failures is not None else []
+        if xml_file_path.startswith(('http://', 'https://')):
+            downloaded = self._download(xml_file_path, Path("data/xml", site_name) if site_name else Path("data/xml"),
+                                        None)
+            if downloaded is None:
+                failures.append(xml_file_path)
+                return []
+            xml_file_path = downloaded
+        
+        xml_path = Path(xml_file_path)
         if not xml_path.exists():
             logger.error(f"XML file not found: {xml_file_path}")
+            failures.append(xml_file_path)
             return []
         
         try:
-            # Read and clean the XML content to handle leading whitespace and malformed entities
-            with open(xml_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-            
-            # Fix common malformed entities
-            content = content.replace('&gtgt;', '&gt;')  # Fix double gt entity
-            content = content.replace('&ltlt;', '&lt;')  # Fix double lt entity if any
-            
-            # Parse the cleaned content
-            root = ET.fromstring(content)
-            
-            # Handle namespace
-            namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            entries = []
-            urls = root.findall('.//ns:url', namespace)
-            
-            for url_elem in urls:
-                loc_elem = url_elem.find('ns:loc', namespace)
-                # Breadcrumb elements ARE namespaced (contrary to your example structure)
-                breadcrumb_eng_elem = url_elem.find('ns:breadCrumb_eng', namespace)  
-                breadcrumb_local_elem = url_elem.find('ns:breadCrumb_local', namespace)
-                
-                if loc_elem is not None:
-                    entry = SitemapEntry(
-                        url=loc_elem.text.strip(),
-                        breadcrumb_eng=html.unescape(breadcrumb_eng_elem.text.strip()) if breadcrumb_eng_elem is not None else "",
-                        breadcrumb_local=html.unescape(breadcrumb_local_elem.text.strip()) if breadcrumb_local_elem is not None else ""
-                    )
-                    entries.append(entry)
-            
-            logger.info(f"Parsed {len(entries)} entries from {xml_file_path}")
-            return entries
-            
+            is_index = _is_sitemap_index(xml_path)
+        except (ET.ParseError, OSError, EOFError) as e:
+            logger.error(f"Error reading XML file {xml_file_path}: {e}")
+            failures.append(xml_file_path)
+            return []
+        if not is_index:
+            return [str(xml_path)]
+        
+        shards = []
+        for location, lastmod in self._index_entries(xml_path):
+            if location.startswith(('http://', 'https://')):
+                shard_dir = xml_path.parent / f"{_sitemap_stem(xml_path)}_shards"
+                shard = self._download(location, shard_dir, lastmod)
+            else:
+                shard = str(xml_path.parent / location)
+            if shard is None:
+                failures.append(location)
+            else:
+                shards.extend(self.sitemap_files(shard, failures, site_name))
+        logger.info(f"Sitemap index {xml_file_path} lists {len(shards)} sitemap files")
+        return shards
+    
+    @staticmethod
+    def _index_entries(index_path: Path) -> List[Tuple[str, Optional[str]]]:
+        """Location and lastmod of each <sitemap> in a sitemap index."""
+        namespace = {'ns': SITEMAP_NAMESPACE}
+        sitemap_tag = f"{{{SITEMAP_NAMESPACE}}}sitemap"
+        entries = []
+        with open(index_path, 'rb') as raw:
+            for _, elem in ET.iterparse(EntityFixingReader(_open_sitemap(raw))):
+                if elem.tag != sitemap_tag:
+                    continue
+                location = (elem.findtext('ns:loc', '', namespace) or '').strip()
+                lastmod = (elem.findtext('ns:lastmod', '', namespace) or '').strip() or None
+                if location:
+                    entries.append((location, lastmod))
+                elem.clear()
+        return entries
+    
+    @staticmethod
+    def _download(url: str, directory: Path, lastmod: Optional[str]) -> Optional[str]:
+        """
+        Download a sitemap file, or revalidate an existing copy.
+        
+        A copy newer than the lastmod the index gives for it is used without
+        a request. Otherwise the file is requested with If-Modified-Since set
+        to the copy's mtime, and the copy is kept if the server answers 304.
+        """
+        target = directory / _download_name(url)
+        headers = {}
+        if target.exists():
+            try:
+                modified = datetime.fromisoformat(lastmod.replace('Z', '+00:00')) if lastmod else None
+            except ValueError:
+                modified = None
+            if modified is not None and target.stat().st_mtime >= modified.timestamp():
+                return str(target)
+            headers['If-Modified-Since'] = formatdate(target.stat().st_mtime, usegmt=True)
+        
+        directory.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".part")
+        try:
+            logger.info(f"{'Revalidating' if headers else 'Downloading'} sitemap {url}")
+            with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+                if response.status_code == 304:
+                    logger.info(f"Sitemap {url} not modified since {target}")
+                    return str(target)
+                response.raise_for_status()
+                with open(partial, 'wb') as f:
+                    # Saved as served; gzip shards stay compressed and are decompressed while parsing
+                    for chunk in response.raw.stream(1024 * 1024, decode_content=False):
+                        f.write(chunk)
+            os.replace(partial, target)
+        except (requests.RequestException, OSError) as e:
+            logger.error(f"Could not download sitemap {url}: {e}")
+            partial.unlink(missing_ok=True)
+            return str(target) if target.exists() else None
+        return str(target)
+    
+    def iter_entries(self, xml_file_path: str, progress: Optional[ParseProgress] = None,
+                     site_name: Optional[str] = None) -> Iterator[SitemapEntry]:
+        """
+        Stream the entries of an XML sitemap, a gzipped one or a sitemap index.
+        
+        Files are parsed incrementally and each <url> element is discarded
+        once its entry is yielded, so memory use does not grow with the size
+        of the sitemap. The shards of an index are read one after the other.
+        Parse errors are logged and end the stream of that file; entries
+        before the error have already been yielded. Files that were skipped
+        or not read to the end are listed in `progress.failures`.
+        
+        Args:
+            xml_file_path: Sitemap file, sitemap index or URL of either
+            progress: Updated with the entries and bytes read as the stream advances
+            site_name: Site the sitemap belongs to (see sitemap_files)
+        
+        Yields:
+            One SitemapEntry per <url> element with a <loc>
+        """
+        progress = progress or ParseProgress()
+        shards = self.sitemap_files(xml_file_path, progress.failures, site_name)
+        return self._iter_shards(shards, progress)
+    
+    def _iter_shards(self, shards: List[str], progress: ParseProgress) -> Generator[SitemapEntry, None, None]:
+        """Stream the entries of local sitemap files one after the other."""
+        progress.total_bytes = sum(Path(shard).stat().st_size for shard in shards)
+        offset = 0
+        for shard in shards:
+            yield from self._iter_file(shard, progress, offset)
+            offset += Path(shard).stat().st_size
+    
+    def _iter_file(self, xml_file_path: str, progress: ParseProgress,
+                   offset: int = 0) -> Generator[SitemapEntry, None, None]:
+        """Stream the entries of one (possibly gzipped) <urlset> file."""
+        url_tag = f"{{{SITEMAP_NAMESPACE}}}url"
+        count = 0
+        try:
+            with open(xml_file_path, 'rb') as raw:
+                root = None
+                for event, elem in ET.iterparse(EntityFixingReader(_open_sitemap(raw)), events=('start', 'end')):
+                    if root is None:
+                        root = elem
+                    if event != 'end' or elem.tag != url_tag:
+                        continue
+                    
+                    entry = self._entry_from_element(elem)
+                    if entry is not None:
+                        count += 1
+                        progress.entries += 1
+                        # Position in the file as stored (compressed for gzip files)
+                        progress.bytes_read = offset + raw.tell()
+                        yield entry
+                    # Drop processed elements so the tree never holds more than the current <url>
+                    root.clear()
+        
         except ET.ParseError as e:
             logger.error(f"Error parsing XML file {xml_file_path}: {e}")
-            return []
+            progress.failures.append(xml_file_path)
         except Exception as e:
             logger.error(f"Unexpected error parsing {xml_file_path}: {e}")
-            return []
+            progress.failures.append(xml_file_path)
+        
+        logger.info(f"Parsed {count} entries from {xml_file_path}")
     
-    def categorize_entry(self, entry: SitemapEntry) -> Optional[str]:
-        """Determine which category an entry belongs to based on breadcrumbs."""
-        breadcrumb_text = f"{entry.breadcrumb_eng} {entry.breadcrumb_local}".lower()
+    def iter_categorized_entries(self, xml_file_path: str, workers: int = 1, progress: Optional[ParseProgress] = None,
+                                 site_name: Optional[str] = None) -> Iterator[SitemapEntry]:
+        """
+        Stream the entries of a sitemap that belong to a configured category.
         
-        for category_name, category_config in self.categories.items():
-            keywords = category_config.get('keywords', [])
-            
-            for keyword in keywords:
-                if keyword.lower() in breadcrumb_text:
-                    return category_name
+        Category limits do not apply. Each entry has its `category` set, and
+        entries come in sitemap order. With several workers, the shards of a
+        sitemap index are parsed and categorized in a process pool. At most
+        two shards per worker are processed ahead of the consumer.
+        
+        Args:
+            xml_file_path: Sitemap file, sitemap index or URL of either
+            workers: Worker processes (1 parses in this process)
+            progress: Updated with the entries read and the files that failed
+            site_name: Site the sitemap belongs to (see sitemap_files)
+        """
+        progress = progress or ParseProgress()
+        shards = self.sitemap_files(xml_file_path, progress.failures, site_name)
+        if workers <= 1 or len(shards) <= 1:
+            yield from self._iter_categorized(self._iter_shards(shards, progress))
+            return
         
-        return None
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            pending: Deque[Future[Tuple[List[SitemapEntry], ParseProgress]]] = deque()
+            shard_iter = iter(shards)
+            for shard in itertools.islice(shard_iter, 2 * workers):
+                pending.append(executor.submit(_categorize_shard, self.categories, shard))
+            while pending:
+                entries, shard_progress = pending.popleft().result()
+                progress.entries += shard_progress.entries
+                progress.failures.extend(shard_progress.failures)
+                next_shard = next(shard_iter, None)
+                if next_shard is not None:
+                    pending.append(executor.submit(_categorize_shard, self.categories, next_shard))
+                yield from entries
     
-    def filter_by_categories(self, entries: List[SitemapEntry]) -> Dict[str, List[SitemapEntry]]:
-        """Filter entries by categories and apply limits."""
-        categorized = {}
+    def _iter_categorized(self, entries: Iterable[SitemapEntry]) -> Iterator[SitemapEntry]:
+        """Entries that belong to a category, with their category set."""
+        for entry in entries:
+            entry.category = self.categorize_entry(entry)
+            if entry.category:
+                yield entry
+    
+    @staticmethod
+    def _entry_from_element(url_elem: ET.Element) -> Optional[SitemapEntry]:
+        """Build an entry from a <url> element, or None if it has no <loc>."""
+        namespace = {'ns': SITEMAP_NAMESPACE}
+        loc_elem = url_elem.find('ns:loc', namespace)
+        if loc_elem is None or not loc_elem.text:
+            return None
         
+        # Breadcrumb elements ARE namespaced (contrary to your example structure)
+        breadcrumb_eng_elem = url_elem.find('ns:breadCrumb_eng', namespace)
+        breadcrumb_local_elem = url_elem.find('ns:breadCrumb_local', namespace)
+        lastmod_elem = url_elem.find('ns:lastmod', namespace)
+        return SitemapEntry(
+            url=loc_elem.text.strip(),
+            breadcrumb_eng=html.unescape((breadcrumb_eng_elem.text or '').strip()) if breadcrumb_eng_elem is not None else "",
+            breadcrumb_local=html.unescape((breadcrumb_local_elem.text or '').strip()) if breadcrumb_local_elem is not None else "",
+            lastmod=((lastmod_elem.text or '').strip() or None) if lastmod_elem is not None else None
+        )
+    
+    def categorize_entry(self, entry: SitemapEntry) -> Optional[str]:
+        """Determine which category an entry belongs to based on breadcrumbs (see CategoryMatcher)."""
+        return self.matcher.match(f"{entry.breadcrumb_eng}\n{entry.breadcrumb_local}")
+    
+    def filter_by_categories(self, entries: Iterable[SitemapEntry], progress: Optional[ParseProgress] = None,
+                             log_every: int = 100000) -> Dict[str, List[SitemapEntry]]:
+        """
+        Filter entries by categories and apply limits.
         
-        for entry in entries:
+        Entries are consumed lazily and consumption stops as soon as every
+        category has reached its limit, so with a stream from iter_entries
+        the rest of the sitemap is never parsed.
+        
+        Args:
+            entries: Entries to filter (a list or a stream)
+            progress: Progress of the stream, for progress logs; marked when stopping early
+            log_every: Log progress every this many entries
+        
+        Returns:
+            Entries by category, at most `limit` per category
+        """
+        categorized: Dict[str, List[SitemapEntry]] = {}
+        # Categories without keywords can never match, so they never hold up the early stop
+        open_categories = {
+            name for name, category_config in self.categories.items()
+            if category_config.get('keywords') and category_config.get('limit', 10) > 0
+        }
+        
+        scanned = 0
+        stopped = False
+        for entry in entries if open_categories else ():
+            scanned += 1
+            if scanned % log_every == 0:
+                logger.info(f"Scanned {progress.describe() if progress is not None else f'{scanned} entries'}, "
+                            f"{len(open_categories)} categories still below their limit")
+            
             category = self.categorize_entry(entry)
             if category:
                 entry.category = category
@@ -121,6 +496,17 @@ class SitemapParser:
                 category_limit = self.categories[category].get('limit', 10)
                 if len(categorized[category]) < category_limit:
                     categorized[category].append(entry)
+                    if len(categorized[category]) >= category_limit:
+                        open_categories.discard(category)
+                        if not open_categories:
+                            stopped = True
+                            break
+        
+        if stopped:
+            if progress is not None:
+                progress.stopped_early = True
+            logger.info(f"Every category limit reached after "
+                        f"{progress.describe() if progress is not None else f'{scanned} entries'}; stopped reading")
         
         # Log statistics
         for category, category_entries in categorized.items():
@@ -164,13 +550,17 @@ class SitemapParser:
                         'breadcrumb': entry.breadcrumb_eng
                     })
         
-        # Combine existing and new entries, removing duplicates by URL
+        # Combine existing and new entries, removing duplicates by canonical URL
         all_entries = existing_entries.copy()
-        existing_urls = {entry.get('product_url') for entry in existing_entries}
+        existing_urls = {canonicalize_url(entry.get('product_url') or '') for entry in existing_entries}
         
+        added = 0
         for new_entry in new_entries:
-            if new_entry['product_url'] not in existing_urls:
+            canonical_url = canonicalize_url(new_entry['product_url'])
+            if canonical_url not in existing_urls:
+                existing_urls.add(canonical_url)
                 all_entries.append(new_entry)
+                added += 1
         
         # Write updated CSV
         try:
@@ -181,8 +571,9 @@ class SitemapParser:
                 writer.writerows(all_entries)
             
             logger.info(f"Generated CSV with {len(all_entries)} total entries at {output_path}")
-            logger.info(f"Added {len(new_entries)} new entries for {site_name}")
-            
+            logger.info(f"Added {added} new entries for {site_name} "
+                        f"({len(new_entries) - added} already listed)")
+        
         except Exception as e:
             logger.error(f"Error writing CSV file: {e}")
     
@@ -204,27 +595,115 @@ class SitemapParser:
         
         return stats
     
-    def process_sitemap(self, xml_file_path: str, site_name: str) -> Dict:
-        """Main method to process a sitemap file."""
-        logger.info(f"Processing sitemap for {site_name}: {xml_file_path}")
+    def _filter_shards_parallel(self, shards: List[str],
+                                workers: int) -> Tuple[Dict[str, List[SitemapEntry]], ParseProgress]:
+        """
+        Filter shards by category in a process pool and merge the results.
         
-        # Parse XML file
-        entries = self.parse_xml_file(xml_file_path)
-        if not entries:
-            logger.warning(f"No entries found in {xml_file_path}")
-            return {}
+        Each shard is filtered with the full category limits; concatenating the
+        per-shard results in shard order and truncating to the limits gives the
+        entries a sequential run over all shards would have picked.
+        """
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            shard_results = list(executor.map(_filter_shard, itertools.repeat(self.categories), shards))
         
-        # Filter by categories
-        categorized_entries = self.filter_by_categories(entries)
+        categorized: Dict[str, List[SitemapEntry]] = {}
+        progress = ParseProgress(total_bytes=sum(Path(shard).stat().st_size for shard in shards))
+        for shard_categorized, shard_progress in shard_results:
+            progress.entries += shard_progress.entries
+            progress.bytes_read += shard_progress.bytes_read
+            progress.stopped_early = progress.stopped_early or shard_progress.stopped_early
+            progress.failures.extend(shard_progress.failures)
+            for category, entries in shard_categorized.items():
+                category_limit = self.categories[category].get('limit', 10)
+                merged = categorized.setdefault(category, [])
+                merged.extend(entries[:max(0, category_limit - len(merged))])
+        
+        for category, category_entries in categorized.items():
+            logger.info(f"Found {len(category_entries)} entries for category '{category}' "
+                        f"across {len(shards)} sitemap files")
+        return categorized, progress
+    
+    def process_sitemap(self, xml_file_path: str, site_name: str, workers: int = 1) -> Dict:
+        """
+        Main method to process a sitemap file.
+        
+        Args:
+            xml_file_path: Sitemap file, sitemap index or URL of either
+            site_name: Site the product URLs belong to
+            workers: Processes parsing the shards of a sitemap index in parallel
+        """
+        logger.info(f"Processing sitemap for {site_name}: {xml_file_path}")
+        
+        failures: List[str] = []
+        shards = self.sitemap_files(xml_file_path, failures, site_name)
+        if workers > 1 and len(shards) > 1:
+            # Every shard is parsed (up to the category limits), in parallel
+            categorized_entries, progress = self._filter_shards_parallel(shards, workers)
+            progress.failures = failures + progress.failures
+            if not progress.entries:
+                logger.warning(f"No entries found in {xml_file_path}")
+                return {}
+        else:
+            # Stream entries from the XML files
+            progress = ParseProgress(failures=failures)
+            # Closing the stream releases the open sitemap file when filtering stops early or fails
+            with closing(self._iter_shards(shards, progress)) as entries:
+                first_entry = next(entries, None)
+                if first_entry is None:
+                    logger.warning(f"No entries found in {xml_file_path}")
+                    return {}
+                
+                # Filter by categories (parsing stops once every category is full)
+                categorized_entries = self.filter_by_categories(itertools.chain([first_entry], entries), progress)
         
         # Generate CSV output
         self.generate_csv_output(categorized_entries, site_name)
         
         # Generate and return statistics
         stats = self.generate_statistics(categorized_entries, site_name)
+        stats['scan'] = {
+            'entries_scanned': progress.entries,
+            'bytes_read': progress.bytes_read,
+            'total_bytes': progress.total_bytes,
+            'stopped_early': progress.stopped_early,
+        }
         
         logger.info(f"Completed processing {site_name}: {stats['total_entries']} URLs extracted")
         return stats
+    
+    def diff_sitemap(self, xml_file_path: str, site_name: str, state: Optional[SitemapState] = None,
+                     delta_path: Optional[str] = None, workers: int = 1, save: bool = True) -> SitemapDiff:
+        """
+        Compare a sitemap with the state saved by the previous run for the site.
+        
+        Unlike process_sitemap, the whole sitemap is read and category limits do
+        not apply: every product in a configured category is tracked, so the
+        delta covers the full catalog. If any sitemap file could not be fetched
+        or fully parsed the diff is aborted, since its products would otherwise
+        count as removed.
+        
+        Args:
+            xml_file_path: Sitemap file, sitemap index or URL of either
+            site_name: Site the product URLs belong to
+            state: Sitemap state store (default: data/sitemap_state.sqlite3)
+            delta_path: Write the added, modified and removed product URLs to this CSV
+            workers: Processes parsing the shards of a sitemap index in parallel
+            save: Replace the saved state with this sitemap
+        
+        Returns:
+            Counts of changed entries and where the delta was written
+        """
+        logger.info(f"Diffing sitemap for {site_name}: {xml_file_path}")
+        state = state or SitemapState()
+        progress = ParseProgress()
+        
+        def categorized_entries() -> Iterator[SitemapEntry]:
+            yield from self.iter_categorized_entries(xml_file_path, workers, progress, site_name)
+            if progress.failures:
+                raise IncompleteSitemapError(progress.failures)
+        
+        return state.diff(site_name, categorized_entries(), delta_path=delta_path, save=save)
 
 
 def main():
@@ -0,0 +1,266 @@
+"""
+Persisted sitemap state for incremental catalog updates.
+
+The entries of each site's last processed sitemap are kept in SQLite, keyed
+by canonical product URL with a fingerprint of the entry (its lastmod and
+breadcrumbs). Diffing a new sitemap against that state yields only the
+product URLs that were added, removed or modified since, written to a delta
+CSV the crawl scheduler can load (see load_jobs_from_diff), so a daily
+refresh re-scrapes the catalog's churn rather than the whole catalog.
+
+Entries are staged in a temporary table and compared in SQL, so memory use
+does not depend on the size of the catalog.
+"""
+
+import csv
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.url_canonical import canonicalize_url
+
+logger = get_logger(__name__)
+
+ADDED = 'added'
+MODIFIED = 'modified'
+REMOVED = 'removed'
+
+DELTA_FIELDS = ['site', 'product_url', 'change', 'category', 'breadcrumb', 'lastmod']
+
+
+class IncompleteSitemapError(Exception):
+    """Raised by an entry stream when some sitemap files could not be read."""
+
+    def __init__(self, failures: List[str]):
+        self.failures = failures
+        super().__init__(f"{len(failures)} sitemap files could not be fetched or fully parsed: "
+                         f"{', '.join(failures[:3])}{', ...' if len(failures) > 3 else ''}")
+
+
+def entry_fingerprint(entry: Any) -> str:
+    """Fingerprint of what a sitemap says about a product: its lastmod and breadcrumbs."""
+    content = '\0'.join([entry.lastmod or '', entry.breadcrumb_eng, entry.breadcrumb_local])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class SitemapDiff:
+    """Changes between a site's previous and current sitemap."""
+    site: str
+    added: int = 0
+    modified: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    baseline: bool = False  # No earlier state: every entry counts as added
+    delta_path: Optional[str] = None  # CSV listing the changed product URLs
+    saved: bool = False  # Whether the state now reflects the current sitemap
+    aborted: Optional[str] = None  # Why the diff was rejected, if it was
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.modified + self.removed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'site': self.site,
+            'added': self.added,
+            'modified': self.modified,
+            'removed': self.removed,
+            'unchanged': self.unchanged,
+            'baseline': self.baseline,
+            'delta_path': self.delta_path,
+            'saved': self.saved,
+            'aborted': self.aborted,
+        }
+
+
+class SitemapState:
+    """SQLite store of the sitemap entries last seen for each site."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            site TEXT NOT NULL,
+            url TEXT NOT NULL,
+            product_url TEXT NOT NULL,
+            lastmod TEXT,
+            fingerprint TEXT NOT NULL,
+            category TEXT,
+            breadcrumb TEXT,
+            PRIMARY KEY (site, url)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS runs (
+            site TEXT NOT NULL,
+            run_at TEXT NOT NULL,
+            added INTEGER NOT NULL,
+            modified INTEGER NOT NULL,
+            removed INTEGER NOT NULL,
+            unchanged INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str = "data/sitemap_state.sqlite3", batch_size: int = 5000,
+                 max_removed_fraction: float = 0.5):
+        """
+        Open (or create) the state database.
+
+        Args:
+            db_path: SQLite database file
+            batch_size: Entries staged per insert
+            max_removed_fraction: Reject a diff removing more than this share of the known
+                entries, which usually means the sitemap was truncated or failed to parse
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.max_removed_fraction = max_removed_fraction
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def known_entries(self, site: str) -> int:
+        """Number of entries stored for a site."""
+        return self._conn.execute("SELECT COUNT(*) FROM entries WHERE site = ?", (site,)).fetchone()[0]
+
+    def _stage(self, entries: Iterable[Any]) -> int:
+        """Load the current entries into a temporary table, returning how many were staged."""
+        self._conn.execute("DROP TABLE IF EXISTS temp.current")
+        self._conn.execute("""
+            CREATE TEMP TABLE current (
+                url TEXT PRIMARY KEY,
+                product_url TEXT NOT NULL,
+                lastmod TEXT,
+                fingerprint TEXT NOT NULL,
+                category TEXT,
+                breadcrumb TEXT
+            ) WITHOUT ROWID
+        """)
+        staged = 0
+        batch = []
+        self._conn.execute("BEGIN")
+        try:
+            for entry in entries:
+                batch.append((canonicalize_url(entry.url), entry.url, entry.lastmod, entry_fingerprint(entry),
+                              entry.category, entry.breadcrumb_eng))
+                if len(batch) >= self.batch_size:
+                    # The first URL listed for a page wins, as in products.csv
+                    self._conn.executemany("INSERT OR IGNORE INTO current VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    staged += len(batch)
+                    batch = []
+            self._conn.executemany("INSERT OR IGNORE INTO current VALUES (?, ?, ?, ?, ?, ?)", batch)
+            staged += len(batch)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return staged
+
+    def _write_delta(self, site: str, delta_path: str) -> None:
+        """Write the changed entries to a CSV, streaming them from the database."""
+        output = Path(delta_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        queries = [
+            (ADDED, "SELECT c.product_url, c.category, c.breadcrumb, c.lastmod FROM current c "
+                    "LEFT JOIN entries e ON e.site = ? AND e.url = c.url WHERE e.url IS NULL ORDER BY c.url"),
+            (MODIFIED, "SELECT c.product_url, c.category, c.breadcrumb, c.lastmod FROM current c "
+                       "JOIN entries e ON e.site = ? AND e.url = c.url WHERE e.fingerprint != c.fingerprint "
+                       "ORDER BY c.url"),
+            (REMOVED, "SELECT e.product_url, e.category, e.breadcrumb, e.lastmod FROM entries e "
+                      "WHERE e.site = ? AND NOT EXISTS (SELECT 1 FROM current c WHERE c.url = e.url) ORDER BY e.url"),
+        ]
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=DELTA_FIELDS)
+            writer.writeheader()
+            for change, query in queries:
+                for product_url, category, breadcrumb, lastmod in self._conn.execute(query, (site,)):
+                    writer.writerow({
+                        'site': site,
+                        'product_url': product_url,
+                        'change': change,
+                        'category': category or '',
+                        'breadcrumb': breadcrumb or '',
+                        'lastmod': lastmod or '',
+                    })
+
+    def diff(self, site: str, entries: Iterable[Any], delta_path: Optional[str] = None,
+             save: bool = True) -> SitemapDiff:
+        """
+        Compare a site's current sitemap entries with the stored state.
+
+        The diff is aborted, leaving the state unchanged, if the stream raises
+        IncompleteSitemapError: products of the unread files would otherwise
+        count as removed.
+
+        Args:
+            site: Site the sitemap belongs to
+            entries: Current entries (SitemapEntry; a stream is fine)
+            delta_path: Write the changed product URLs to this CSV
+            save: Replace the stored state with the current entries
+
+        Returns:
+            Counts of added, modified, removed and unchanged entries
+        """
+        known = self.known_entries(site)
+        diff = SitemapDiff(site=site, baseline=known == 0)
+        try:
+            staged = self._stage(entries)
+        except IncompleteSitemapError as e:
+            diff.aborted = str(e)
+            logger.error(f"Rejected sitemap diff for {site}: {diff.aborted}; state left unchanged")
+            self._conn.execute("DROP TABLE temp.current")
+            return diff
+
+        current = self._conn.execute("SELECT COUNT(*) FROM current").fetchone()[0]
+        diff.added, diff.modified, diff.unchanged = self._conn.execute(
+            "SELECT COALESCE(SUM(e.url IS NULL), 0), COALESCE(SUM(e.fingerprint != c.fingerprint), 0), "
+            "COALESCE(SUM(e.fingerprint = c.fingerprint), 0) "
+            "FROM current c LEFT JOIN entries e ON e.site = ? AND e.url = c.url", (site,)
+        ).fetchone()
+        diff.removed = known - (current - diff.added)
+        logger.info(f"Sitemap diff for {site}: {diff.added} added, {diff.modified} modified, "
+                    f"{diff.removed} removed, {diff.unchanged} unchanged ({staged} entries staged)")
+
+        if current == 0:
+            diff.aborted = "the sitemap has no entries"
+        elif known and diff.removed > known * self.max_removed_fraction:
+            diff.aborted = (f"{diff.removed} of {known} known entries would be removed "
+                            f"(over {self.max_removed_fraction:.0%})")
+        if diff.aborted:
+            logger.error(f"Rejected sitemap diff for {site}: {diff.aborted}; state left unchanged")
+            self._conn.execute("DROP TABLE temp.current")
+            return diff
+
+        if delta_path:
+            self._write_delta(site, delta_path)
+            diff.delta_path = delta_path
+            logger.info(f"Wrote {diff.changed} changed product URLs for {site} to {delta_path}")
+
+        if save:
+            self._save(site, diff)
+            diff.saved = True
+        self._conn.execute("DROP TABLE temp.current")
+        return diff
+
+    def _save(self, site: str, diff: SitemapDiff) -> None:
+        """Replace a site's stored entries with the staged ones."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM entries WHERE site = ?", (site,))
+            self._conn.execute(
+                "INSERT INTO entries (site, url, product_url, lastmod, fingerprint, category, breadcrumb) "
+                "SELECT ?, url, product_url, lastmod, fingerprint, category, breadcrumb FROM current", (site,)
+            )
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (site, datetime.now().isoformat(), diff.added, diff.modified, diff.removed, diff.unchanged)
+            )
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Set
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL journal recording the outcome of each crawled URL.
+
+    Every outcome is written as soon as it is known, so a run that crashes
+    part-way can be resumed without re-crawling finished URLs. When a URL
+    appears more than once, the latest record wins.
+
+    record() is called from the crawl's event loop, so it only writes to the OS
+    page cache (which survives a crash of the process). fsyncs run on a
+    background thread that syncs everything written since its last sync at once,
+    at most every `fsync_interval` seconds.
+    """
+
+    SUCCESS = "success"
+    FAILED = "failed"
+
+    def __init__(self, journal_path: str = "data/crawl_journal.jsonl", fsync: bool = True,
+                 fsync_interval: float = 1.0):
+        """
+        Initialize journal.
+
+        Args:
+            journal_path: JSONL file to append outcomes to
+            fsync: Sync records to disk in the background (and on close)
+            fsync_interval: Seconds between background fsyncs; records written
+                since the last one are lost if the machine (not the process) goes down
+        """
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._file: Optional[IO[str]] = None
+        # Guards _file against being closed while the syncer uses it
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+
+    def _open(self) -> IO[str]:
+        if self._file is None:
+            torn = False
+            if self.journal_path.exists() and self.journal_path.stat().st_size > 0:
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b'\n'
+
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+            # Terminate a torn last line from a crash so the next record stays parseable
+            if torn:
+                self._file.write('\n')
+        return self._file
+
+    def record(self, site: str, url: str, status: str, error: Optional[str] = None,
+               data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Append the outcome of one URL.
+
+        Args:
+            site: Site name
+            url: Crawled URL
+            status: CrawlJournal.SUCCESS or CrawlJournal.FAILED
+            error: Error message for failed crawls
+            data: Extra output to keep with the record (e.g. the result CSV row)
+        """
+        entry = {
+            'url': url,
+            'site': site,
+            'status': status,
+            'error': error,
+            'recorded_at': datetime.now().isoformat(),
+            'data': data or {},
+        }
+
+        with self._lock:
+            f = self._open()
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+        if self.fsync:
+            self._dirty.set()
+            self._start_syncer()
+
+    def _start_syncer(self) -> None:
+        if self._syncer is None:
+            self._stop.clear()
+            self._syncer = threading.Thread(target=self._sync_loop, name="crawl-journal-fsync", daemon=True)
+            self._syncer.start()
+
+    def _sync_loop(self) -> None:
+        """fsync whatever was written since the last sync, until close() is called."""
+        while True:
+            self._dirty.wait()
+            if self._stop.is_set():
+                return
+            self._dirty.clear()
+            self._sync()
+            # Records written meanwhile are synced together on the next pass
+            if self._stop.wait(self.fsync_interval):
+                return
+
+    def _sync(self) -> None:
+        # Only duplicate the descriptor under the lock: record() takes it on the event
+        # loop, so it must not wait for the disk. The duplicate stays valid if close()
+        # closes the file meanwhile.
+        with self._lock:
+            if self._file is None:
+                return
+            fd = os.dup(self._file.fileno())
+        self._fsync_fd(fd)
+
+    def _fsync_fd(self, fd: int) -> None:
+        """fsync and close a duplicated journal descriptor."""
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            logger.warning(f"Failed to fsync crawl journal {self.journal_path}: {e}")
+        finally:
+            os.close(fd)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the journal, returning the latest record per URL.
+
+        A torn final line (from a crash mid-write) is ignored.
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.journal_path.exists():
+            return records
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    records[entry['url']] = entry
+                except (json.JSONDecodeError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {self.journal_path}: {e}")
+
+        return records
+
+    def completed_urls(self) -> Set[str]:
+        """URLs whose latest outcome is a success."""
+        return {url for url, entry in self.load().items() if entry.get('status') == self.SUCCESS}
+
+    def reset(self) -> None:
+        """Discard all recorded outcomes and start an empty journal."""
+        self.close()
+        self.journal_path.write_text('', encoding='utf-8')
+        logger.info(f"Started new crawl journal at {self.journal_path}")
+
+    def close(self) -> None:
+        """Sync and close the journal file."""
+        if self._syncer is not None:
+            self._stop.set()
+            self._dirty.set()
+            self._syncer.join()
+            self._syncer = None
+            self._dirty.clear()
+        fd = None
+        with self._lock:
+            if self._file is not None:
+                if self.fsync:
+                    fd = os.dup(self._file.fileno())
+                self._file.close()
+                self._file = None
+        if fd is not None:
+            self._fsync_fd(fd)
@@ -0,0 +1,767 @@
+"""
+Storage backends for the Firecrawl results cache.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.utils.cache_codec import (
+    DECOMPRESSION_ERRORS,
+    MAX_DICTIONARY_SIZE,
+    content_hash,
+    content_id,
+    get_compressor,
+)
+from src.utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; locking is then per process only
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False, blocking: bool = True):
+    """
+    Hold an advisory (flock) lock on a lock file, shared between processes.
+
+    Each call opens its own file description, so threads of one process
+    exclude each other too.
+
+    Args:
+        path: Lock file (created if missing)
+        shared: Take a shared lock instead of an exclusive one
+        blocking: Wait for the lock; otherwise give up at once if it is held
+
+    Yields:
+        Whether the lock was acquired (always True when blocking)
+    """
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        yield acquired
+    finally:
+        os.close(fd)  # Releases the lock
+
+
+class CorruptEntryError(Exception):
+    """Raised when a stored cache entry cannot be decoded."""
+
+
+@dataclass
+class CacheRecord:
+    """One cached Firecrawl result."""
+    key: str
+    url: str
+    cached_at: datetime
+    fields: List[str]
+    firecrawl_result: Dict[str, Any]
+    size: int = 0  # Approximate uncompressed size in bytes
+
+
+class CacheBackend(ABC):
+    """Storage for cache records keyed by cache key."""
+
+    name: str = "backend"
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[CacheRecord]:
+        """
+        Read the record for a key.
+
+        Returns:
+            The record, or None if there is none
+
+        Raises:
+            CorruptEntryError: If the stored entry cannot be decoded
+        """
+
+    @abstractmethod
+    def read_fields(self, key: str) -> Optional[List[str]]:
+        """Data fields held by the record for a key, or None if there is none."""
+
+    @abstractmethod
+    def write(self, record: CacheRecord) -> None:
+        """Insert or replace a record."""
+
+    def write_many(self, records: Iterable[CacheRecord]) -> None:
+        """Insert or replace several records (backends may batch them)."""
+        for record in records:
+            self.write(record)
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete the record for a key, returning whether one existed."""
+
+    def discard_corrupt(self, key: str) -> bool:
+        """Delete a record read() found corrupt, returning whether it was removed."""
+        return self.delete(key)
+
+    @abstractmethod
+    def delete_expired(self, cutoff: datetime) -> int:
+        """Delete records cached before `cutoff`, returning how many were removed."""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Delete every record, returning how many were removed."""
+
+    @abstractmethod
+    def iter_records(self) -> Iterator[CacheRecord]:
+        """Iterate over every readable record."""
+
+    def touch(self, key: str) -> None:  # noqa: B027 - optional hook, a no-op for backends without LRU order
+        """Record an access to a key served without read() (e.g. from memory)."""
+
+    @abstractmethod
+    def evict(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> int:
+        """
+        Delete least recently used records until the backend is within the limits.
+
+        Args:
+            max_bytes: Largest total stored size to keep
+            max_entries: Largest number of records to keep
+
+        Returns:
+            Number of records removed
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and total stored size."""
+
+    def close(self) -> None:  # noqa: B027 - optional hook, a no-op for backends holding no resources
+        """Release any resources held by the backend."""
+
+
+class JsonFileBackend(CacheBackend):
+    """
+    One pretty-printed JSON file per entry, named after the cache key.
+
+    Safe for several processes sharing the directory, including over a shared
+    volume: entries are written to a temporary file, fsynced and renamed into
+    place, so readers see either the old or the new file, never a partial one.
+    Renames hold a shared lock on the directory's lock file and expiry,
+    eviction, clearing and removal of corrupt entries hold it exclusively, so
+    they never delete an entry another process has just replaced.
+    """
+
+    name = "json"
+
+    LOCK_FILENAME = ".lock"
+
+    # Temporary files older than this are left over from crashed writers
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, cache_dir: str = "data/firecrawl_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.cache_dir / self.LOCK_FILENAME
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    @staticmethod
+    def _entry_fields(cache_data: Dict[str, Any]) -> List[str]:
+        """Data fields stored in an entry (older entries stored every field)."""
+        if 'fields' in cache_data:
+            return list(cache_data['fields'])
+        return sorted(cache_data.get('firecrawl_result', {}).get('data', {}).keys())
+
+    def _load(self, path: Path) -> CacheRecord:
+        try:
+            with open(path, encoding='utf-8') as f:
+                cache_data = json.load(f)
+            return CacheRecord(
+                key=path.stem,
+                url=cache_data['url'],
+                cached_at=datetime.fromisoformat(cache_data['cached_at']),
+                fields=self._entry_fields(cache_data),
+                firecrawl_result=cache_data['firecrawl_result'],
+                size=path.stat().st_size,
+            )
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError) as e:
+            raise CorruptEntryError(f"{path}: {e}") from e
+
+    def read(self, key: str) -> Optional[CacheRecord]:
+        try:
+            record = self._load(self._path(key))
+        except FileNotFoundError:  # Never written, or removed by another process
+            return None
+        self.touch(key)
+        return record
+
+    def touch(self, key: str) -> None:
+        # The file's mtime tracks last access for LRU eviction (cached_at is stored inside)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def read_fields(self, key: str) -> Optional[List[str]]:
+        try:
+            record = self.read(key)
+        except (OSError, CorruptEntryError):
+            return None
+        return record.fields if record is not None else None
+
+    def write(self, record: CacheRecord) -> None:
+        cache_data = {
+            'url': record.url,
+            'cached_at': record.cached_at.isoformat(),
+            'fields': record.fields,
+            'firecrawl_result': record.firecrawl_result,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{record.key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            with file_lock(self._lock_path, shared=True):
+                os.replace(temp_path, self._path(record.key))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def discard_corrupt(self, key: str) -> bool:
+        # A writer may have replaced the entry since it was read; only delete it if it is still unreadable
+        path = self._path(key)
+        with file_lock(self._lock_path):
+            try:
+                self._load(path)
+                return False
+            except FileNotFoundError:
+                return False
+            except CorruptEntryError:
+                path.unlink(missing_ok=True)
+                return True
+
+    def _remove_stale_temp_files(self) -> None:
+        """Delete temporary files left behind by writers that crashed before renaming them."""
+        cutoff = time.time() - self.STALE_TEMP_SECONDS
+        for path in self.cache_dir.glob(".*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def delete_expired(self, cutoff: datetime) -> int:
+        removed_count = 0
+        with file_lock(self._lock_path):
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    expired = self._load(path).cached_at < cutoff
+                except CorruptEntryError:
+                    # Remove corrupted cache files
+                    expired = True
+                except FileNotFoundError:
+                    continue
+                if expired:
+                    path.unlink(missing_ok=True)
+                    removed_count += 1
+            self._remove_stale_temp_files()
+        return removed_count
+
+    def clear(self) -> int:
+        with file_lock(self._lock_path):
+            cache_files = list(self.cache_dir.glob("*.json"))
+            for path in cache_files:
+                path.unlink(missing_ok=True)
+        return len(cache_files)
+
+    def iter_records(self) -> Iterator[CacheRecord]:
+        for path in sorted(self.cache_dir.glob("*.json")):
+            try:
+                yield self._load(path)
+            except CorruptEntryError as e:
+                logger.warning(f"Skipping unreadable cache file {e}")
+            except FileNotFoundError:
+                continue
+
+    def evict(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> int:
+        with file_lock(self._lock_path):
+            files = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            files.sort()
+            total_size = sum(size for _, size, _ in files)
+            count = len(files)
+            removed_count = 0
+            for _, size, path in files:
+                if (max_bytes is None or total_size <= max_bytes) and (max_entries is None or count <= max_entries):
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+                count -= 1
+                removed_count += 1
+        return removed_count
+
+    def stats(self) -> Dict[str, Any]:
+        total_entries = total_size = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                total_size += path.stat().st_size
+            except FileNotFoundError:
+                continue
+            total_entries += 1
+        return {
+            'total_entries': total_entries,
+            'total_size_bytes': total_size,
+            'location': str(self.cache_dir),
+        }
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    All entries in a single SQLite database.
+
+    `url` and `cached_at` are indexed, so expiry is one indexed DELETE and
+    statistics come from one aggregate query instead of a directory scan.
+
+    Payloads are stored compressed, with a preset dictionary per host taken
+    from the first entry cached for that host, so the page chrome a site
+    repeats on every page costs almost nothing.
+
+    Reads record an access time (written in batches) so evict() can drop the
+    least recently used entries; freed pages are returned to the filesystem.
+
+    Several processes on one host can share the database: every write is an
+    IMMEDIATE transaction, WAL lets readers proceed during writes, and a busy
+    timeout makes writers wait for each other instead of failing. Expiry and
+    eviction take a cross-process lock, so only one process runs them at a
+    time. WAL needs shared memory, so do not put the database on a network
+    volume; use the json backend there.
+    """
+
+    name = "sqlite"
+
+    SCHEMA_VERSION = 4
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            cached_at REAL NOT NULL,
+            fields TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            codec TEXT NOT NULL DEFAULT 'json',
+            raw_size INTEGER NOT NULL DEFAULT 0,
+            dictionary INTEGER,
+            last_accessed REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_url ON entries (url);
+        CREATE INDEX IF NOT EXISTS idx_entries_cached_at ON entries (cached_at);
+        CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries (last_accessed);
+        CREATE TABLE IF NOT EXISTS dictionaries (
+            id INTEGER PRIMARY KEY,
+            host TEXT NOT NULL UNIQUE,
+            data BLOB NOT NULL
+        );
+    """
+
+    # Codec of entries written before compression was added (plain JSON text)
+    LEGACY_CODEC = 'json'
+
+    # Reads between writes of their access times
+    TOUCH_BATCH_SIZE = 256
+
+    # Seconds a write waits for another connection's transaction before failing
+    BUSY_TIMEOUT = 30.0
+
+    def __init__(self, db_path: str = "data/firecrawl_cache/cache.sqlite3", compression: str = "auto",
+                 dictionary: bool = True):
+        """
+        Initialize backend.
+
+        Args:
+            db_path: SQLite database file
+            compression: 'zstd', 'zlib', 'none' or 'auto' (zstd if installed, else zlib)
+            dictionary: Compress entries with a preset dictionary per host
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.compressor = get_compressor(compression)
+        self.use_dictionary = dictionary
+        self._dictionaries: Dict[int, bytes] = {}
+        self._pending_touches: Dict[str, float] = {}
+        self._maintenance_lock_path = self.db_path.with_name(self.db_path.name + ".lock")
+        # One connection shared by the crawler's worker threads, serialized by a lock
+        self._conn = sqlite3.connect(str(self.db_path), timeout=self.BUSY_TIMEOUT,
+                                     check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(f"PRAGMA busy_timeout = {int(self.BUSY_TIMEOUT * 1000)}")
+            # Only takes effect for new databases; lets eviction shrink the file
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._upgrade_schema()
+
+    def _upgrade_schema(self) -> None:
+        """Create the schema, adding columns missing from databases created by older versions."""
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                return
+        with self._transaction() as conn:
+            # Another process may have upgraded the database while we waited for the write lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                return
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if columns and 'codec' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN codec TEXT NOT NULL DEFAULT 'json'")
+                conn.execute("ALTER TABLE entries ADD COLUMN raw_size INTEGER NOT NULL DEFAULT 0")
+                conn.execute("ALTER TABLE entries ADD COLUMN dictionary INTEGER")
+                conn.execute("UPDATE entries SET raw_size = size")
+            if columns and 'last_accessed' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN last_accessed REAL NOT NULL DEFAULT 0")
+                conn.execute("UPDATE entries SET last_accessed = cached_at")
+            if 'blocks' in columns:
+                self._drop_block_storage(conn)
+            # executescript() would commit the transaction, so run the statements one by one
+            for statement in self.SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _drop_block_storage(self, conn) -> None:
+        """
+        Remove the shared blocks of databases written with the former `dedupe` option.
+
+        Entries holding their text as block lists cannot be read without them
+        and are deleted, to be scraped again on demand.
+        """
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if any(conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+               for table in ('blocks', 'chunk_seen') if table in tables):
+            dropped = []
+            for key, codec, payload, dictionary_id in conn.execute(
+                "SELECT key, codec, payload, dictionary FROM entries WHERE codec != ?", (self.LEGACY_CODEC,)
+            ):
+                try:
+                    data = get_compressor(codec).decompress(payload, self._dictionary(conn, dictionary_id))
+                except (CorruptEntryError, ValueError, *DECOMPRESSION_ERRORS):
+                    continue  # Reported as corrupt when read
+                if b'"$blocks"' in data:
+                    dropped.append((key,))
+            conn.executemany("DELETE FROM entries WHERE key = ?", dropped)
+            if dropped:
+                logger.info(f"Dropped {len(dropped)} cache entries stored as shared blocks")
+        conn.execute("DROP TABLE IF EXISTS blocks")
+        conn.execute("DROP TABLE IF EXISTS chunk_seen")
+        conn.execute("ALTER TABLE entries DROP COLUMN blocks")
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the connection lock and run the block in one write transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _placeholders(values) -> str:
+        return ','.join('?' * len(values))
+
+    def _dictionary(self, conn, dictionary_id: Optional[int]) -> Optional[bytes]:
+        """Preset dictionary by id (call with the lock held)."""
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in self._dictionaries:
+            row = conn.execute("SELECT data FROM dictionaries WHERE id = ?", (dictionary_id,)).fetchone()
+            if row is None:
+                raise CorruptEntryError(f"compression dictionary {dictionary_id} is missing")
+            self._dictionaries[dictionary_id] = row[0]
+        return self._dictionaries[dictionary_id]
+
+    def _host_dictionary(self, conn, host: str, sample: bytes) -> Tuple[int, bytes]:
+        """
+        Dictionary for a host, created from `sample` for the host's first entry.
+
+        Looked up in the database on every write because another process may
+        have created or cleared it. Ids are derived from the dictionary content,
+        so an id cached in memory always refers to the same data.
+        """
+        row = conn.execute("SELECT id FROM dictionaries WHERE host = ?", (host,)).fetchone()
+        if row is not None:
+            return row[0], self._dictionary(conn, row[0])
+
+        data = sample[-MAX_DICTIONARY_SIZE:]
+        dictionary_id = content_id(content_hash(f"{host}\n".encode().hex() + data.hex()))
+        conn.execute("INSERT INTO dictionaries (id, host, data) VALUES (?, ?, ?)", (dictionary_id, host, data))
+        self._dictionaries[dictionary_id] = data
+        return dictionary_id, data
+
+    def _decode(self, key: str, codec: str, payload: bytes, dictionary_id: Optional[int]) -> Dict[str, Any]:
+        if codec == self.LEGACY_CODEC:
+            return json.loads(payload)
+        with self._lock:
+            dictionary = self._dictionary(self._conn, dictionary_id)
+        return json.loads(get_compressor(codec).decompress(payload, dictionary).decode('utf-8'))
+
+    def _to_record(self, row) -> CacheRecord:
+        key, url, cached_at, fields, codec, payload, dictionary_id, raw_size = row
+        try:
+            return CacheRecord(
+                key=key,
+                url=url,
+                cached_at=datetime.fromtimestamp(cached_at),
+                fields=json.loads(fields),
+                firecrawl_result=self._decode(key, codec, payload, dictionary_id),
+                size=raw_size,
+            )
+        except (TypeError, *DECOMPRESSION_ERRORS) as e:
+            raise CorruptEntryError(f"{key}: {e}") from e
+
+    def read(self, key: str) -> Optional[CacheRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, url, cached_at, fields, codec, payload, dictionary, raw_size "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row:
+            self.touch(key)
+            if len(self._pending_touches) >= self.TOUCH_BATCH_SIZE:
+                self._flush_touches()
+        return self._to_record(row) if row else None
+
+    def touch(self, key: str) -> None:
+        # Only recorded here; written by the next read, write or eviction
+        with self._lock:
+            self._pending_touches[key] = datetime.now().timestamp()
+
+    def _flush_touches(self) -> None:
+        """Write the access times recorded by reads since the last flush."""
+        with self._lock:
+            if not self._pending_touches:
+                return
+        with self._transaction() as conn:
+            # Swapped under the connection lock, which touch() also takes
+            touches, self._pending_touches = self._pending_touches, {}
+            if not touches:
+                return
+            conn.executemany("UPDATE entries SET last_accessed = ? WHERE key = ?",
+                             [(accessed, key) for key, accessed in touches.items()])
+
+    def read_fields(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute("SELECT fields FROM entries WHERE key = ?", (key,)).fetchone()
+        try:
+            return json.loads(row[0]) if row else None
+        except json.JSONDecodeError:
+            return None
+
+    def write(self, record: CacheRecord) -> None:
+        self.write_many([record])
+
+    def write_many(self, records: Iterable[CacheRecord]) -> None:
+        # One transaction (and one WAL commit) for the whole batch
+        with self._transaction() as conn:
+            for record in records:
+                self._write_record(conn, record)
+        if len(self._pending_touches) >= self.TOUCH_BATCH_SIZE:
+            self._flush_touches()
+
+    def _write_record(self, conn, record: CacheRecord) -> None:
+        """Insert or replace one record (call inside a transaction)."""
+        data = json.dumps(record.firecrawl_result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        dictionary_id, dictionary = (
+            self._host_dictionary(conn, urlparse(record.url).netloc, data)
+            if self.use_dictionary and self.compressor.name != 'none' else (None, None)
+        )
+        payload = self.compressor.compress(data, dictionary)
+        conn.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(key, url, cached_at, fields, payload, size, codec, raw_size, dictionary, last_accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.key, record.url, record.cached_at.timestamp(), json.dumps(record.fields),
+             payload, len(payload), self.compressor.name, len(data), dictionary_id, datetime.now().timestamp()),
+        )
+
+    def delete(self, key: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+
+    def delete_expired(self, cutoff: datetime) -> int:
+        with file_lock(self._maintenance_lock_path, blocking=False) as acquired:
+            if not acquired:
+                logger.debug(f"Skipping expiry of {self.db_path}: another process is already running it")
+                return 0
+            return self._delete_expired(cutoff)
+
+    def _delete_expired(self, cutoff: datetime) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM entries WHERE cached_at < ?", (cutoff.timestamp(),)).rowcount
+
+    def clear(self) -> int:
+        with self._transaction() as conn:
+            removed = conn.execute("DELETE FROM entries").rowcount
+            conn.execute("DELETE FROM dictionaries")
+            self._dictionaries.clear()
+        return removed
+
+    def iter_records(self, page_size: int = 500) -> Iterator[CacheRecord]:
+        # Page by key so the lock is not held while the caller processes records
+        last_key = ''
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, url, cached_at, fields, codec, payload, dictionary, raw_size FROM entries "
+                    "WHERE key > ? ORDER BY key LIMIT ?", (last_key, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                try:
+                    yield self._to_record(row)
+                except CorruptEntryError as e:
+                    logger.warning(f"Skipping unreadable cache entry {e}")
+            last_key = rows[-1][0]
+
+    def _totals(self, conn) -> Tuple[int, int]:
+        """Entry count and stored bytes (entries and dictionaries)."""
+        return conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) "
+            "+ (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries) FROM entries"
+        ).fetchone()
+
+    def evict(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+              batch_size: int = 200) -> int:
+        with file_lock(self._maintenance_lock_path, blocking=False) as acquired:
+            if not acquired:
+                logger.debug(f"Skipping eviction in {self.db_path}: another process is already running it")
+                return 0
+            return self._evict(max_bytes, max_entries, batch_size)
+
+    def _evict(self, max_bytes: Optional[int], max_entries: Optional[int], batch_size: int) -> int:
+        self._flush_touches()
+        removed_count = 0
+
+        while True:
+            with self._transaction() as conn:
+                count, total_size = self._totals(conn)
+                over_entries = max_entries is not None and count > max_entries
+                over_bytes = max_bytes is not None and total_size > max_bytes
+                if not (over_entries or over_bytes):
+                    break
+
+                limit = batch_size if over_bytes else min(batch_size, count - max_entries)
+                victims = conn.execute(
+                    "SELECT key FROM entries ORDER BY last_accessed LIMIT ?", (limit,)
+                ).fetchall()
+                if not victims:
+                    break
+                conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+                removed_count += len(victims)
+
+        if removed_count:
+            with self._lock:
+                # execute() only steps the pragma once, freeing a single page; a script runs it to completion
+                self._conn.executescript("PRAGMA incremental_vacuum")
+        return removed_count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_entries, entry_size, raw_size, oldest, newest, dictionary_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0), MIN(cached_at), "
+                "MAX(cached_at), (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries) "
+                "FROM entries"
+            ).fetchone()
+        total_size = entry_size + dictionary_size
+        return {
+            'total_entries': total_entries,
+            'total_size_bytes': total_size,
+            'uncompressed_size_bytes': raw_size,
+            'compression_ratio': round(raw_size / total_size, 2) if total_size else None,
+            'oldest_entry': datetime.fromtimestamp(oldest).isoformat() if oldest else None,
+            'newest_entry': datetime.fromtimestamp(newest).isoformat() if newest else None,
+            'location': str(self.db_path),
+        }
+
+    def close(self) -> None:
+        self._flush_touches()
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    JsonFileBackend.name: JsonFileBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+# Database file used by the SQLite backend inside the cache directory
+SQLITE_FILENAME = "cache.sqlite3"
+
+
+def create_backend(name: str, cache_dir: str, **options: Any) -> CacheBackend:
+    """
+    Create a cache backend by name.
+
+    Args:
+        name: 'json' (one file per entry) or 'sqlite' (single database file)
+        cache_dir: Directory holding the cache files
+        **options: Storage options for the SQLite backend (compression, dictionary)
+    """
+    if name == JsonFileBackend.name:
+        return JsonFileBackend(cache_dir)
+    if name == SQLiteBackend.name:
+        return SQLiteBackend(str(Path(cache_dir) / SQLITE_FILENAME), **options)
+    raise ValueError(f"Unknown cache backend '{name}', expected one of {sorted(BACKENDS)}")
+
+
+def migrate_records(source: CacheBackend, target: CacheBackend, skip_before: Optional[datetime] = None) -> int:
+    """
+    Copy every readable record from one backend to another.
+
+    Args:
+        source: Backend to read from
+        target: Backend to write to (existing keys are replaced)
+        skip_before: Leave out records cached before this time
+
+    Returns:
+        Number of records copied
+    """
+    copied = 0
+    for record in source.iter_records():
+        if skip_before is not None and record.cached_at < skip_before:
+            continue
+        target.write(record)
+        copied += 1
+    return copied
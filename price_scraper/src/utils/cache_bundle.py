@@ -0,0 +1,159 @@
+"""
+Portable bundles of Firecrawl cache entries.
+
+A bundle is a single tar archive, compressed with zstd (`.tar.zst`, needs the
+zstandard package) or gzip (`.tar.gz`), holding:
+
+    manifest.json   format version, creation time, entry count, export filters
+    entries.jsonl   one cached result per line (url, cached_at, fields, firecrawl_result)
+
+Entries carry their URL rather than a cache key, so a bundle can be imported
+into any backend and is re-keyed with the importing cache's canonicalization
+rules.
+"""
+
+import io
+import json
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+from typing import IO, Any, BinaryIO, Dict, Iterable, Iterator, Literal, Optional
+
+from src.utils.cache_backends import CacheRecord
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; bundles are gzip-compressed without it
+    zstandard = None  # type: ignore[assignment]
+
+BUNDLE_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+ENTRIES_NAME = "entries.jsonl"
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class BundleError(Exception):
+    """Raised when a file is not a readable cache bundle."""
+
+
+def bundle_compression(path: str) -> str:
+    """Compression implied by a bundle's file name ('zstd' or 'gzip')."""
+    if path.endswith(('.zst', '.zstd')):
+        if zstandard is None:
+            raise ValueError("zstd bundles need the 'zstandard' package; use a .tar.gz path instead")
+        return 'zstd'
+    return 'gzip'
+
+
+def _add_file(tar: tarfile.TarFile, name: str, fileobj: IO[bytes], size: int) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(time.time())
+    tar.addfile(info, fileobj)
+
+
+def _member_file(tar: tarfile.TarFile, member: tarfile.TarInfo) -> IO[bytes]:
+    fileobj = tar.extractfile(member)
+    if fileobj is None:
+        raise BundleError(f"{member.name} is not a regular file")
+    return fileobj
+
+
+def write_bundle(records: Iterable[CacheRecord], path: str, filters: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Write records to a bundle file.
+
+    Args:
+        records: Records to export
+        path: Bundle file (.tar.zst or .tar.gz)
+        filters: Export filters recorded in the manifest
+
+    Returns:
+        Number of records written
+    """
+    compression = bundle_compression(path)
+    count = 0
+    # Entries are spooled to a temporary file first because tar needs each member's size up front
+    with tempfile.TemporaryFile() as entries:
+        for record in records:
+            line = json.dumps({
+                'url': record.url,
+                'cached_at': record.cached_at.isoformat(),
+                'fields': record.fields,
+                'firecrawl_result': record.firecrawl_result,
+            }, ensure_ascii=False, separators=(',', ':'))
+            entries.write(line.encode('utf-8') + b'\n')
+            count += 1
+
+        manifest = json.dumps({
+            'version': BUNDLE_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'entries': count,
+            'filters': filters or {},
+        }, indent=2).encode('utf-8')
+
+        entries_size = entries.tell()
+        entries.seek(0)
+        with open(path, 'wb') as f:
+            if compression == 'zstd':
+                with zstandard.ZstdCompressor(level=10).stream_writer(f, closefd=False) as stream:
+                    with tarfile.open(fileobj=stream, mode='w|') as tar:
+                        _add_file(tar, MANIFEST_NAME, io.BytesIO(manifest), len(manifest))
+                        _add_file(tar, ENTRIES_NAME, entries, entries_size)
+            else:
+                with tarfile.open(fileobj=f, mode='w|gz') as tar:
+                    _add_file(tar, MANIFEST_NAME, io.BytesIO(manifest), len(manifest))
+                    _add_file(tar, ENTRIES_NAME, entries, entries_size)
+    return count
+
+
+def read_bundle(path: str) -> Iterator[CacheRecord]:
+    """
+    Stream the records of a bundle file.
+
+    Records have an empty key; callers derive it from the URL.
+
+    Raises:
+        BundleError: If the file is not a bundle or has an unsupported version
+    """
+    with open(path, 'rb') as f:
+        is_zstd = f.read(4) == ZSTD_MAGIC
+        f.seek(0)
+        stream: BinaryIO
+        mode: Literal['r|', 'r|*']
+        if is_zstd:
+            if zstandard is None:
+                raise BundleError(f"{path} is zstd-compressed; install the 'zstandard' package to read it")
+            stream = zstandard.ZstdDecompressor().stream_reader(f)
+            mode = 'r|'
+        else:
+            stream = f
+            mode = 'r|*'
+
+        try:
+            with tarfile.open(fileobj=stream, mode=mode) as tar:
+                manifest = None
+                for member in tar:
+                    if member.name == MANIFEST_NAME:
+                        manifest = json.load(_member_file(tar, member))
+                        if manifest.get('version') != BUNDLE_VERSION:
+                            raise BundleError(f"{path}: unsupported bundle version {manifest.get('version')}")
+                    elif member.name == ENTRIES_NAME:
+                        if manifest is None:
+                            raise BundleError(f"{path}: entries precede the manifest")
+                        for line in _member_file(tar, member):
+                            entry = json.loads(line)
+                            yield CacheRecord(
+                                key='',
+                                url=entry['url'],
+                                cached_at=datetime.fromisoformat(entry['cached_at']),
+                                fields=list(entry['fields']),
+                                firecrawl_result=entry['firecrawl_result'],
+                            )
+                if manifest is None:
+                    raise BundleError(f"{path}: no {MANIFEST_NAME} found")
+        except (tarfile.TarError, EOFError, KeyError, ValueError) as e:
+            raise BundleError(f"{path}: {e}") from e
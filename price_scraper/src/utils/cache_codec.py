@@ -0,0 +1,128 @@
+"""
+Compression for cached Firecrawl payloads.
+
+Pages from one site repeat the same chrome (navigation, header, footer) in
+their markdown and HTML. Entries are compressed with a preset dictionary
+taken from an earlier page of the same site, so page templates and metadata
+keys cost almost nothing.
+"""
+
+import hashlib
+import zlib
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; fall back to zlib (gzip's deflate)
+    zstandard = None
+
+# Errors raised when stored data does not decompress
+DECOMPRESSION_ERRORS = (zlib.error, ValueError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+# Largest useful preset dictionary (zlib's window size)
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+class Compressor:
+    """
+    Named compression algorithm.
+
+    `dictionary` is raw content (such as another page from the same site)
+    that data is likely to share substrings with; the same dictionary must be
+    passed to decompress().
+    """
+
+    name = "none"
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        return data
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        return data
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        if not dictionary:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        if not dictionary:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class ZstdCompressor(Compressor):
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    @staticmethod
+    def _dict(dictionary: bytes):
+        return zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        if not dictionary:
+            return self._compressor.compress(data)
+        return zstandard.ZstdCompressor(level=self.level, dict_data=self._dict(dictionary)).compress(data)
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        if not dictionary:
+            return self._decompressor.decompress(data)
+        return zstandard.ZstdDecompressor(dict_data=self._dict(dictionary)).decompress(data)
+
+
+_compressors: Dict[str, Compressor] = {}
+
+
+def available_compressors() -> List[str]:
+    """Names of the compressors usable in this environment."""
+    names = ['none', 'zlib']
+    if zstandard is not None:
+        names.append('zstd')
+    return names
+
+
+def get_compressor(name: str = "auto") -> Compressor:
+    """
+    Get a compressor by name (instances are shared).
+
+    Args:
+        name: 'zstd', 'zlib', 'none', or 'auto' for zstd when the zstandard
+            package is installed and zlib otherwise
+    """
+    if name == "auto":
+        name = "zstd" if zstandard is not None else "zlib"
+    if name not in _compressors:
+        if name == "zstd":
+            if zstandard is None:
+                raise ValueError("zstd compression needs the 'zstandard' package")
+            _compressors[name] = ZstdCompressor()
+        elif name == "zlib":
+            _compressors[name] = ZlibCompressor()
+        elif name == "none":
+            _compressors[name] = Compressor()
+        else:
+            raise ValueError(f"Unknown compression '{name}', expected one of {available_compressors()} or 'auto'")
+    return _compressors[name]
+
+
+def content_hash(text: str) -> str:
+    """Hash identifying data by its content."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def content_id(digest: str) -> int:
+    """Compact signed 64-bit id derived from a content hash."""
+    return int(digest[:16], 16) - (1 << 63)
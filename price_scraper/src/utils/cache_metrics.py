@@ -0,0 +1,176 @@
+"""
+Counters and timers for the Firecrawl cache, broken down by site.
+"""
+
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List
+from urllib.parse import urlparse
+
+COUNTERS = (
+    'hits',            # Fresh entries served (including memory tier hits)
+    'memory_hits',     # Hits served by the in-memory tier
+    'stale_hits',      # Expired entries served while refreshed in the background
+    'refreshes',       # Background refreshes started for stale hits (each one a Firecrawl request)
+    'misses',          # No entry stored
+    'expired',         # Entry too old to serve
+    'incomplete',      # Entry lacks fields the caller needs
+    'corrupt',         # Unreadable entries removed
+    'writes',          # Entries stored
+    'bytes_read',      # Approximate uncompressed size of entries read from storage
+    'bytes_written',   # Approximate uncompressed size of entries stored
+)
+
+
+def site_of(url: str) -> str:
+    """Site a URL is counted under (its host without 'www.')."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host or 'unknown'
+
+
+class LatencyStats:
+    """Count, mean, max and recent percentiles of an operation's duration."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None,
+            'p50_ms': round(recent[len(recent) // 2] * 1000, 3) if recent else None,
+            'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else None,
+            'max_ms': round(self.max * 1000, 3) if self.count else None,
+        }
+
+
+class SiteMetrics:
+    """Cache counters and timers of one site."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.get_latency = LatencyStats()
+        self.set_latency = LatencyStats()
+
+    def summary(self, credits_per_request: float) -> Dict[str, Any]:
+        counters = self.counters
+        lookups = counters['hits'] + counters['stale_hits'] + counters['misses'] + counters['expired'] \
+            + counters['incomplete'] + counters['corrupt']
+        served = counters['hits'] + counters['stale_hits']
+        # Every served lookup is a Firecrawl scrape that did not happen, except that
+        # a stale hit starts a refresh scraping the page anyway
+        saved = served - counters['refreshes']
+        return {
+            **counters,
+            'lookups': lookups,
+            'hit_rate': round(served / lookups, 3) if lookups else None,
+            'requests_saved': saved,
+            'credits_saved': saved * credits_per_request,
+            'get_latency': self.get_latency.summary(),
+            'set_latency': self.set_latency.summary(),
+        }
+
+
+class CacheMetrics:
+    """
+    Thread-safe cache counters by site.
+
+    Sites are identified by host, so the same page counts under the same site
+    whichever crawler looked it up.
+    """
+
+    def __init__(self, credits_per_request: float = 1.0):
+        """
+        Initialize metrics.
+
+        Args:
+            credits_per_request: Firecrawl credits one scrape costs, for the savings estimate
+        """
+        self.credits_per_request = credits_per_request
+        self.started_at = datetime.now()
+        self._sites: Dict[str, SiteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _site(self, url: str) -> SiteMetrics:
+        site = site_of(url)
+        metrics = self._sites.get(site)
+        if metrics is None:
+            metrics = self._sites[site] = SiteMetrics()
+        return metrics
+
+    def count(self, url: str, counter: str, amount: int = 1) -> None:
+        """Add to a counter of the URL's site."""
+        with self._lock:
+            self._site(url).counters[counter] += amount
+
+    def observe_get(self, url: str, seconds: float) -> None:
+        """Record the duration of a lookup."""
+        with self._lock:
+            self._site(url).get_latency.record(seconds)
+
+    def observe_set(self, url: str, seconds: float, size: int) -> None:
+        """Record a stored entry: its duration and size."""
+        with self._lock:
+            site = self._site(url)
+            site.set_latency.record(seconds)
+            site.counters['writes'] += 1
+            site.counters['bytes_written'] += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and latencies per site plus totals over every site."""
+        with self._lock:
+            sites = {site: metrics.summary(self.credits_per_request) for site, metrics in sorted(self._sites.items())}
+            total = SiteMetrics()
+            for metrics in self._sites.values():
+                for counter, value in metrics.counters.items():
+                    total.counters[counter] += value
+            total_summary = total.summary(self.credits_per_request)
+        # Latencies do not merge exactly; totals keep only the counts
+        for name in ('get_latency', 'set_latency'):
+            total_summary[name] = {'count': sum(site[name]['count'] for site in sites.values())}
+        return {
+            'since': self.started_at.isoformat(),
+            'total': total_summary,
+            'sites': sites,
+        }
+
+    def format_summary(self) -> List[str]:
+        """One human-readable line per site, for logs."""
+        lines = []
+        for site, m in self.snapshot()['sites'].items():
+            get_latency = m['get_latency']
+            lines.append(
+                f"{site}: {m['hits']} hits ({m['memory_hits']} memory), {m['stale_hits']} stale "
+                f"({m['refreshes']} refreshed), {m['misses']} misses, {m['expired']} expired, {m['incomplete']} incomplete, "
+                f"{m['corrupt']} corrupt; hit rate {m['hit_rate'] if m['hit_rate'] is not None else '-'}, "
+                f"{m['requests_saved']} Firecrawl requests saved; "
+                f"get p95 {get_latency['p95_ms'] if get_latency['p95_ms'] is not None else '-'} ms, "
+                f"{m['bytes_read'] / 1024 / 1024:.1f} MB read, {m['bytes_written'] / 1024 / 1024:.1f} MB written"
+            )
+        return lines
+
+    def dump(self, path: str) -> None:
+        """Write a snapshot to a JSON file."""
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({**self.snapshot(), 'dumped_at': datetime.now().isoformat()}, f, indent=2)
+
+    def reset(self) -> None:
+        """Zero every counter and timer."""
+        with self._lock:
+            self._sites.clear()
+            self.started_at = datetime.now()
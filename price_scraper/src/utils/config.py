@@ -1,7 +1,7 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,6 +33,21 @@ class Config:
                 self._sites = yaml.safe_load(f)
         return self._sites
     
+    def get_site_config(self, site_name: str) -> Optional[Dict[str, Any]]:
+        """Get a site's configuration from any region in sites.yaml."""
+        for region_sites in self.sites.get("sites", {}).values():
+            if site_name in (region_sites or {}):
+                return region_sites[site_name]
+        return None
+    
+    def get_site_names(self) -> List[str]:
+        """Get the names of all configured sites across regions."""
+        return [
+            site_name
+            for region_sites in self.sites.get("sites", {}).values()
+            for site_name in (region_sites or {})
+        ]
+    
     def get_database_path(self) -> str:
         """Get database path from environment or default."""
         return os.getenv("DATABASE_PATH", "data/moto_prices.duckdb")
@@ -0,0 +1,294 @@
+"""
+Negative cache of URLs Firecrawl could not scrape.
+
+A URL that failed is remembered for a while, so later crawls skip it instead
+of spending a request (and, for transient errors, every retry and backoff
+sleep) on a page that is very likely still failing. Failures are classified:
+
+    permanent   the page is gone (HTTP 404/410); remembered for days
+    transient   retries were exhausted on any other error; remembered briefly
+
+Throttling (429) and Firecrawl account errors (401/402/403) are not about the
+URL and are never remembered.
+
+Entries are keyed by canonical URL and persisted to a JSON file, so they carry
+over between runs. A successful scrape of the URL forgets its entry.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.cache_backends import file_lock
+from src.utils.config import config
+from src.utils.logger import get_logger
+from src.utils.url_canonical import canonicalize_url
+
+logger = get_logger(__name__)
+
+PERMANENT = 'permanent'
+TRANSIENT = 'transient'
+
+
+@dataclass
+class FailureEntry:
+    """A remembered scrape failure."""
+    kind: str  # PERMANENT or TRANSIENT
+    failed_at: datetime
+    expires_at: datetime
+    status_code: Optional[int] = None
+    error: str = ''
+    failures: int = 1  # Failures recorded in a row (a success or expiry starts over)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {**asdict(self), 'failed_at': self.failed_at.isoformat(), 'expires_at': self.expires_at.isoformat()}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "FailureEntry":
+        return cls(**{
+            **data,
+            'failed_at': datetime.fromisoformat(data['failed_at']),
+            'expires_at': datetime.fromisoformat(data['expires_at']),
+        })
+
+
+class FailureCache:
+    """
+    Thread-safe negative cache of failed URLs, saved to a JSON file.
+
+    Changes are written at most every `save_interval` seconds, on a background
+    thread since record() and forget() are called from the crawl's event loop,
+    and at exit. Saving merges with the file under a lock, so several processes can share
+    it; the most recent failure of a URL wins.
+    """
+
+    def __init__(self, path: str = "data/firecrawl_failures.json", permanent_ttl_hours: float = 168,
+                 transient_ttl_minutes: float = 30, save_interval: float = 30.0):
+        """
+        Initialize the cache, loading failures saved by earlier runs.
+
+        Args:
+            path: JSON file holding the failures
+            permanent_ttl_hours: How long a gone page (404/410) is skipped
+            transient_ttl_minutes: How long a URL that exhausted its retries is skipped
+            save_interval: Minimum seconds between writes of the file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self.ttls = {
+            PERMANENT: timedelta(hours=permanent_ttl_hours),
+            TRANSIENT: timedelta(minutes=transient_ttl_minutes),
+        }
+        self.save_interval = save_interval
+        self.skipped = 0
+        self._entries: Dict[str, FailureEntry] = {}
+        # URLs forgotten since the last save, so merging does not bring them back
+        self._forgotten: Dict[str, datetime] = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._saver: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self._entries = self._load()
+        atexit.register(self.save)
+        logger.debug(f"Loaded {len(self._entries)} remembered scrape failures from {self.path}")
+
+    @classmethod
+    def from_config(cls) -> "FailureCache":
+        """Create the cache from the `firecrawl_cache.negative_cache` settings."""
+        settings = (config.settings.get('firecrawl_cache', {}) or {}).get('negative_cache', {}) or {}
+        return cls(
+            path=settings.get('file', "data/firecrawl_failures.json"),
+            permanent_ttl_hours=settings.get('permanent_ttl_hours', 168),
+            transient_ttl_minutes=settings.get('transient_ttl_minutes', 30),
+        )
+
+    def _load(self) -> Dict[str, FailureEntry]:
+        """Unexpired entries in the file (empty if it is missing or unreadable)."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable failure cache {self.path}: {e}")
+            return {}
+
+        now = datetime.now()
+        entries = {}
+        for url, entry_data in data.get('entries', {}).items():
+            try:
+                entry = FailureEntry.from_json(entry_data)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if entry.expires_at > now:
+                entries[url] = entry
+        return entries
+
+    def get(self, url: str) -> Optional[FailureEntry]:
+        """The remembered failure of a URL, if it has not expired."""
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= datetime.now():
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self.skipped += 1
+            return entry
+
+    def record(self, url: str, kind: str, status_code: Optional[int] = None, error: str = '') -> FailureEntry:
+        """
+        Remember that scraping a URL failed.
+
+        Args:
+            url: Page that failed
+            kind: PERMANENT or TRANSIENT
+            status_code: HTTP status code of the failure, if known
+            error: Error message
+
+        Returns:
+            The stored entry
+        """
+        key = canonicalize_url(url)
+        now = datetime.now()
+        with self._lock:
+            previous = self._entries.get(key)
+            entry = FailureEntry(
+                kind=kind,
+                failed_at=now,
+                expires_at=now + self.ttls[kind],
+                status_code=status_code,
+                error=error[:500],
+                failures=previous.failures + 1 if previous else 1,
+            )
+            self._entries[key] = entry
+            self._forgotten.pop(key, None)
+            self._dirty = True
+        logger.debug(f"Remembering {kind} failure of {url} until {entry.expires_at:%Y-%m-%d %H:%M}")
+        self._maybe_save()
+        return entry
+
+    def forget(self, url: str) -> None:
+        """Drop the failure of a URL that has since been scraped successfully."""
+        key = canonicalize_url(url)
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+            self._forgotten[key] = datetime.now()
+            self._dirty = True
+        self._maybe_save()
+
+    def clear(self) -> int:
+        """Forget every failure, returning how many there were."""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._forgotten.clear()
+            self._dirty = False
+        with file_lock(self._lock_path):
+            self._write({})
+        return removed
+
+    def _maybe_save(self) -> None:
+        """Start a background save if `save_interval` has passed and none is running."""
+        with self._lock:
+            if time.monotonic() - self._last_save < self.save_interval or \
+                    (self._saver is not None and self._saver.is_alive()):
+                return
+            self._last_save = time.monotonic()
+            self._saver = threading.Thread(target=self.save, name="failure-cache-save", daemon=True)
+            self._saver.start()
+
+    def save(self) -> None:
+        """Write pending changes, merged with failures other processes saved meanwhile."""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            forgotten = dict(self._forgotten)
+            self._dirty = False
+            self._forgotten.clear()
+            self._last_save = time.monotonic()
+
+        try:
+            with file_lock(self._lock_path):
+                merged = self._load()
+                for url, forgotten_at in forgotten.items():
+                    if url in merged and merged[url].failed_at <= forgotten_at:
+                        del merged[url]
+                for url, entry in entries.items():
+                    if url not in merged or merged[url].failed_at <= entry.failed_at:
+                        merged[url] = entry
+                self._write(merged)
+        except OSError as e:
+            logger.warning(f"Could not save failure cache {self.path}: {e}")
+            with self._lock:
+                self._dirty = True
+                for url, forgotten_at in forgotten.items():
+                    self._forgotten.setdefault(url, forgotten_at)
+            return
+
+        with self._lock:
+            # Pick up failures other processes recorded, without undoing changes made while saving
+            for url, entry in merged.items():
+                if url not in self._entries and url not in self._forgotten:
+                    self._entries[url] = entry
+
+    def _write(self, entries: Dict[str, FailureEntry]) -> None:
+        """Atomically replace the file with `entries`."""
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'saved_at': datetime.now().isoformat(),
+                    'entries': {url: entry.to_json() for url, entry in entries.items()},
+                }, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Remembered failures by kind and the number of requests skipped."""
+        with self._lock:
+            entries = list(self._entries.values())
+            return {
+                'permanent': sum(1 for entry in entries if entry.kind == PERMANENT),
+                'transient': sum(1 for entry in entries if entry.kind == TRANSIENT),
+                'skipped': self.skipped,
+            }
+
+
+# Process-wide negative cache (created lazily)
+_failure_cache: Optional[FailureCache] = None
+
+
+def get_failure_cache() -> FailureCache:
+    """Get the negative cache shared by every crawler in the process."""
+    global _failure_cache
+    if _failure_cache is None:
+        _failure_cache = FailureCache.from_config()
+    return _failure_cache
+
+
+def report_failures() -> None:
+    """Log and save the shared negative cache at the end of a run, if it was used."""
+    if _failure_cache is not None:
+        stats = _failure_cache.get_stats()
+        logger.info(f"Negative cache: {stats['skipped']} scrapes of failing URLs skipped, "
+                    f"{stats['permanent']} gone and {stats['transient']} failing URLs remembered")
+        _failure_cache.save()
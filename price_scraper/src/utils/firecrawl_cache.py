@@ -2,124 +2,831 @@
 Firecrawl results caching system to avoid repeated API calls during development.
 """
 
-import json
+import asyncio
+import atexit
 import hashlib
-from pathlib import Path
-from typing import Dict, Any, Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Set, Tuple, Union
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
+from src.utils.cache_backends import CacheBackend, CacheRecord, CorruptEntryError, create_backend
+from src.utils.cache_bundle import read_bundle, write_bundle
+from src.utils.cache_metrics import CacheMetrics
+from src.utils.config import config
+from src.utils.firecrawl_formats import filter_result_fields
 from src.utils.logger import get_logger
+from src.utils.url_canonical import UrlCanonicalizer, get_url_canonicalizer
 
 logger = get_logger(__name__)
 
 
+def _estimated_size(firecrawl_result: Dict[str, Any]) -> int:
+    """Rough in-memory size of a result, dominated by its text fields."""
+    data = firecrawl_result.get('data') or {}
+    return sum(len(value) if isinstance(value, str) else 1024 for value in data.values())
+
+
+def _site_host(url: str) -> str:
+    """Host of a URL without a leading 'www.', used to find its site's policy."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+@dataclass
+class CachePolicy:
+    """
+    How long cached results stay fresh for one site.
+    
+    An entry is fresh for a lookup while it is younger than the shortest TTL of
+    the fields requested (`field_ttls` overrides `ttl` per data field, so
+    price-bearing markdown can expire before slow-changing metadata). With
+    `stale_while_revalidate`, an expired entry younger than TTL + `max_stale`
+    is still served to callers that can refresh it in the background.
+    """
+    ttl: timedelta = timedelta(hours=24)
+    field_ttls: Dict[str, timedelta] = field(default_factory=dict)
+    stale_while_revalidate: bool = False
+    max_stale: timedelta = timedelta(hours=72)
+    
+    @classmethod
+    def from_config(cls, policy_config: Dict[str, Any],
+                    defaults: Optional["CachePolicy"] = None) -> "CachePolicy":
+        """
+        Build a policy from a `cache` block (sites.yaml) or `firecrawl_cache` settings.
+        
+        Args:
+            policy_config: Mapping with ttl_hours, format_ttl_hours,
+                stale_while_revalidate and max_stale_hours (all optional)
+            defaults: Policy supplying the values the mapping leaves out
+        """
+        defaults = defaults or cls()
+        field_ttls = dict(defaults.field_ttls)
+        for field_name, hours in (policy_config.get('format_ttl_hours') or {}).items():
+            field_ttls[field_name] = timedelta(hours=hours)
+        
+        ttl_hours = policy_config.get('ttl_hours')
+        max_stale_hours = policy_config.get('max_stale_hours')
+        return cls(
+            ttl=timedelta(hours=ttl_hours) if ttl_hours is not None else defaults.ttl,
+            field_ttls=field_ttls,
+            stale_while_revalidate=policy_config.get('stale_while_revalidate', defaults.stale_while_revalidate),
+            max_stale=timedelta(hours=max_stale_hours) if max_stale_hours is not None else defaults.max_stale,
+        )
+    
+    def ttl_for(self, fields: Iterable[str]) -> timedelta:
+        """Time a result holding `fields` stays fresh."""
+        return min((self.field_ttls.get(field_name, self.ttl) for field_name in fields), default=self.ttl)
+    
+    @property
+    def retention(self) -> timedelta:
+        """Age after which an entry can no longer be served, even stale."""
+        longest = max([self.ttl, *self.field_ttls.values()])
+        return longest + self.max_stale if self.stale_while_revalidate else longest
+
+
+class MemoryTier:
+    """
+    Bounded in-process LRU of recently used cache records.
+    
+    Serves repeated lookups of the same URL within a run without touching the
+    backend. Records are shared with callers and must be treated as read-only.
+    Hits are remembered so the backend's access times (which drive its LRU
+    eviction) can be updated later, off the caller's thread.
+    """
+    
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._records: "OrderedDict[str, CacheRecord]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._accessed: Set[str] = set()
+    
+    def get(self, key: str) -> Optional[CacheRecord]:
+        """Get a record, marking it most recently used."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self.misses += 1
+                return None
+            self._records.move_to_end(key)
+            self.hits += 1
+            return record
+    
+    def put(self, record: CacheRecord) -> None:
+        """Add or replace a record, dropping the least recently used ones over the limits."""
+        if record.size > self.max_bytes:
+            self.discard(record.key)
+            return
+        with self._lock:
+            previous = self._records.pop(record.key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._records[record.key] = record
+            self._size += record.size
+            while len(self._records) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._records.popitem(last=False)
+                self._size -= evicted.size
+    
+    def mark_accessed(self, key: str) -> int:
+        """Remember that a record was served, returning how many accesses await a flush."""
+        with self._lock:
+            self._accessed.add(key)
+            return len(self._accessed)
+    
+    def drain_accessed(self) -> List[str]:
+        """Keys served since the last drain."""
+        with self._lock:
+            accessed, self._accessed = self._accessed, set()
+        return list(accessed)
+    
+    def discard(self, key: str) -> None:
+        """Forget a record."""
+        with self._lock:
+            record = self._records.pop(key, None)
+            if record is not None:
+                self._size -= record.size
+    
+    def clear(self) -> None:
+        """Forget every record."""
+        with self._lock:
+            self._records.clear()
+            self._size = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and hit counters of the tier."""
+        with self._lock:
+            return {
+                'entries': len(self._records),
+                'size_bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
 class FirecrawlCache:
-    """Cache for Firecrawl API results."""
+    """
+    Cache for Firecrawl API results.
+    
+    Freshness follows a CachePolicy per site (matched by host), falling back
+    to the default policy. get()/set() do their storage work on the calling thread. Async callers use
+    aget()/aset(): reads that miss the memory tier run on a small I/O thread
+    pool, and writes are queued to a background writer that stores them in
+    batches (one transaction per batch on SQLite). Queued writes are visible to
+    reads immediately and are flushed by flush(), close() and at interpreter exit.
+    """
     
-    def __init__(self, cache_dir: str = "data/firecrawl_cache", ttl_hours: int = 24):
+    # Eviction trims the backend to this fraction of its limits, so it does not run on every write
+    LOW_WATERMARK = 0.9
+    
+    # Memory tier hits passed on to the backend at once, on an I/O thread
+    TOUCH_FLUSH_SIZE = 256
+    
+    def __init__(self, cache_dir: str = "data/firecrawl_cache", ttl_hours: int = 24,
+                 backend: Union[str, CacheBackend] = "json", max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None, memory_entries: int = 1000,
+                 memory_bytes: int = 64 * 1024 * 1024, eviction_check_interval: int = 100,
+                 io_threads: int = 4, write_batch_size: int = 64, write_flush_interval: float = 0.05,
+                 policy: Optional[CachePolicy] = None, site_policies: Optional[Dict[str, CachePolicy]] = None,
+                 canonicalizer: Optional[UrlCanonicalizer] = None, metrics_file: Optional[str] = None,
+                 credits_per_request: float = 1.0, **backend_options: Any):
         """
         Initialize cache.
         
         Args:
             cache_dir: Directory to store cached results
-            ttl_hours: Time to live for cache entries in hours
+            ttl_hours: Time to live for cache entries in hours (ignored when `policy` is given)
+            backend: Storage backend name ('json' or 'sqlite') or instance
+            max_bytes: Stored size above which least recently used entries are evicted
+            max_entries: Entry count above which least recently used entries are evicted
+            memory_entries: Entries kept in the in-memory tier (0 disables it)
+            memory_bytes: Approximate size limit of the in-memory tier
+            eviction_check_interval: Writes between checks of the size limits
+            io_threads: Threads serving aget() reads that miss the memory tier
+            write_batch_size: Most queued writes stored in one batch
+            write_flush_interval: Seconds the writer waits to fill a batch
+            policy: Default freshness policy
+            site_policies: Policies by site host or base URL, overriding the default
+            canonicalizer: Maps URLs to the canonical form their cache key is derived
+                from (default: generic rules only, no site-specific ones)
+            metrics_file: JSON file report_metrics() writes the metrics to
+            credits_per_request: Firecrawl credits a scrape costs, for the savings estimate
+            **backend_options: Options for a named backend (e.g. compression)
         """
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.ttl = timedelta(hours=ttl_hours)
-        logger.info(f"Initialized Firecrawl cache: {self.cache_dir}")
+        self.cache_dir = cache_dir
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        if isinstance(backend, CacheBackend):
+            self.backend = backend
+        else:
+            self.backend = create_backend(backend, cache_dir, **backend_options)
+        self.default_policy = policy or CachePolicy(ttl=timedelta(hours=ttl_hours))
+        self.ttl = self.default_policy.ttl
+        self.site_policies: Dict[str, CachePolicy] = {}
+        for site, site_policy in (site_policies or {}).items():
+            self.set_site_policy(site, site_policy)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.memory = MemoryTier(memory_entries, memory_bytes) if memory_entries > 0 else None
+        self.eviction_check_interval = max(1, eviction_check_interval)
+        # Check the limits on the first write
+        self._writes_since_check = self.eviction_check_interval
+        self.evicted = 0
+        self.metrics = CacheMetrics(credits_per_request)
+        self.metrics_file = metrics_file
+        
+        self.io_threads = max(1, io_threads)
+        self.write_batch_size = max(1, write_batch_size)
+        self.write_flush_interval = write_flush_interval
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        # Records queued by aset() and not yet stored, by cache key (read-your-writes)
+        self._pending: Dict[str, CacheRecord] = {}
+        self._pending_lock = threading.Lock()
+        self._write_queue: "queue.Queue[Optional[CacheRecord]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._threads_lock = threading.Lock()
+        # Background refreshes of stale entries in flight, by cache key
+        self._refreshes: Dict[str, "asyncio.Task"] = {}
+        self.refreshed = 0
+        logger.info(f"Initialized Firecrawl cache: {self.cache_dir} ({self.backend.name} backend)")
     
-    def _get_cache_key(self, url: str) -> str:
-        """Generate cache key for URL."""
-        return hashlib.md5(url.encode('utf-8')).hexdigest()
+    @classmethod
+    def from_config(cls) -> "FirecrawlCache":
+        """Build the cache from the `firecrawl_cache` settings in settings.yaml."""
+        cache_config = config.settings.get('firecrawl_cache', {}) or {}
+        max_size_mb = cache_config.get('max_size_mb')
+        
+        # Sites may override the default freshness policy with a `cache` block in sites.yaml
+        policy = CachePolicy.from_config({'ttl_hours': 24, **cache_config})
+        site_policies = {}
+        for site_name in config.get_site_names():
+            site_config = config.get_site_config(site_name) or {}
+            if site_config.get('cache') and site_config.get('base_url'):
+                site_policies[site_config['base_url']] = CachePolicy.from_config(site_config['cache'], policy)
+        
+        return cls(
+            cache_dir=cache_config.get('directory', "data/firecrawl_cache"),
+            policy=policy,
+            site_policies=site_policies,
+            canonicalizer=get_url_canonicalizer(),
+            metrics_file=cache_config.get('metrics_file'),
+            credits_per_request=cache_config.get('credits_per_request', 1.0),
+            backend=cache_config.get('backend', "json"),
+            max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+            max_entries=cache_config.get('max_entries') or None,
+            memory_entries=cache_config.get('memory_max_entries', 1000),
+            memory_bytes=int(cache_config.get('memory_max_size_mb', 64) * 1024 * 1024),
+            io_threads=cache_config.get('io_threads', 4),
+            write_batch_size=cache_config.get('write_batch_size', 64),
+            write_flush_interval=cache_config.get('write_flush_interval_ms', 50) / 1000,
+            **cls.backend_options(cache_config),
+        )
+    
+    @staticmethod
+    def backend_options(cache_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Storage options from settings that apply to the configured backend."""
+        if cache_config.get('backend', "json") != "sqlite":
+            return {}
+        return {'compression': cache_config.get('compression', "auto")}
+    
+    def set_site_policy(self, site: str, policy: CachePolicy) -> None:
+        """Use a freshness policy for URLs on a site (host name or base URL)."""
+        self.site_policies[_site_host(site if '//' in site else f"//{site}")] = policy
     
-    def _get_cache_file(self, cache_key: str) -> Path:
-        """Get cache file path for key."""
-        return self.cache_dir / f"{cache_key}.json"
+    def policy_for(self, url: str) -> CachePolicy:
+        """Freshness policy of the site a URL belongs to."""
+        return self.site_policies.get(_site_host(url), self.default_policy)
     
-    def get(self, url: str) -> Optional[Dict[str, Any]]:
+    def _get_cache_key(self, url: str) -> str:
+        """Generate cache key for URL (URLs of the same page share one key)."""
+        return hashlib.md5(self.canonicalizer.canonicalize(url).encode('utf-8')).hexdigest()
+    
+    def get(self, url: str, fields: Optional[Iterable[str]] = None,
+            ignore_ttl: bool = False) -> Optional[Dict[str, Any]]:
         """
         Retrieve cached result for URL.
         
         Args:
             url: Product URL
-            
+            fields: Data fields the caller needs; entries missing any of them are
+                treated as a miss so the page can be re-fetched with more formats
+            ignore_ttl: Serve entries of any age (offline replay)
+        
         Returns:
-            Cached Firecrawl result or None if not found/expired
+            Cached Firecrawl result or None if not found/expired/incomplete
         """
+        started = time.perf_counter()
         cache_key = self._get_cache_key(url)
-        cache_file = self._get_cache_file(cache_key)
+        record = self._recent_record(cache_key)
+        from_memory = record is not None
+        if record is None:
+            record = self._read_record(cache_key, url)
+        
+        result = None
+        if record is not None:
+            result, _ = self._check_record(record, fields, from_memory, ignore_ttl=ignore_ttl)
+        self.metrics.observe_get(url, time.perf_counter() - started)
+        return result
+    
+    async def aget(self, url: str, fields: Optional[Iterable[str]] = None,
+                   refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+                   ignore_ttl: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve cached result for URL without blocking the event loop.
+        
+        Memory tier hits are served inline; backend reads run on the cache's
+        I/O threads.
         
-        if not cache_file.exists():
+        Args:
+            url: Product URL
+            fields: Data fields the caller needs (see get())
+            refresh: Coroutine function re-fetching (and re-caching) the URL. When
+                given and the site's policy allows stale-while-revalidate, an
+                expired entry within its stale window is returned at once and
+                refresh() is scheduled in the background
+            ignore_ttl: Serve entries of any age (offline replay)
+        
+        Returns:
+            Cached Firecrawl result or None if not found/expired/incomplete
+        """
+        started = time.perf_counter()
+        cache_key = self._get_cache_key(url)
+        record = self._recent_record(cache_key)
+        from_memory = record is not None
+        if record is None:
+            record = await self._run_io(self._read_record, cache_key, url)
+        
+        result = None
+        if record is not None:
+            result, stale = self._check_record(record, fields, from_memory,
+                                               allow_stale=refresh is not None, ignore_ttl=ignore_ttl)
+            if stale:
+                self._schedule_refresh(record, refresh)
+        self.metrics.observe_get(url, time.perf_counter() - started)
+        return result
+    
+    def _recent_record(self, cache_key: str) -> Optional[CacheRecord]:
+        """Record held in memory or queued for writing, without touching storage."""
+        record = self.memory.get(cache_key) if self.memory else None
+        if record is None and self._pending:
+            with self._pending_lock:
+                record = self._pending.get(cache_key)
+        return record
+    
+    def _read_record(self, cache_key: str, url: str) -> Optional[CacheRecord]:
+        """Read a record from the backend into the memory tier."""
+        try:
+            record = self.backend.read(cache_key)
+        except CorruptEntryError as e:
+            logger.warning(f"Invalid cache entry for {url}: {e}")
+            self.backend.discard_corrupt(cache_key)  # Remove corrupted cache
+            self.metrics.count(url, 'corrupt')
+            return None
+        
+        if record is None:
             logger.debug(f"Cache miss for {url[:60]}...")
+            self.metrics.count(url, 'misses')
             return None
         
+        self.metrics.count(url, 'bytes_read', record.size)
+        if self.memory:
+            self.memory.put(record)
+        return record
+    
+    def _check_record(self, record: CacheRecord, fields: Optional[Iterable[str]], from_memory: bool,
+                      allow_stale: bool = False, ignore_ttl: bool = False) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Result of a record if it holds the requested fields and may be served.
+        
+        Returns:
+            (result or None, whether the result is stale and should be refreshed)
+        """
+        if fields is not None:
+            fields = set(fields)
+            missing = fields - set(record.fields)
+            if missing:
+                logger.debug(f"Cache entry for {record.url[:60]}... lacks {sorted(missing)}, needs upgrade")
+                self.metrics.count(record.url, 'incomplete')
+                return None, False
+        
+        policy = self.policy_for(record.url)
+        age = datetime.now() - record.cached_at
+        overdue = age - policy.ttl_for(fields if fields is not None else record.fields)
+        stale = overdue > timedelta(0) and not ignore_ttl
+        
+        # Expired entries are left for clear_expired()/eviction; the re-fetch replaces them
+        if stale and not (allow_stale and policy.stale_while_revalidate and overdue <= policy.max_stale):
+            logger.debug(f"Cache expired for {record.url[:60]}...")
+            self.metrics.count(record.url, 'expired')
+            if self.memory:
+                self.memory.discard(record.key)
+            return None, False
+        
+        if from_memory:
+            # Access times are written later on an I/O thread, never by the caller
+            if self.memory and self.memory.mark_accessed(record.key) >= self.TOUCH_FLUSH_SIZE:
+                self._io_pool().submit(self._flush_touches)
+            self.metrics.count(record.url, 'memory_hits')
+        self.metrics.count(record.url, 'stale_hits' if stale else 'hits')
+        if stale:
+            logger.info(f"Serving stale cache entry for {record.url[:60]}... ({overdue} past its TTL)")
+        elif from_memory:
+            logger.debug(f"Memory cache hit for {record.url[:60]}...")
+        else:
+            logger.info(f"Cache hit for {record.url[:60]}...")
+        return filter_result_fields(record.firecrawl_result, fields), stale
+    
+    def _schedule_refresh(self, record: CacheRecord, refresh: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background refresh of a stale entry unless one is already running."""
+        if record.key in self._refreshes:
+            return
+        self.metrics.count(record.url, 'refreshes')
+        self._refreshes[record.key] = asyncio.ensure_future(self._refresh(record, refresh))
+    
+    async def _refresh(self, record: CacheRecord, refresh: Callable[[], Awaitable[Any]]) -> None:
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            # Check if expired
-            cached_at = datetime.fromisoformat(cache_data['cached_at'])
-            if datetime.now() - cached_at > self.ttl:
-                logger.debug(f"Cache expired for {url[:60]}...")
-                cache_file.unlink()  # Remove expired cache
-                return None
-            
-            logger.info(f"Cache hit for {url[:60]}...")
-            return cache_data['firecrawl_result']
-            
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.warning(f"Invalid cache file for {url}: {e}")
-            cache_file.unlink()  # Remove corrupted cache
-            return None
+            await refresh()
+            self.refreshed += 1
+            logger.debug(f"Refreshed stale cache entry for {record.url[:60]}...")
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {record.url}: {e}")
+        finally:
+            self._refreshes.pop(record.key, None)
+    
+    async def wait_for_refreshes(self) -> int:
+        """
+        Wait for the background refreshes started by aget() to finish.
+        
+        Returns:
+            Number of refreshes waited for
+        """
+        waited = 0
+        while self._refreshes:
+            tasks = list(self._refreshes.values())
+            waited += len(tasks)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return waited
+    
+    def _io_pool(self) -> ThreadPoolExecutor:
+        """The cache's I/O threads (created on first use)."""
+        if self._io_executor is None:
+            with self._threads_lock:
+                if self._io_executor is None:
+                    self._io_executor = ThreadPoolExecutor(max_workers=self.io_threads,
+                                                           thread_name_prefix="firecrawl-cache-io")
+        return self._io_executor
+    
+    async def _run_io(self, func, *args):
+        """Run blocking storage work on the cache's I/O threads."""
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool(), func, *args)
+    
+    def _flush_touches(self) -> None:
+        """Pass the memory tier's hits to the backend as accesses (call off the event loop)."""
+        if not self.memory:
+            return
+        try:
+            for key in self.memory.drain_accessed():
+                self.backend.touch(key)
+        except Exception as e:
+            logger.warning(f"Failed to record cache accesses: {e}")
+    
+    def get_cached_fields(self, url: str) -> Set[str]:
+        """
+        Get the data fields held by the cache entry for URL.
+        
+        Used to fetch the union of old and new fields when an entry is upgraded,
+        so extractors needing fewer formats keep hitting the cache.
+        """
+        cache_key = self._get_cache_key(url)
+        record = self._recent_record(cache_key)
+        if record is not None:
+            return set(record.fields)
+        return set(self.backend.read_fields(cache_key) or ())
     
-    def set(self, url: str, firecrawl_result: Dict[str, Any]) -> None:
+    async def aget_cached_fields(self, urls: Iterable[str]) -> Set[str]:
+        """Union of the data fields cached for several URLs, read off the event loop."""
+        urls = list(urls)
+        return await self._run_io(lambda: set().union(*(self.get_cached_fields(url) for url in urls)))
+    
+    def _make_record(self, url: str, firecrawl_result: Dict[str, Any],
+                     fields: Optional[Iterable[str]]) -> CacheRecord:
+        firecrawl_result = filter_result_fields(firecrawl_result, fields)
+        return CacheRecord(
+            key=self._get_cache_key(url),
+            url=url,
+            cached_at=datetime.now(),
+            fields=sorted(firecrawl_result.get('data', {}).keys()),
+            firecrawl_result=firecrawl_result,
+            size=_estimated_size(firecrawl_result),
+        )
+    
+    def set(self, url: str, firecrawl_result: Dict[str, Any],
+            fields: Optional[Iterable[str]] = None) -> None:
         """
         Store Firecrawl result in cache.
         
         Args:
             url: Product URL
             firecrawl_result: Firecrawl API response
+            fields: Data fields to store (default: everything in the result)
         """
-        cache_key = self._get_cache_key(url)
-        cache_file = self._get_cache_file(cache_key)
-        
-        cache_data = {
-            'url': url,
-            'cached_at': datetime.now().isoformat(),
-            'firecrawl_result': firecrawl_result
-        }
+        record = self._make_record(url, firecrawl_result, fields)
         
+        started = time.perf_counter()
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            self.backend.write(record)
+            self.metrics.observe_set(url, time.perf_counter() - started, record.size)
             logger.debug(f"Cached result for {url[:60]}...")
         except Exception as e:
             logger.error(f"Failed to cache result for {url}: {e}")
+            if self.memory:
+                self.memory.discard(record.key)
+            return
+        
+        if self.memory:
+            self.memory.put(record)
+        self._count_writes(1)
+    
+    async def aset(self, url: str, firecrawl_result: Dict[str, Any],
+                   fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Queue a Firecrawl result for the background writer.
+        
+        Returns without waiting for storage; the result is served from memory
+        until the writer has stored it. Arguments are as for set().
+        """
+        record = self._make_record(url, firecrawl_result, fields)
+        with self._pending_lock:
+            self._pending[record.key] = record
+        if self.memory:
+            self.memory.put(record)
+        self._start_writer()
+        self._write_queue.put(record)
+    
+    def _count_writes(self, count: int) -> None:
+        """Check the size limits every `eviction_check_interval` writes."""
+        self._writes_since_check += count
+        if self._writes_since_check >= self.eviction_check_interval:
+            self._writes_since_check = 0
+            self.enforce_limits()
+    
+    def _start_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._threads_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="firecrawl-cache-writer", daemon=True)
+                self._writer.start()
+                # Daemon threads are killed at exit; store whatever is still queued first
+                atexit.register(self.flush)
+    
+    def _write_loop(self) -> None:
+        """Store queued records in batches until a None sentinel is dequeued."""
+        while True:
+            record = self._write_queue.get()
+            if record is None:
+                self._write_queue.task_done()
+                return
+            
+            batch = [record]
+            stop = False
+            deadline = time.monotonic() + self.write_flush_interval
+            while len(batch) < self.write_batch_size:
+                try:
+                    record = self._write_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            
+            self._write_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._write_queue.task_done()
+            if stop:
+                return
+    
+    def _write_batch(self, batch: List[CacheRecord]) -> None:
+        # A URL queued twice in one batch only needs its latest result stored
+        records = list({record.key: record for record in batch}.values())
+        self._flush_touches()
+        started = time.perf_counter()
+        try:
+            self.backend.write_many(records)
+            # Entries of a batch share its storage time
+            elapsed = (time.perf_counter() - started) / len(records)
+            for record in records:
+                self.metrics.observe_set(record.url, elapsed, record.size)
+            logger.debug(f"Stored {len(records)} queued cache entries")
+        except Exception as e:
+            logger.error(f"Failed to store {len(records)} queued cache entries: {e}")
+            if self.memory:
+                for record in records:
+                    self.memory.discard(record.key)
+        
+        with self._pending_lock:
+            for record in records:
+                # Keep records queued again since this batch was taken
+                if self._pending.get(record.key) is record:
+                    del self._pending[record.key]
+        
+        try:
+            self._count_writes(len(records))
+        except Exception as e:
+            logger.error(f"Failed to check cache size limits: {e}")
+    
+    def flush(self) -> None:
+        """Block until every queued write has been stored."""
+        if self._writer is not None:
+            self._write_queue.join()
+    
+    async def aflush(self) -> None:
+        """Wait for every queued write to be stored without blocking the event loop."""
+        if self._writer is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_queue.join)
+    
+    def enforce_limits(self) -> int:
+        """
+        Evict least recently used entries if the cache exceeds its size limits.
+        
+        Entries are evicted down to LOW_WATERMARK of the limits.
+        
+        Returns:
+            Number of entries evicted
+        """
+        if self.max_bytes is None and self.max_entries is None:
+            return 0
+        
+        # Eviction order must reflect the entries recently served from memory
+        self._flush_touches()
+        stats = self.backend.stats()
+        over_bytes = self.max_bytes is not None and stats['total_size_bytes'] > self.max_bytes
+        over_entries = self.max_entries is not None and stats['total_entries'] > self.max_entries
+        if not (over_bytes or over_entries):
+            return 0
+        
+        try:
+            removed_count = self.backend.evict(
+                max_bytes=int(self.max_bytes * self.LOW_WATERMARK) if self.max_bytes is not None else None,
+                max_entries=int(self.max_entries * self.LOW_WATERMARK) if self.max_entries is not None else None,
+            )
+        except Exception as e:
+            logger.error(f"Failed to evict cache entries: {e}")
+            return 0
+        
+        self.evicted += removed_count
+        logger.info(f"Evicted {removed_count} least recently used cache entries "
+                    f"({stats['total_entries']} entries, {stats['total_size_bytes'] / 1024 / 1024:.1f} MB before)")
+        return removed_count
+    
+    def rekey_entries(self) -> Tuple[int, int]:
+        """
+        Move entries to the keys of their canonical URLs.
+        
+        Entries cached before keys were derived from canonical URLs (or before a
+        site's canonicalization rules changed) are stored under the key of the
+        raw URL and would never be hit again. When several entries map to one
+        canonical URL, the most recently cached one is kept.
+        
+        Returns:
+            (entries moved, duplicate entries dropped)
+        """
+        self.flush()
+        moved = dropped = 0
+        for record in self.backend.iter_records():
+            canonical_key = self._get_cache_key(record.url)
+            if canonical_key == record.key:
+                continue
+            
+            try:
+                existing = self.backend.read(canonical_key)
+            except CorruptEntryError:
+                existing = None
+            if existing is not None and existing.cached_at >= record.cached_at:
+                dropped += 1
+            else:
+                self.backend.write(replace(record, key=canonical_key))
+                moved += 1
+                dropped += existing is not None
+            self.backend.delete(record.key)
+        
+        if self.memory:
+            self.memory.clear()
+        if moved or dropped:
+            logger.info(f"Re-keyed {moved} cache entries to canonical URLs, dropped {dropped} duplicates")
+        return moved, dropped
+    
+    @staticmethod
+    def _bundle_filter(sites: Optional[Iterable[str]], max_age: Optional[timedelta]):
+        """Predicate selecting records of the given sites (hosts or base URLs) cached within max_age."""
+        hosts = {_site_host(site if '//' in site else f"//{site}") for site in sites} if sites else None
+        cutoff = datetime.now() - max_age if max_age is not None else None
+        return lambda record: ((hosts is None or _site_host(record.url) in hosts)
+                               and (cutoff is None or record.cached_at >= cutoff))
+    
+    def export_bundle(self, path: str, sites: Optional[Iterable[str]] = None,
+                      max_age: Optional[timedelta] = None) -> int:
+        """
+        Export cache entries to a portable bundle file (see cache_bundle).
+        
+        Args:
+            path: Bundle file to write (.tar.zst or .tar.gz)
+            sites: Only export entries of these sites (host names or base URLs)
+            max_age: Only export entries cached within this time
+        
+        Returns:
+            Number of entries exported
+        """
+        self.flush()
+        sites = sorted(sites) if sites else None
+        selected = self._bundle_filter(sites, max_age)
+        count = write_bundle(
+            (record for record in self.backend.iter_records() if selected(record)),
+            path,
+            filters={'sites': sites, 'max_age_hours': max_age.total_seconds() / 3600 if max_age else None},
+        )
+        logger.info(f"Exported {count} cache entries to {path}")
+        return count
+    
+    def import_bundle(self, path: str, sites: Optional[Iterable[str]] = None,
+                      max_age: Optional[timedelta] = None, batch_size: int = 200) -> Tuple[int, int]:
+        """
+        Import the entries of a bundle file, keeping original cache times.
+        
+        Entries are keyed by this cache's canonical URLs. Where the cache already
+        holds an entry for the same page, the more recently cached one is kept.
+        
+        Args:
+            path: Bundle file to read
+            sites: Only import entries of these sites (host names or base URLs)
+            max_age: Only import entries cached within this time
+            batch_size: Entries stored per backend write
+        
+        Returns:
+            (entries imported, entries skipped)
+        
+        Raises:
+            BundleError: If the file is not a readable bundle
+        """
+        self.flush()
+        selected = self._bundle_filter(sites, max_age)
+        imported = skipped = 0
+        batch: List[CacheRecord] = []
+        
+        for record in read_bundle(path):
+            record.key = self._get_cache_key(record.url)
+            if not selected(record):
+                skipped += 1
+                continue
+            try:
+                existing = self.backend.read(record.key)
+            except CorruptEntryError:
+                existing = None
+            if existing is not None and existing.cached_at >= record.cached_at:
+                skipped += 1
+                continue
+            
+            record.size = _estimated_size(record.firecrawl_result)
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.backend.write_many(batch)
+                imported += len(batch)
+                batch = []
+        
+        if batch:
+            self.backend.write_many(batch)
+            imported += len(batch)
+        if self.memory:
+            self.memory.clear()
+        
+        logger.info(f"Imported {imported} cache entries from {path} ({skipped} skipped)")
+        self.enforce_limits()
+        return imported, skipped
     
     def clear_expired(self) -> int:
         """
         Clear expired cache entries.
         
+        Entries are kept while any policy could still serve them (the longest
+        TTL plus stale window across sites), so shorter-lived entries may linger
+        until then; they are never served once expired.
+        
         Returns:
             Number of expired entries removed
         """
-        removed_count = 0
-        
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                cached_at = datetime.fromisoformat(cache_data['cached_at'])
-                if datetime.now() - cached_at > self.ttl:
-                    cache_file.unlink()
-                    removed_count += 1
-                    
-            except (json.JSONDecodeError, KeyError, ValueError):
-                # Remove corrupted cache files
-                cache_file.unlink()
-                removed_count += 1
+        self.flush()
+        retention = max(policy.retention for policy in [self.default_policy, *self.site_policies.values()])
+        removed_count = self.backend.delete_expired(datetime.now() - retention)
+        if self.memory:
+            self.memory.clear()
         
         if removed_count > 0:
             logger.info(f"Cleared {removed_count} expired cache entries")
@@ -133,21 +840,82 @@ class FirecrawlCache:
         Returns:
             Number of entries removed
         """
-        cache_files = list(self.cache_dir.glob("*.json"))
-        for cache_file in cache_files:
-            cache_file.unlink()
-        
-        logger.info(f"Cleared {len(cache_files)} cache entries")
-        return len(cache_files)
+        self.flush()
+        removed_count = self.backend.clear()
+        if self.memory:
+            self.memory.clear()
+        logger.info(f"Cleared {removed_count} cache entries")
+        return removed_count
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files)
+        stats = self.backend.stats()
+        total_size = stats['total_size_bytes']
         
         return {
-            'total_entries': len(cache_files),
-            'total_size_bytes': total_size,
+            **stats,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'cache_dir': str(self.cache_dir)
-        }
\ No newline at end of file
+            'cache_dir': str(self.cache_dir),
+            'backend': self.backend.name,
+            'max_size_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'evicted': self.evicted,
+            'refreshed': self.refreshed,
+            'metrics': self.metrics.snapshot(),
+            'memory': self.memory.get_stats() if self.memory else None,
+        }
+    
+    def report_metrics(self) -> Dict[str, Any]:
+        """
+        Log the cache metrics per site and write them to `metrics_file` if set.
+        
+        Returns:
+            The metrics snapshot
+        """
+        snapshot = self.metrics.snapshot()
+        total = snapshot['total']
+        logger.info(f"Firecrawl cache: {total['hits']} hits, {total['stale_hits']} stale, "
+                    f"{total['misses'] + total['expired'] + total['incomplete'] + total['corrupt']} misses; "
+                    f"{total['requests_saved']} Firecrawl requests (~{total['credits_saved']:g} credits) saved")
+        for line in self.metrics.format_summary():
+            logger.info(f"  {line}")
+        
+        if self.metrics_file:
+            try:
+                self.metrics.dump(self.metrics_file)
+                logger.debug(f"Wrote cache metrics to {self.metrics_file}")
+            except OSError as e:
+                logger.warning(f"Could not write cache metrics to {self.metrics_file}: {e}")
+        return snapshot
+    
+    def close(self) -> None:
+        """Store queued writes, stop the background threads and close the storage backend."""
+        with self._threads_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._write_queue.put(None)
+            writer.join()
+            atexit.unregister(self.flush)
+        self._flush_touches()
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+        self.backend.close()
+
+
+# Process-wide cache built from settings.yaml (created lazily)
+_firecrawl_cache: Optional[FirecrawlCache] = None
+
+
+def get_firecrawl_cache() -> FirecrawlCache:
+    """Get the Firecrawl cache shared by every crawler in the process."""
+    global _firecrawl_cache
+    if _firecrawl_cache is None:
+        _firecrawl_cache = FirecrawlCache.from_config()
+    return _firecrawl_cache
+
+
+def report_cache_metrics() -> None:
+    """Report the metrics of the shared cache at the end of a run, if it was used."""
+    if _firecrawl_cache is not None:
+        _firecrawl_cache.report_metrics()
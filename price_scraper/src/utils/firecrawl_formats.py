@@ -0,0 +1,56 @@
+"""
+Format profiles describing which parts of a Firecrawl page an extractor needs.
+"""
+
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+
+class FormatProfile(Enum):
+    """Page content an extractor reads from Firecrawl results."""
+    METADATA = "metadata"  # Title, description and other page metadata only
+    MARKDOWN = "markdown"  # Metadata plus the markdown body
+    FULL = "full"          # Metadata, markdown, HTML and links
+
+
+# Keys of the cached `data` dict that each profile needs
+PROFILE_FIELDS: Dict[FormatProfile, FrozenSet[str]] = {
+    FormatProfile.METADATA: frozenset({'metadata'}),
+    FormatProfile.MARKDOWN: frozenset({'metadata', 'markdown'}),
+    FormatProfile.FULL: frozenset({'metadata', 'markdown', 'html', 'links'}),
+}
+
+# Content fields that map to Firecrawl `formats` (metadata is always returned)
+CONTENT_FORMATS = ('markdown', 'html', 'links')
+
+ALL_FIELDS: FrozenSet[str] = PROFILE_FIELDS[FormatProfile.FULL]
+
+
+def profile_fields(profile: FormatProfile) -> FrozenSet[str]:
+    """Get the data fields needed by a profile."""
+    return PROFILE_FIELDS[profile]
+
+
+def firecrawl_formats(fields: Iterable[str]) -> List[str]:
+    """
+    Get the Firecrawl `formats` to request for a set of data fields.
+
+    Metadata comes back with every scrape, so a metadata-only request asks for
+    markdown, Firecrawl's default format, and the markdown is simply not kept.
+    """
+    formats = [fmt for fmt in CONTENT_FORMATS if fmt in fields]
+    return formats or ['markdown']
+
+
+def filter_result_fields(firecrawl_result: Dict[str, Any],
+                         fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Return a copy of a Firecrawl result whose `data` only holds the given fields."""
+    if fields is None:
+        return firecrawl_result
+
+    fields = set(fields)
+    data = firecrawl_result.get('data', {}) or {}
+    return {
+        **firecrawl_result,
+        'data': {key: value for key, value in data.items() if key in fields},
+    }
@@ -3,78 +3,166 @@ Rate limiting utilities for API requests.
 """
 
 import asyncio
+import threading
 import time
-from typing import Optional
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class RateLimiter:
-    """Simple rate limiter for API requests."""
-    
+    """
+    Token bucket rate limiter with FIFO waiting.
+
+    Each caller reserves a token up front and then sleeps outside of any lock
+    until its slot comes up. Tokens may go negative, which queues callers
+    behind each other in arrival order without serializing their sleeps.
+    """
+
     def __init__(self, requests_per_second: float = 2.0, burst_size: int = 5):
         """
         Initialize rate limiter.
-        
+
         Args:
             requests_per_second: Maximum requests per second
             burst_size: Maximum burst of requests before rate limiting kicks in
         """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
         self.requests_per_second = requests_per_second
-        self.burst_size = burst_size
-        self.tokens = burst_size
-        self.last_refill = time.time()
-        self._lock = asyncio.Lock()
-    
-    async def acquire(self) -> None:
-        """Acquire permission to make a request (blocks if rate limited)."""
-        async with self._lock:
-            now = time.time()
-            
+        self.burst_size = max(1, burst_size)
+        self.tokens = float(self.burst_size)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve a token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+
             # Refill tokens based on elapsed time
             elapsed = now - self.last_refill
             self.tokens = min(self.burst_size, self.tokens + elapsed * self.requests_per_second)
             self.last_refill = now
-            
-            # If no tokens available, wait
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) / self.requests_per_second
-                await asyncio.sleep(wait_time)
-                self.tokens = 0
-            else:
-                self.tokens -= 1
-    
-    async def wait_if_needed(self, delay_between_requests: float = 0.5) -> None:
+
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.requests_per_second
+
+    def _refund(self) -> None:
+        """Return a reserved token that was never used."""
+        with self._lock:
+            self.tokens = min(self.burst_size, self.tokens + 1)
+
+    async def acquire(self) -> None:
+        """Acquire permission to make a request (waits if rate limited)."""
+        wait_time = self._reserve()
+        if wait_time <= 0:
+            return
+
+        try:
+            await asyncio.sleep(wait_time)
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+    async def wait_if_needed(self) -> None:
+        """Legacy alias for acquire()."""
+        await self.acquire()
+
+
+class DelayRateLimiter(RateLimiter):
+    """Delay-based rate limiter (for backward compatibility)."""
+
+    def __init__(self, requests_per_second: float = 2.0, delay_between_requests: float = 0.5):
+        self.delay_between_requests = delay_between_requests
+        if delay_between_requests > 0:
+            requests_per_second = min(requests_per_second, 1.0 / delay_between_requests)
+        super().__init__(requests_per_second=requests_per_second, burst_size=1)
+
+
+class RateLimiterRegistry:
+    """
+    Process-wide registry of rate limiters keyed by host.
+
+    All crawler instances and scripts targeting the same host share one token
+    bucket, so they draw from the same request budget.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize_host(url_or_host: str) -> str:
+        """Extract a lowercase host from a URL or bare host name."""
+        parsed = urlparse(url_or_host if '//' in url_or_host else f"//{url_or_host}")
+        return (parsed.hostname or url_or_host).lower()
+
+    def get(self, host: str, requests_per_second: float = 2.0, burst_size: int = 1) -> RateLimiter:
         """
-        Simple delay-based rate limiting (legacy method for compatibility).
-        
+        Get the limiter for a host, creating it on first use.
+
         Args:
-            delay_between_requests: Minimum delay between requests
+            host: Host name or any URL on that host
+            requests_per_second: Rate to use if the limiter does not exist yet
+            burst_size: Bucket capacity to use if the limiter does not exist yet
         """
-        if hasattr(self, '_last_request_time'):
-            current_time = time.time()
-            time_since_last = current_time - self._last_request_time
-            
-            if time_since_last < delay_between_requests:
-                wait_time = delay_between_requests - time_since_last
-                await asyncio.sleep(wait_time)
-        
-        self._last_request_time = time.time()
-
-
-class DelayRateLimiter:
-    """Simple delay-based rate limiter (for backward compatibility)."""
-    
-    def __init__(self, requests_per_second: float = 2.0, delay_between_requests: float = 0.5):
-        self.requests_per_second = requests_per_second
-        self.delay_between_requests = delay_between_requests
-        self.last_request_time = 0.0
-    
-    async def wait_if_needed(self):
-        """Wait if necessary to respect rate limits."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.delay_between_requests:
-            wait_time = self.delay_between_requests - time_since_last
-            await asyncio.sleep(wait_time)
-        
-        self.last_request_time = time.time()
\ No newline at end of file
+        key = self._normalize_host(host)
+
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = RateLimiter(requests_per_second=requests_per_second, burst_size=burst_size)
+                self._limiters[key] = limiter
+                logger.debug(f"Created rate limiter for {key}: {requests_per_second} req/s, burst {burst_size}")
+            elif (limiter.requests_per_second, limiter.burst_size) != (requests_per_second, max(1, burst_size)):
+                logger.debug(f"Reusing existing rate limiter for {key} ({limiter.requests_per_second} req/s)")
+
+        return limiter
+
+    def for_site(self, site_name: str, site_config: Dict[str, Any]) -> RateLimiter:
+        """
+        Get the limiter for a site from its sites.yaml configuration.
+
+        Uses `rate_limit.requests_per_second` and `rate_limit.burst_size`. Sites that
+        only define `delay_between_requests` are converted to the equivalent rate.
+        The limiter is keyed by the host of `base_url`, or by the site name when
+        that has no host, so such sites do not share one bucket.
+
+        Args:
+            site_name: Site name
+            site_config: Site configuration
+        """
+        rate_config = site_config.get('rate_limit', {}) or {}
+
+        requests_per_second = rate_config.get('requests_per_second')
+        if not requests_per_second:
+            delay = rate_config.get('delay_between_requests', 0.5)
+            requests_per_second = 1.0 / delay if delay > 0 else 2.0
+
+        host = urlparse(site_config.get('base_url') or '').hostname
+        return self.get(
+            host or site_name,
+            requests_per_second=float(requests_per_second),
+            burst_size=int(rate_config.get('burst_size', 1))
+        )
+
+    def find(self, host: str) -> Optional[RateLimiter]:
+        """Look up an existing limiter without creating one."""
+        with self._lock:
+            return self._limiters.get(self._normalize_host(host))
+
+    def clear(self) -> None:
+        """Drop all registered limiters."""
+        with self._lock:
+            self._limiters.clear()
+
+
+# Global registry instance
+rate_limiters = RateLimiterRegistry()
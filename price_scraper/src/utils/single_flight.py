@@ -0,0 +1,87 @@
+"""
+Single-flight request coalescing for async calls.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared call's future when the caller running the work was cancelled."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait on the same future and receive the same result or exception.
+    Once the call finishes the key is forgotten, so later calls run again. If
+    the caller running the work is cancelled, its waiters start the call over:
+    one of them runs the work and the others join it.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` for `key`, or wait for the call already in flight for it.
+
+        Args:
+            key: Identity of the work (e.g. a canonical URL)
+            func: Zero-argument coroutine function doing the work
+
+        Returns:
+            The result of the single shared call
+        """
+        while (future := self._in_flight.get(key)) is not None:
+            self.coalesced += 1
+            logger.debug(f"{self.name}: joined in-flight call for {str(key)[:60]}...")
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # Nothing was shared after all; run the work again or join whoever does
+                self.coalesced -= 1
+                logger.debug(f"{self.name}: in-flight call for {str(key)[:60]}... was cancelled, retrying")
+
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" warnings when nobody joined
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        self.executed += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled(f"Shared call for {key} was cancelled"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on."""
+        return len(self._in_flight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for calls executed and calls coalesced onto them."""
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+        }
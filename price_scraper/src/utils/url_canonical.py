@@ -0,0 +1,147 @@
+"""
+Canonical URLs used to identify product pages.
+
+The same product is often reachable under several URLs: tracking query
+parameters, fragments, trailing slashes, host case, `www.` and `http` vs
+`https` all change the string without changing the page. Cache keys, the
+products.csv registry and crawl deduplication compare canonical URLs instead.
+
+Sites can add rules in sites.yaml, e.g. xlmoto/24mx product pages are keyed
+on the `_pid-PP-NNNN` id at the end of the path, so renamed product slugs
+still map to one entry:
+
+    url_canonical:
+      product_id_pattern: "_pid-(P[PM]-\\d+)"
+      keep_query_params: []
+
+Canonical URLs are identities, not necessarily fetchable addresses; crawlers
+keep fetching the URL they were given.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'srsltid', 'ref',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+@dataclass
+class CanonicalRule:
+    """Site-specific canonicalization of product URLs."""
+    product_id_pattern: Optional[str] = None  # Regex on the path; group 1 identifies the product
+    keep_query_params: Optional[List[str]] = None  # Only these parameters are kept (None: all but tracking)
+
+    def __post_init__(self):
+        self._product_id = re.compile(self.product_id_pattern) if self.product_id_pattern else None
+
+    def product_id(self, path: str) -> Optional[str]:
+        """Product id found in a URL path, if the rule defines one."""
+        if self._product_id is None:
+            return None
+        match = self._product_id.search(path)
+        return match.group(1) if match else None
+
+
+def _host(netloc_host: str) -> str:
+    host = netloc_host.lower().rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+class UrlCanonicalizer:
+    """Maps URLs to their canonical form, applying per-site rules by host."""
+
+    def __init__(self, rules: Optional[Dict[str, CanonicalRule]] = None):
+        """
+        Initialize the canonicalizer.
+
+        Args:
+            rules: Rules by site host or base URL
+        """
+        self.rules: Dict[str, CanonicalRule] = {}
+        for site, rule in (rules or {}).items():
+            self.add_rule(site, rule)
+
+    @classmethod
+    def from_config(cls) -> "UrlCanonicalizer":
+        """Build the canonicalizer from the `url_canonical` blocks in sites.yaml."""
+        rules = {}
+        for site_name in config.get_site_names():
+            site_config = config.get_site_config(site_name) or {}
+            rule_config = site_config.get('url_canonical')
+            if rule_config and site_config.get('base_url'):
+                rules[site_config['base_url']] = CanonicalRule(
+                    product_id_pattern=rule_config.get('product_id_pattern'),
+                    keep_query_params=rule_config.get('keep_query_params'),
+                )
+        return cls(rules)
+
+    def add_rule(self, site: str, rule: CanonicalRule) -> None:
+        """Use a rule for URLs on a site (host name or base URL)."""
+        self.rules[_host(urlsplit(site if '//' in site else f"//{site}").hostname or site)] = rule
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Canonical form of a URL.
+
+        Scheme is https, the host is lowercased without `www.` or a default
+        port, the fragment and tracking parameters are dropped, remaining
+        parameters are sorted, and a trailing slash is removed. URLs matching
+        a site's product id pattern become https://<host>/_pid-<id>.
+        Strings that are not absolute http(s) URLs are returned stripped.
+        """
+        url = url.strip()
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return url
+        if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+            return url
+
+        host = _host(parts.hostname)
+        if port is not None and port != DEFAULT_PORTS[parts.scheme.lower()]:
+            host = f"{host}:{port}"
+
+        rule = self.rules.get(_host(parts.hostname))
+        product_id = rule.product_id(parts.path) if rule else None
+        if product_id is not None:
+            return f"https://{host}/_pid-{product_id}"
+
+        path = parts.path.rstrip('/') or '/'
+        params = [
+            (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if (name in rule.keep_query_params if rule and rule.keep_query_params is not None
+                else name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES))
+        ]
+        return urlunsplit(('https', host, path, urlencode(sorted(params)), ''))
+
+
+# Process-wide canonicalizer built from sites.yaml (created lazily)
+_url_canonicalizer: Optional[UrlCanonicalizer] = None
+
+
+def get_url_canonicalizer() -> UrlCanonicalizer:
+    """Get the canonicalizer shared by the cache, crawlers and sitemap processing."""
+    global _url_canonicalizer
+    if _url_canonicalizer is None:
+        _url_canonicalizer = UrlCanonicalizer.from_config()
+        logger.debug(f"Loaded URL canonicalization rules for {len(_url_canonicalizer.rules)} sites")
+    return _url_canonicalizer
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of a URL using the rules configured in sites.yaml."""
+    return get_url_canonicalizer().canonicalize(url)
@@ -0,0 +1,57 @@
+"""
+Shared test setup and the Firecrawl stand-ins used across crawler tests.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.retry import RetryBudget, RetryPolicy
+from src.models.product import Product
+from src.utils.firecrawl_formats import FormatProfile
+
+# Configuration is read from config/ relative to the working directory
+os.chdir(Path(__file__).parent.parent)
+
+
+class StubScrapeApp:
+    """Stand-in for FirecrawlApp.scrape_url that takes a while and counts its calls."""
+
+    def __init__(self, error: Optional[Exception] = None, delay: float = 0.2):
+        self.error = error
+        self.delay = delay
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def scrape_url(self, url: str, **kwargs: Any) -> SimpleNamespace:
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(success=True, markdown='', html='', links=[], metadata={'title': "Brake pads"})
+
+
+class StubCrawler(BaseCrawler):
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, app: StubScrapeApp, site_name: str):
+        self.app = app
+        site_config = {
+            'base_url': 'https://flight.invalid',
+            'currency': 'EUR',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__(site_name, site_config, use_cache=False, replay=False,
+                         retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02, budget=RetryBudget()))
+
+    def _initialize_firecrawl(self):
+        self.firecrawl_app = self.app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        metadata = firecrawl_data.get('data', {}).get('metadata', {})
+        return Product(name=metadata.get('title', ''), url=url, site_name=self.site_name, currency=self.currency)
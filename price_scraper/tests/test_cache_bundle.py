@@ -0,0 +1,185 @@
+"""
+Tests for exporting and importing cache bundles, and for replaying a crawl from the cache.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+import pytest
+
+from src.crawlers import base_crawler
+from src.crawlers.base_crawler import BaseCrawler, ReplayMissError
+from src.models.product import Product
+from src.utils.cache_backends import CacheRecord
+from src.utils.cache_bundle import BundleError, read_bundle
+from src.utils.failure_cache import FailureCache
+from src.utils.firecrawl_cache import CachePolicy, FirecrawlCache
+from src.utils.firecrawl_formats import FormatProfile
+from tests.conftest import StubScrapeApp
+
+SHOP_URLS = [f"https://shop.invalid/product-{i}" for i in range(3)]
+OUTLET_URLS = [f"https://www.outlet.invalid/product-{i}" for i in range(2)]
+
+
+def result(url: str) -> Dict[str, Any]:
+    return {'success': True, 'data': {'markdown': f"Brake pads at {url}\n", 'metadata': {'title': url}}}
+
+
+def make_cache(tmp_path, backend: str, name: str = "cache", **kwargs: Any) -> FirecrawlCache:
+    return FirecrawlCache(cache_dir=str(tmp_path / name), backend=backend, memory_entries=0, **kwargs)
+
+
+def put(cache: FirecrawlCache, url: str, cached_at: datetime, title: str = "") -> None:
+    """Store an entry with the given cache time."""
+    firecrawl_result = result(url)
+    if title:
+        firecrawl_result['data']['metadata']['title'] = title
+    cache.backend.write(CacheRecord(key=cache._get_cache_key(url), url=url, cached_at=cached_at,
+                                    fields=sorted(firecrawl_result['data']), firecrawl_result=firecrawl_result))
+
+
+def cached_title(cache: FirecrawlCache, url: str) -> str:
+    record = cache.backend.read(cache._get_cache_key(url))
+    assert record is not None
+    return record.firecrawl_result['data']['metadata']['title']
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+@pytest.mark.parametrize("suffix", [".tar.gz", ".tar.zst"])
+def test_bundles_round_trip_every_entry(tmp_path, backend, suffix):
+    path = str(tmp_path / f"bundle{suffix}")
+    cached_at = datetime(2026, 3, 1, 12, 0)
+    source = make_cache(tmp_path, backend, "source")
+    target = make_cache(tmp_path, backend, "target")
+    try:
+        for url in SHOP_URLS + OUTLET_URLS:
+            put(source, url, cached_at)
+
+        assert source.export_bundle(path) == 5
+        assert target.import_bundle(path) == (5, 0)
+
+        for url in SHOP_URLS + OUTLET_URLS:
+            record = target.backend.read(target._get_cache_key(url))
+            assert record is not None
+            # Original cache times are kept
+            assert (record.url, record.cached_at, record.fields) == (url, cached_at, ['markdown', 'metadata'])
+            assert record.firecrawl_result == result(url)
+    finally:
+        source.close()
+        target.close()
+
+
+def test_bundles_are_compressed_as_their_name_says(tmp_path):
+    cache = make_cache(tmp_path, "json")
+    put(cache, SHOP_URLS[0], datetime.now())
+
+    cache.export_bundle(str(tmp_path / "bundle.tar.zst"))
+    cache.export_bundle(str(tmp_path / "bundle.tar.gz"))
+
+    assert (tmp_path / "bundle.tar.zst").read_bytes()[:4] == b'\x28\xb5\x2f\xfd'
+    assert (tmp_path / "bundle.tar.gz").read_bytes()[:2] == b'\x1f\x8b'
+    cache.close()
+
+
+def test_export_and_import_can_be_limited_to_sites(tmp_path):
+    path = str(tmp_path / "bundle.tar.gz")
+    source = make_cache(tmp_path, "json", "source")
+    target = make_cache(tmp_path, "json", "target")
+    for url in SHOP_URLS + OUTLET_URLS:
+        put(source, url, datetime.now())
+
+    # Sites are matched by host, with or without 'www.' and a scheme
+    assert source.export_bundle(path, sites=["https://outlet.invalid"]) == 2
+    assert [record.url for record in read_bundle(path)] == sorted(OUTLET_URLS)
+
+    source.export_bundle(path)
+    assert target.import_bundle(path, sites=["shop.invalid"]) == (3, 2)
+    assert target.backend.stats()['total_entries'] == 3
+    source.close()
+    target.close()
+
+
+def test_import_keeps_the_more_recently_cached_entry(tmp_path):
+    path = str(tmp_path / "bundle.tar.gz")
+    now = datetime.now()
+    source = make_cache(tmp_path, "sqlite", "source")
+    target = make_cache(tmp_path, "sqlite", "target")
+    try:
+        put(source, SHOP_URLS[0], now - timedelta(hours=1), title="bundled")
+        put(source, SHOP_URLS[1], now - timedelta(hours=1), title="bundled")
+        put(source, SHOP_URLS[2], now - timedelta(hours=1), title="bundled")
+        source.export_bundle(path)
+        put(target, SHOP_URLS[0], now - timedelta(hours=2), title="older")
+        put(target, SHOP_URLS[1], now, title="newer")
+
+        assert target.import_bundle(path) == (2, 1)
+
+        assert [cached_title(target, url) for url in SHOP_URLS] == ["bundled", "newer", "bundled"]
+    finally:
+        source.close()
+        target.close()
+
+
+def test_reading_a_file_that_is_not_a_bundle_fails(tmp_path):
+    path = tmp_path / "bundle.tar.gz"
+    path.write_bytes(b"not a bundle")
+
+    with pytest.raises(BundleError):
+        list(read_bundle(str(path)))
+
+
+class ReplayCrawler(BaseCrawler):
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, app: StubScrapeApp):
+        site_config = {
+            'base_url': 'https://shop.invalid',
+            'currency': 'EUR',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__("replay", site_config, use_cache=True, replay=True)
+        # Replay never initializes Firecrawl; a stub shows whether it would have been called
+        self.firecrawl_app = app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        metadata = firecrawl_data.get('data', {}).get('metadata', {})
+        return Product(name=metadata.get('title', ''), url=url, site_name=self.site_name, currency=self.currency)
+
+
+@pytest.fixture
+def replay_cache(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, "json", policy=CachePolicy(ttl=timedelta(hours=1)))
+    failures = FailureCache(path=str(tmp_path / "failures.json"), save_interval=3600)
+    monkeypatch.setattr(base_crawler, "get_firecrawl_cache", lambda: cache)
+    monkeypatch.setattr(base_crawler, "get_failure_cache", lambda: failures)
+    yield cache
+    cache.close()
+
+
+def test_replay_serves_expired_entries(replay_cache):
+    put(replay_cache, SHOP_URLS[0], datetime.now() - timedelta(days=30))
+    app = StubScrapeApp(delay=0)
+    crawler = ReplayCrawler(app)
+
+    assert replay_cache.get(SHOP_URLS[0], fields=crawler.fields) is None
+    crawl_result = asyncio.run(crawler.crawl_product(SHOP_URLS[0]))
+
+    assert crawl_result.success
+    assert crawl_result.product.name == SHOP_URLS[0]
+    assert app.calls == []
+
+
+def test_replay_miss_fails_without_calling_firecrawl(replay_cache):
+    app = StubScrapeApp(delay=0)
+    crawler = ReplayCrawler(app)
+
+    with pytest.raises(ReplayMissError, match="no cached page"):
+        asyncio.run(crawler._scrape_with_firecrawl(SHOP_URLS[1]))
+    with pytest.raises(ReplayMissError, match="not fetching"):
+        asyncio.run(crawler._fetch(SHOP_URLS[1]))
+
+    crawl_result = asyncio.run(crawler.crawl_product(SHOP_URLS[1]))
+    assert not crawl_result.success
+    assert "Replay mode" in crawl_result.error_message
+    assert app.calls == []
@@ -0,0 +1,48 @@
+"""
+Tests for cache payload compression.
+"""
+
+import pytest
+
+from src.utils.cache_codec import available_compressors, content_hash, content_id, get_compressor
+
+PAGE = "".join(f"| Row {i} | Brake pad set {i % 7} | €{i * 3}.99 |\n" for i in range(400)).encode('utf-8')
+DICTIONARY = "".join(f"| Row {i} | Brake pad set {i % 5} | €{i * 2}.49 |\n" for i in range(200)).encode('utf-8')
+
+COMPRESSORS = [
+    pytest.param(name, marks=pytest.mark.skipif(name not in available_compressors(),
+                                                reason="zstandard is not installed"))
+    for name in ('zlib', 'zstd')
+]
+
+
+@pytest.mark.parametrize("name", COMPRESSORS)
+@pytest.mark.parametrize("dictionary", [None, DICTIONARY], ids=["plain", "dictionary"])
+def test_compression_round_trip(name, dictionary):
+    compressor = get_compressor(name)
+
+    compressed = compressor.compress(PAGE, dictionary)
+
+    assert len(compressed) < len(PAGE)
+    assert compressor.decompress(compressed, dictionary) == PAGE
+
+
+@pytest.mark.parametrize("name", COMPRESSORS)
+def test_dictionary_shrinks_similar_content(name):
+    compressor = get_compressor(name)
+    sample = PAGE[:2048]
+
+    assert len(compressor.compress(sample, PAGE)) < len(compressor.compress(sample))
+
+
+def test_unknown_compressor_is_rejected():
+    with pytest.raises(ValueError):
+        get_compressor("brotli")
+
+
+def test_content_ids_are_stable_signed_64_bit_integers():
+    ids = {content_id(content_hash(text)) for text in ("shop.invalid", "outlet.invalid")}
+
+    assert len(ids) == 2
+    assert all(-(1 << 63) <= i < (1 << 63) for i in ids)
+    assert content_id(content_hash("shop.invalid")) in ids
@@ -0,0 +1,113 @@
+"""
+Tests for several processes sharing one cache directory or database.
+"""
+
+import json
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.cache_backends import CacheRecord, create_backend
+
+SHARED_KEYS = 40
+OWN_KEYS = 40
+PASSES = 4
+
+
+def text(writer: str, pass_number: int, i: int) -> str:
+    return f"{writer}:{pass_number}:{i}\n" + "brake pads and discs\n" * 400
+
+
+def write_entries(backend_name: str, cache_dir: str, writer: str) -> None:
+    """Rewrite the shared keys several times and add keys of this writer's own."""
+    backend = create_backend(backend_name, cache_dir)
+    try:
+        for pass_number in range(PASSES):
+            for i in range(SHARED_KEYS):
+                key = f"shared-{i}"
+                backend.write(CacheRecord(
+                    key=key, url=f"https://shop.invalid/{key}", cached_at=datetime.now(), fields=['markdown'],
+                    firecrawl_result={'data': {'markdown': text(writer, pass_number, i)}},
+                ))
+        for i in range(OWN_KEYS):
+            key = f"{writer}-own-{i}"
+            backend.write(CacheRecord(
+                key=key, url=f"https://shop.invalid/{key}", cached_at=datetime.now(), fields=['markdown'],
+                firecrawl_result={'data': {'markdown': text(writer, 0, i)}},
+            ))
+    finally:
+        backend.close()
+
+
+def read_entries(backend_name: str, cache_dir: str, rounds: int) -> None:
+    """Read the shared keys over and over; read() raises CorruptEntryError on a torn entry."""
+    backend = create_backend(backend_name, cache_dir)
+    try:
+        for _ in range(rounds):
+            for i in range(SHARED_KEYS):
+                record = backend.read(f"shared-{i}")
+                if record is not None and record.firecrawl_result['data']['markdown'] != "old":
+                    writer, pass_number, _ = record.firecrawl_result['data']['markdown'].split(':', 2)
+                    assert record.firecrawl_result['data']['markdown'] == text(writer, int(pass_number), i)
+    finally:
+        backend.close()
+
+
+def run_maintenance(backend_name: str, cache_dir: str, cutoff: float, rounds: int) -> None:
+    """Expire entries cached before `cutoff` and evict over a limit never reached, over and over."""
+    backend = create_backend(backend_name, cache_dir)
+    try:
+        for _ in range(rounds):
+            backend.delete_expired(datetime.fromtimestamp(cutoff))
+            backend.evict(max_entries=10_000)
+    finally:
+        backend.close()
+
+
+@pytest.mark.parametrize("backend_name", ["json", "sqlite"])
+def test_concurrent_writers_and_maintenance_lose_nothing(tmp_path, backend_name):
+    cache_dir = str(tmp_path)
+    # Entries from an earlier run, expired by the time the writers replace them
+    backend = create_backend(backend_name, cache_dir)
+    backend.write_many(CacheRecord(
+        key=f"shared-{i}", url=f"https://shop.invalid/shared-{i}", cached_at=datetime.now() - timedelta(days=2),
+        fields=['markdown'], firecrawl_result={'data': {'markdown': "old"}},
+    ) for i in range(SHARED_KEYS))
+    backend.close()
+    cutoff = (datetime.now() - timedelta(days=1)).timestamp()
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=write_entries, args=(backend_name, cache_dir, "a")),
+        context.Process(target=write_entries, args=(backend_name, cache_dir, "b")),
+        context.Process(target=run_maintenance, args=(backend_name, cache_dir, cutoff, 30)),
+        context.Process(target=read_entries, args=(backend_name, cache_dir, 20)),
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    if backend_name == "json":
+        # Every file is complete JSON and no temporary file was left behind
+        for path in tmp_path.glob("*.json"):
+            json.loads(path.read_text(encoding='utf-8'))
+        assert list(tmp_path.glob(".*.tmp")) == []
+
+    backend = create_backend(backend_name, cache_dir)
+    try:
+        records = {record.key: record for record in backend.iter_records()}
+    finally:
+        backend.close()
+
+    expected = {f"shared-{i}" for i in range(SHARED_KEYS)}
+    expected |= {f"{writer}-own-{i}" for writer in "ab" for i in range(OWN_KEYS)}
+    assert set(records) == expected
+    for key, record in records.items():
+        # A complete entry from one of the writers, never the expired one or a mix of two
+        writer, pass_number, i = record.firecrawl_result['data']['markdown'].split('\n', 1)[0].split(':')
+        assert record.firecrawl_result['data']['markdown'] == text(writer, int(pass_number), int(i))
+        assert key.startswith("shared-") or key.startswith(writer)
+        assert record.cached_at.timestamp() > cutoff
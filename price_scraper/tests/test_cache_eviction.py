@@ -0,0 +1,162 @@
+"""
+Tests for size-bounded LRU eviction and the in-memory cache tier.
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from src.utils.cache_backends import CacheRecord, SQLiteBackend
+from src.utils.firecrawl_cache import FirecrawlCache, MemoryTier
+from tests.test_sqlite_backend import record
+
+URLS = [f"https://shop.invalid/product-{i}" for i in range(20)]
+
+
+def result(i: int) -> dict:
+    markdown = "".join(f"Product {i} line {j}: brake pads, discs and chains\n" for j in range(40))
+    return {'success': True, 'data': {'markdown': markdown, 'metadata': {'title': f"Product {i}"}}}
+
+
+def make_cache(tmp_path, backend: str, **kwargs) -> FirecrawlCache:
+    options = {'compression': "zlib"} if backend == "sqlite" else {}
+    return FirecrawlCache(cache_dir=str(tmp_path), backend=backend, **options, **kwargs)
+
+
+def fill(cache: FirecrawlCache, count: int) -> None:
+    """Cache the first `count` URLs, oldest first."""
+    for i, url in enumerate(URLS[:count]):
+        cache.set(url, result(i))
+        # JSON entries are ordered by file mtime, which may only advance once per clock tick
+        time.sleep(0.005)
+
+
+def cached_urls(cache: FirecrawlCache):
+    return [url for url in URLS if cache.backend.read_fields(cache._get_cache_key(url)) is not None]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_entries_are_evicted_to_the_low_watermark_of_max_entries(tmp_path, backend):
+    cache = make_cache(tmp_path, backend, max_entries=10, memory_entries=0, eviction_check_interval=1)
+    try:
+        fill(cache, 11)
+
+        assert cache.backend.stats()['total_entries'] == 9
+        assert cached_urls(cache) == URLS[2:11]
+        assert cache.evicted == 2
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_entries_are_evicted_to_the_low_watermark_of_max_bytes(tmp_path, backend):
+    cache = make_cache(tmp_path, backend, memory_entries=0)
+    fill(cache, len(URLS))
+    total_size = cache.backend.stats()['total_size_bytes']
+    cache.close()
+
+    max_bytes = total_size // 2
+    cache = make_cache(tmp_path, backend, max_bytes=max_bytes, memory_entries=0)
+    try:
+        removed = cache.enforce_limits()
+
+        stats = cache.backend.stats()
+        assert removed > 0
+        assert stats['total_entries'] == len(URLS) - removed
+        assert stats['total_size_bytes'] <= max_bytes * FirecrawlCache.LOW_WATERMARK
+        # Least recently used entries go first
+        assert cached_urls(cache) == URLS[removed:]
+        assert cache.enforce_limits() == 0
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_entries_served_from_memory_are_kept(tmp_path, backend):
+    cache = make_cache(tmp_path, backend, max_entries=10, eviction_check_interval=1000)
+    try:
+        fill(cache, 11)
+        time.sleep(0.005)
+        assert cache.get(URLS[0]) is not None
+        assert cache.memory.get_stats()['hits'] == 1
+
+        assert cache.enforce_limits() == 2
+
+        assert cached_urls(cache) == [URLS[0], *URLS[3:11]]
+    finally:
+        cache.close()
+
+
+def test_eviction_shrinks_the_database(tmp_path):
+    db_path = tmp_path / "cache.sqlite3"
+    backend = SQLiteBackend(str(db_path), compression="zlib")
+    try:
+        for i in range(40):
+            backend.write(record(i))
+        with sqlite3.connect(str(db_path)) as conn:
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+        conn.close()
+
+        assert backend.evict(max_entries=1) == 39
+
+        assert backend.stats()['total_entries'] == 1
+        with sqlite3.connect(str(db_path)) as conn:
+            assert conn.execute("PRAGMA page_count").fetchone()[0] < pages_before
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        conn.close()
+    finally:
+        backend.close()
+
+
+def test_reads_protect_entries_from_eviction(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), compression="zlib")
+    try:
+        for i in range(5):
+            backend.write(record(i))
+        backend.read("key-0")
+        backend.touch("key-1")
+
+        assert backend.evict(max_entries=2) == 3
+
+        assert [r.key for r in backend.iter_records()] == ["key-0", "key-1"]
+    finally:
+        backend.close()
+
+
+def memory_record(key: str, size: int) -> CacheRecord:
+    return CacheRecord(key=key, url=f"https://shop.invalid/{key}", cached_at=datetime.now(),
+                       fields=[], firecrawl_result={}, size=size)
+
+
+def test_memory_tier_drops_least_recently_used_over_max_entries():
+    tier = MemoryTier(max_entries=2)
+    tier.put(memory_record("a", 10))
+    tier.put(memory_record("b", 10))
+    tier.get("a")
+
+    tier.put(memory_record("c", 10))
+
+    assert tier.get("b") is None
+    assert tier.get("a") is not None
+    assert tier.get("c") is not None
+    assert tier.get_stats()['entries'] == 2
+
+
+def test_memory_tier_stays_within_max_bytes():
+    tier = MemoryTier(max_entries=100, max_bytes=100)
+    for key in "abcd":
+        tier.put(memory_record(key, 30))
+
+    assert tier.get_stats()['size_bytes'] == 90
+    assert tier.get("a") is None
+
+    # Replacing a record counts only its new size
+    tier.put(memory_record("d", 50))
+    assert tier.get_stats() == {'entries': 2, 'size_bytes': 80, 'hits': 0, 'misses': 1}
+
+    # A record larger than the whole tier is not kept, and drops any older copy
+    tier.put(memory_record("c", 200))
+    assert tier.get("c") is None
+    assert tier.get_stats()['size_bytes'] == 50
@@ -0,0 +1,99 @@
+"""
+Tests for the cache metrics: hit rate, Firecrawl requests and credits saved, per-site breakdown.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from src.utils.cache_backends import CacheRecord
+from src.utils.cache_metrics import CacheMetrics, site_of
+from src.utils.firecrawl_cache import CachePolicy, FirecrawlCache
+
+POLICY = CachePolicy(ttl=timedelta(hours=1), stale_while_revalidate=True, max_stale=timedelta(hours=2))
+
+
+def put(cache: FirecrawlCache, url: str, age: timedelta) -> None:
+    firecrawl_result = {'success': True, 'data': {'markdown': "Brake pads\n"}}
+    cache.backend.write(CacheRecord(key=cache._get_cache_key(url), url=url, cached_at=datetime.now() - age,
+                                    fields=['markdown'], firecrawl_result=firecrawl_result))
+
+
+async def refresh() -> None:
+    await asyncio.sleep(0.05)
+
+
+def test_pages_are_counted_under_their_host_without_www():
+    assert site_of("https://www.Outlet.invalid/product?id=1") == "outlet.invalid"
+    assert site_of("http://outlet.invalid:8080/") == "outlet.invalid:8080"
+    assert site_of("not a url") == "unknown"
+
+
+def test_savings_count_served_lookups_less_the_refreshes_they_started(tmp_path):
+    metrics_file = tmp_path / "metrics" / "cache.json"
+    cache = FirecrawlCache(cache_dir=str(tmp_path), memory_entries=0, policy=POLICY,
+                           metrics_file=str(metrics_file), credits_per_request=2.5)
+    for i in range(3):
+        put(cache, f"https://shop.invalid/fresh-{i}", timedelta(minutes=10))
+    put(cache, "https://shop.invalid/stale", timedelta(hours=1.5))
+    put(cache, "https://www.outlet.invalid/fresh", timedelta(minutes=10))
+    put(cache, "https://outlet.invalid/expired", timedelta(hours=5))
+
+    async def run():
+        for i in range(3):
+            await cache.aget(f"https://shop.invalid/fresh-{i}", refresh=refresh)
+        # Two stale hits of one page share a single refresh
+        await asyncio.gather(*(cache.aget("https://shop.invalid/stale", refresh=refresh) for _ in range(2)))
+        await cache.aget("https://shop.invalid/missing", refresh=refresh)
+        await cache.aget("https://outlet.invalid/fresh", refresh=refresh)
+        await cache.aget("https://www.outlet.invalid/expired", refresh=refresh)
+        await cache.wait_for_refreshes()
+
+    asyncio.run(run())
+    snapshot = cache.report_metrics()
+
+    shop, outlet, total = snapshot['sites']['shop.invalid'], snapshot['sites']['outlet.invalid'], snapshot['total']
+    assert list(snapshot['sites']) == ['outlet.invalid', 'shop.invalid']
+    assert {name: shop[name] for name in ('hits', 'stale_hits', 'refreshes', 'misses', 'lookups')} == \
+        {'hits': 3, 'stale_hits': 2, 'refreshes': 1, 'misses': 1, 'lookups': 6}
+    assert (shop['hit_rate'], shop['requests_saved'], shop['credits_saved']) == (0.833, 4, 10.0)
+    assert {name: outlet[name] for name in ('hits', 'expired', 'lookups')} == {'hits': 1, 'expired': 1, 'lookups': 2}
+    assert (outlet['hit_rate'], outlet['requests_saved'], outlet['credits_saved']) == (0.5, 1, 2.5)
+    assert (total['lookups'], total['hit_rate'], total['requests_saved'], total['credits_saved']) == (8, 0.75, 5, 12.5)
+    assert total['get_latency'] == {'count': 8}
+
+    dumped = json.loads(metrics_file.read_text(encoding='utf-8'))
+    assert dumped['total'] == total
+    assert dumped['sites'] == snapshot['sites']
+    cache.close()
+
+
+def test_a_stale_hit_saves_nothing_once_it_is_refreshed():
+    metrics = CacheMetrics(credits_per_request=3)
+    metrics.count("https://shop.invalid/a", 'stale_hits')
+    metrics.count("https://shop.invalid/a", 'refreshes')
+
+    total = metrics.snapshot()['total']
+
+    assert (total['hit_rate'], total['requests_saved'], total['credits_saved']) == (1.0, 0, 0)
+
+
+def test_sites_without_lookups_have_no_hit_rate():
+    metrics = CacheMetrics()
+    metrics.observe_set("https://shop.invalid/a", 0.01, 2048)
+
+    site = metrics.snapshot()['sites']['shop.invalid']
+
+    assert (site['writes'], site['bytes_written'], site['lookups'], site['hit_rate']) == (1, 2048, 0, None)
+    assert site['set_latency']['count'] == 1
+    assert site['get_latency']['p95_ms'] is None
+
+
+def test_reset_zeroes_every_site():
+    metrics = CacheMetrics()
+    metrics.count("https://shop.invalid/a", 'hits')
+
+    metrics.reset()
+
+    assert metrics.snapshot()['sites'] == {}
+    assert metrics.snapshot()['total']['credits_saved'] == 0
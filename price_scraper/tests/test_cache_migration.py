@@ -0,0 +1,38 @@
+"""
+Tests for migrating cache entries between backends (scripts/migrate_cache.py).
+"""
+
+from dataclasses import replace
+from datetime import datetime
+
+from src.utils.cache_backends import JsonFileBackend, SQLiteBackend, migrate_records
+from tests.test_sqlite_backend import record
+
+
+def test_readable_json_entries_are_copied_to_sqlite(tmp_path):
+    source = JsonFileBackend(str(tmp_path / "json"))
+    source.write_many(record(i) for i in range(3))
+    (tmp_path / "json" / "corrupt.json").write_text('{"url": "https://shop.invalid/corrupt"', encoding='utf-8')
+    target = SQLiteBackend(str(tmp_path / "cache.sqlite3"), compression="zlib")
+
+    copied = migrate_records(source, target)
+
+    # The script reports the source entries and the copies; the difference is what was skipped
+    assert (source.stats()['total_entries'], copied) == (4, 3)
+    assert sorted(target_record.key for target_record in target.iter_records()) == ["key-0", "key-1", "key-2"]
+    for i in range(3):
+        # Sizes are per backend; everything else survives the copy unchanged
+        assert replace(target.read(f"key-{i}"), size=0) == replace(source.read(f"key-{i}"), size=0) == record(i)
+    target.close()
+
+
+def test_entries_cached_before_the_cutoff_are_skipped(tmp_path):
+    source = JsonFileBackend(str(tmp_path / "json"))
+    source.write_many(record(i) for i in range(3))
+    target = JsonFileBackend(str(tmp_path / "copy"))
+
+    copied = migrate_records(source, target, skip_before=datetime(2026, 1, 1, 12, 0, 1))
+
+    assert copied == 2
+    assert target.read("key-0") is None
+    assert [target.read(f"key-{i}").url for i in (1, 2)] == [f"https://shop.invalid/product-{i}" for i in (1, 2)]
@@ -0,0 +1,178 @@
+"""
+Tests for cache freshness policies: per-site and per-field TTLs and stale-while-revalidate.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+
+from src.crawlers import base_crawler
+from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.retry import RetryBudget, RetryPolicy
+from src.models.product import Product
+from src.utils.cache_backends import CacheRecord
+from src.utils.failure_cache import FailureCache
+from src.utils.firecrawl_cache import CachePolicy, FirecrawlCache
+from src.utils.firecrawl_formats import FormatProfile
+from tests.conftest import StubScrapeApp
+
+URL = "https://shop.invalid/brake-pads"
+
+SWR_POLICY = CachePolicy(ttl=timedelta(hours=1), stale_while_revalidate=True, max_stale=timedelta(hours=2))
+
+
+def put(cache: FirecrawlCache, url: str, age: timedelta) -> None:
+    """Store an entry cached `age` ago."""
+    firecrawl_result = {'success': True, 'data': {'markdown': "Brake pads\n", 'metadata': {'title': "Old"}}}
+    cache.backend.write(CacheRecord(key=cache._get_cache_key(url), url=url, cached_at=datetime.now() - age,
+                                    fields=sorted(firecrawl_result['data']), firecrawl_result=firecrawl_result))
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches: List[FirecrawlCache] = []
+
+    def make(**kwargs: Any) -> FirecrawlCache:
+        cache = FirecrawlCache(cache_dir=str(tmp_path / f"cache-{len(caches)}"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_the_shortest_ttl_of_the_requested_fields_applies():
+    policy = CachePolicy(ttl=timedelta(hours=24), field_ttls={'markdown': timedelta(hours=2)})
+
+    assert policy.ttl_for(['metadata']) == timedelta(hours=24)
+    assert policy.ttl_for(['markdown', 'metadata']) == timedelta(hours=2)
+    assert policy.ttl_for([]) == timedelta(hours=24)
+
+
+def test_site_policies_fill_in_from_the_default():
+    default = CachePolicy.from_config({'ttl_hours': 24, 'format_ttl_hours': {'markdown': 6}})
+
+    policy = CachePolicy.from_config({'ttl_hours': 48, 'stale_while_revalidate': True}, default)
+
+    assert policy.ttl == timedelta(hours=48)
+    assert policy.field_ttls == {'markdown': timedelta(hours=6)}
+    assert policy.stale_while_revalidate
+    # Entries are kept while they could still be served stale
+    assert policy.retention == timedelta(hours=48 + 72)
+
+
+def test_entries_expire_by_their_site_and_field_ttls(make_cache):
+    cache = make_cache(memory_entries=0, policy=CachePolicy(ttl=timedelta(hours=24)))
+    cache.set_site_policy("https://www.fast.invalid", CachePolicy(ttl=timedelta(hours=1)))
+    cache.set_site_policy("prices.invalid", CachePolicy(ttl=timedelta(hours=24),
+                                                        field_ttls={'markdown': timedelta(hours=1)}))
+    for url in (URL, "https://fast.invalid/brake-pads", "https://prices.invalid/brake-pads"):
+        put(cache, url, timedelta(hours=2))
+
+    assert cache.get(URL) is not None
+    assert cache.get("https://fast.invalid/brake-pads") is None
+    # Only lookups needing markdown see the price page as expired
+    assert cache.get("https://prices.invalid/brake-pads", fields=['metadata']) is not None
+    assert cache.get("https://prices.invalid/brake-pads", fields=['markdown']) is None
+    assert cache.metrics.snapshot()['total']['expired'] == 2
+
+
+class RefreshCounter:
+    """Refresh callback counting its calls."""
+
+    def __init__(self, cache: FirecrawlCache, url: str):
+        self.cache = cache
+        self.url = url
+        self.calls = 0
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        await self.cache.aset(self.url, {'success': True, 'data': {'markdown': "Brake pads\n",
+                                                                   'metadata': {'title': "New"}}})
+
+
+def test_stale_entries_are_served_and_refreshed_once(make_cache):
+    cache = make_cache(policy=SWR_POLICY)
+    put(cache, URL, timedelta(hours=1.5))
+    refresh = RefreshCounter(cache, URL)
+
+    async def run():
+        results = await asyncio.gather(*(cache.aget(URL, refresh=refresh) for _ in range(3)))
+        in_flight = len(cache._refreshes)
+        waited = await cache.wait_for_refreshes()
+        return results, in_flight, waited, await cache.aget(URL, refresh=refresh)
+
+    results, in_flight, waited, fresh = asyncio.run(run())
+
+    assert [result['data']['metadata']['title'] for result in results] == ["Old"] * 3
+    # Concurrent lookups of the stale entry share one refresh
+    assert (in_flight, waited, refresh.calls, cache.refreshed) == (1, 1, 1, 1)
+    assert fresh['data']['metadata']['title'] == "New"
+    total = cache.metrics.snapshot()['total']
+    assert (total['stale_hits'], total['refreshes'], total['hits']) == (3, 1, 1)
+
+
+def test_stale_entries_need_a_refresh_callback(make_cache):
+    cache = make_cache(memory_entries=0, policy=SWR_POLICY)
+    put(cache, URL, timedelta(hours=1.5))
+
+    assert cache.get(URL) is None
+    assert asyncio.run(cache.aget(URL)) is None
+
+
+def test_entries_past_max_stale_are_misses(make_cache):
+    cache = make_cache(policy=SWR_POLICY)
+    put(cache, URL, timedelta(hours=3.5))
+    refresh = RefreshCounter(cache, URL)
+
+    assert asyncio.run(cache.aget(URL, refresh=refresh)) is None
+
+    assert refresh.calls == 0
+    assert cache._refreshes == {}
+    total = cache.metrics.snapshot()['total']
+    assert (total['expired'], total['stale_hits'], total['refreshes']) == (1, 0, 0)
+
+
+class CachedCrawler(BaseCrawler):
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, app: StubScrapeApp):
+        self.app = app
+        site_config = {
+            'base_url': 'https://shop.invalid',
+            'currency': 'EUR',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__("policy", site_config, use_cache=True, replay=False,
+                         retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02, budget=RetryBudget()))
+
+    def _initialize_firecrawl(self):
+        self.firecrawl_app = self.app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        metadata = firecrawl_data.get('data', {}).get('metadata', {})
+        return Product(name=metadata.get('title', ''), url=url, site_name=self.site_name, currency=self.currency)
+
+
+def test_crawls_wait_for_the_refreshes_they_started(make_cache, tmp_path, monkeypatch):
+    cache = make_cache(memory_entries=0, policy=SWR_POLICY)
+    failures = FailureCache(path=str(tmp_path / "failures.json"), save_interval=3600)
+    monkeypatch.setattr(base_crawler, "get_firecrawl_cache", lambda: cache)
+    monkeypatch.setattr(base_crawler, "get_failure_cache", lambda: failures)
+    put(cache, URL, timedelta(hours=1.5))
+    app = StubScrapeApp(delay=0.05)
+    crawler = CachedCrawler(app)
+
+    results = asyncio.run(crawler.crawl_multiple([URL]))
+
+    # The stale page is served at once, and re-fetched before crawl_multiple returns
+    assert [result.product.name for result in results] == ["Old"]
+    assert app.calls == [URL]
+    assert cache._refreshes == {}
+    cache.flush()
+    assert cache.get(URL)['data']['metadata']['title'] == "Brake pads"
+    assert asyncio.run(crawler.wait_for_refreshes()) == 0
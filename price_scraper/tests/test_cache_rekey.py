@@ -0,0 +1,57 @@
+"""
+Tests for moving cache entries to the keys of their canonical URLs (scripts/rekey_cache.py).
+"""
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.utils.cache_backends import CacheRecord
+from src.utils.firecrawl_cache import FirecrawlCache
+
+CANONICAL_URL = "https://shop.invalid/brake-pads"
+VARIANTS = {
+    # Older entry, written under the raw URL by a version without canonical keys
+    "https://WWW.shop.invalid/brake-pads/?utm_source=mail": datetime(2026, 1, 1, 12, 0),
+    "http://shop.invalid/brake-pads#reviews": datetime(2026, 1, 2, 12, 0),
+}
+
+
+def raw_key(url: str) -> str:
+    return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+
+def variant_record(url: str, cached_at: datetime) -> CacheRecord:
+    return CacheRecord(key=raw_key(url), url=url, cached_at=cached_at, fields=['markdown'],
+                       firecrawl_result={'success': True, 'data': {'markdown': f"Cached {cached_at:%Y-%m-%d}"}})
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_variants_collapse_to_the_most_recent_entry(tmp_path, backend):
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend=backend)
+    cache.backend.write_many(variant_record(url, cached_at) for url, cached_at in VARIANTS.items())
+
+    moved, dropped = cache.rekey_entries()
+
+    # Which variant moves first depends on key order; either way one survives and one is dropped
+    assert moved >= 1 and dropped == 1
+    assert cache.get_cache_stats()['total_entries'] == 1
+    assert cache.get(CANONICAL_URL, ignore_ttl=True)['data']['markdown'] == "Cached 2026-01-02"
+    assert all(cache.backend.read(raw_key(url)) is None for url in VARIANTS)
+    cache.close()
+
+
+def test_json_entries_are_renamed_to_their_canonical_key(tmp_path):
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend="json")
+    cache.backend.write_many(variant_record(url, cached_at) for url, cached_at in VARIANTS.items())
+
+    cache.rekey_entries()
+
+    canonical_key = cache._get_cache_key(CANONICAL_URL)
+    assert sorted(path.name for path in Path(tmp_path).glob("*.json")) == [f"{canonical_key}.json"]
+    assert cache.backend.read(canonical_key).url == "http://shop.invalid/brake-pads#reviews"
+    # Entries already under their canonical key are left alone
+    assert cache.rekey_entries() == (0, 0)
+    cache.close()
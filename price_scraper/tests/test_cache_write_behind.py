@@ -0,0 +1,115 @@
+"""
+Tests for the cache's background writer: read-your-writes, flush, close and write errors.
+"""
+
+import asyncio
+import threading
+from typing import Iterable, List
+
+from src.utils.cache_backends import CacheRecord, JsonFileBackend
+from src.utils.firecrawl_cache import FirecrawlCache
+
+URLS = [f"https://shop.invalid/product-{i}" for i in range(5)]
+
+
+def result(i: int) -> dict:
+    return {'success': True, 'data': {'markdown': f"Brake pads {i}\n", 'metadata': {'title': f"Product {i}"}}}
+
+
+class GatedBackend(JsonFileBackend):
+    """JSON backend whose batch writes wait until the test opens the gate, or fail."""
+
+    def __init__(self, cache_dir: str, fail: bool = False):
+        super().__init__(cache_dir)
+        self.gate = threading.Event()
+        self.fail = fail
+        self.batches: List[List[str]] = []
+
+    def write_many(self, records: Iterable[CacheRecord]) -> None:
+        self.gate.wait(timeout=5)
+        records = list(records)
+        self.batches.append([record.url for record in records])
+        if self.fail:
+            raise OSError("disk full")
+        super().write_many(records)
+
+
+def stored(backend: GatedBackend, cache: FirecrawlCache, url: str) -> bool:
+    return backend.read(cache._get_cache_key(url)) is not None
+
+
+def test_queued_writes_are_served_before_they_are_stored(tmp_path):
+    backend = GatedBackend(str(tmp_path))
+    # Without a memory tier, lookups can only see the queued record
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend=backend, memory_entries=0)
+
+    async def run():
+        await cache.aset(URLS[0], result(0))
+        return await cache.aget(URLS[0]), cache.get(URLS[0])
+
+    from_queue, from_queue_sync = asyncio.run(run())
+
+    assert from_queue == from_queue_sync == result(0)
+    assert not stored(backend, cache, URLS[0])
+    assert cache.metrics.snapshot()['total']['misses'] == 0
+    backend.gate.set()
+    cache.close()
+
+
+def test_flush_stores_every_queued_write(tmp_path):
+    backend = GatedBackend(str(tmp_path))
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend=backend, write_flush_interval=0.5)
+
+    async def run():
+        for i, url in enumerate(URLS):
+            await cache.aset(url, result(i))
+
+    asyncio.run(run())
+    assert not any(stored(backend, cache, url) for url in URLS)
+    backend.gate.set()
+    cache.flush()
+
+    assert all(stored(backend, cache, url) for url in URLS)
+    assert cache._pending == {}
+    # The writer waited for the batch to fill before storing it
+    assert sorted(url for batch in backend.batches for url in batch) == URLS
+    assert len(backend.batches) < len(URLS)
+    cache.close()
+
+
+def test_close_drains_the_queue(tmp_path):
+    backend = GatedBackend(str(tmp_path))
+    backend.gate.set()
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend=backend, write_flush_interval=10)
+
+    async def run():
+        for i, url in enumerate(URLS):
+            await cache.aset(url, result(i))
+
+    asyncio.run(run())
+    cache.close()
+
+    assert cache._writer is None
+    reopened = FirecrawlCache(cache_dir=str(tmp_path), backend="json")
+    assert [reopened.get(url) for url in URLS] == [result(i) for i in range(len(URLS))]
+    reopened.close()
+
+
+def test_failed_writes_are_dropped_from_memory(tmp_path):
+    backend = GatedBackend(str(tmp_path), fail=True)
+    cache = FirecrawlCache(cache_dir=str(tmp_path), backend=backend)
+
+    async def run():
+        await cache.aset(URLS[0], result(0))
+        served = await cache.aget(URLS[0])
+        backend.gate.set()
+        await cache.aflush()
+        return served
+
+    assert asyncio.run(run()) == result(0)
+
+    # The result was never stored, so memory no longer claims it is cached
+    assert cache.memory.get(cache._get_cache_key(URLS[0])) is None
+    assert cache._pending == {}
+    assert cache.get(URLS[0]) is None
+    cache.close()
@@ -0,0 +1,95 @@
+"""
+Tests for matching sitemap breadcrumbs to product categories.
+"""
+
+import pytest
+
+from src.processors.category_matcher import CategoryMatcher
+from src.processors.sitemap_parser import SitemapParser
+
+
+CATEGORIES = SitemapParser().categories
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CategoryMatcher(CATEGORIES)
+
+
+@pytest.mark.parametrize("text, category", [
+    # Keywords match at the start of a word, whatever the case
+    ("Home > Oil", "oils"),
+    ("Home > OILS", "oils"),
+    ("Home > Engine oil 10W40", "oils"),
+    ("Home > Tin foil", None),
+    ("Home > Boil-proof gloves", None),
+    ("Home > Spoils", None),
+    ("Home > Gear-oil", "oils"),
+    ("Home > Helmets\nAccueil > Casques", "helmets"),
+    # Multi-word keywords match across any whitespace
+    ("Home > Brake pad sets", "brake_pads"),
+    ("Home > Brake\tpad sets", "brake_pads"),
+    ("Home > Brake  \n pads", "brake_pads"),
+    ("Home > Brakepads", None),
+    ("Home > Fren balatası", "brake_pads"),
+    # The category listed first in categories.yaml wins
+    ("Home > Oil filter", "oils"),
+    ("Home > Air filter", "filters"),
+    ("Home > Drive chain oil", "oils"),
+    ("Home > Helmet with tyre logo", "helmets"),
+    ("Home > Tyre > Helmet", "helmets"),
+    # Nothing matches
+    ("Home > Gloves", None),
+    ("", None),
+])
+def test_breadcrumbs_are_categorized(matcher, text, category):
+    assert matcher.match(text) == category
+
+
+def test_a_keyword_is_credited_with_its_best_prefix():
+    # "oil filter" belongs to filters, but "oil" (a prefix of it) ranks oils first
+    matcher = CategoryMatcher({
+        'oils': {'keywords': ["oil"]},
+        'filters': {'keywords': ["oil filter", "filter"]},
+    })
+
+    assert matcher.match("Oil filters") == "oils"
+    assert matcher.match("Filters > Oil  filter") == "oils"
+    assert matcher.match("Air filter") == "filters"
+
+
+def test_every_keyword_finds_its_category_or_an_earlier_one(matcher):
+    names = list(CATEGORIES)
+    for category_name, category_config in CATEGORIES.items():
+        for keyword in category_config['keywords']:
+            found = matcher.match(f"Home > {keyword.title()}")
+            assert names.index(found) <= names.index(category_name)
+
+
+def test_categories_without_keywords_are_ignored():
+    matcher = CategoryMatcher({'empty': {'keywords': []}, 'blank': {'keywords': ["  "]},
+                               'helmets': {'keywords': ["helmet"]}})
+
+    assert matcher.category_names == ["helmets"]
+    assert matcher.match("Helmet") == "helmets"
+    assert CategoryMatcher({}).match("Helmet") is None
+
+
+def test_results_are_memoized_until_the_cache_is_full():
+    matcher = CategoryMatcher({'helmets': {'keywords': ["helmet"]}}, cache_size=3)
+
+    for text in ("Helmet", "Gloves", "Helmet", "Boots"):
+        matcher.match(text)
+    assert matcher._cache == {"Helmet": "helmets", "Gloves": None, "Boots": None}
+
+    # A full cache is reset rather than growing without bounds
+    assert matcher.match("Open face helmet") == "helmets"
+    assert matcher._cache == {"Open face helmet": "helmets"}
+    assert matcher.match("Helmet") == "helmets"
+
+
+def test_memoization_can_be_disabled():
+    matcher = CategoryMatcher({'helmets': {'keywords': ["helmet"]}}, cache_size=0)
+
+    assert matcher.match("Helmet") == "helmets"
+    assert matcher._cache == {}
@@ -0,0 +1,113 @@
+"""
+Tests for adaptive concurrency control.
+"""
+
+import logging
+
+from src.crawlers import concurrency
+from src.crawlers.concurrency import AdaptiveConcurrencyController, concurrency_controllers, report_concurrency
+from src.utils.config import config
+
+
+def test_window_grows_on_success_and_halves_on_throttling():
+    controller = AdaptiveConcurrencyController("shop", initial=2, max_limit=4, cooldown_seconds=0)
+
+    for _ in range(20):
+        controller.record_success(0.1)
+    assert controller.window == 4
+
+    controller.record_throttled()
+    assert controller.window == 2
+    controller.record_timeout()
+    controller.record_timeout()
+    assert controller.window == 1
+
+
+def test_window_is_cut_when_p95_latency_rises_above_the_baseline():
+    controller = AdaptiveConcurrencyController("shop", initial=4, max_limit=8, cooldown_seconds=0)
+    for _ in range(10):
+        controller.record_success(0.1)
+    # One slow request in eleven is still below the p95
+    controller.record_success(1.0)
+    assert controller.snapshot()['decreases'] == 0
+
+    before = controller.window
+    controller.record_success(1.0)
+
+    assert controller.window == before // 2
+    assert controller.snapshot()['decreases'] == 1
+    # Samples from the larger window are dropped
+    assert controller.snapshot()['p95_latency_seconds'] is None
+
+
+def test_window_is_cut_when_the_recent_success_rate_falls():
+    controller = AdaptiveConcurrencyController("shop", initial=4, max_limit=4, cooldown_seconds=0)
+    # Fewer than ten outcomes are not enough to judge the success rate
+    for _ in range(5):
+        controller.record_failure()
+    assert controller.window == 4
+
+    controller = AdaptiveConcurrencyController("shop", initial=4, max_limit=4, cooldown_seconds=0)
+    for _ in range(8):
+        controller.record_success(0.1)
+    controller.record_failure()
+    controller.record_failure()
+    assert controller.window == 4  # 8 of 10 succeeded, exactly the minimum rate
+
+    controller.record_failure()
+
+    assert controller.window == 2
+    assert controller.snapshot()['success_rate'] == round(8 / 11, 3)
+
+
+def test_cooldown_blocks_back_to_back_decreases(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(concurrency.time, 'monotonic', lambda: now[0])
+    controller = AdaptiveConcurrencyController("shop", initial=8, max_limit=8, cooldown_seconds=5)
+
+    controller.record_throttled()
+    controller.record_timeout()
+    now[0] += 4.9
+    controller.record_throttled()
+    assert (controller.window, controller.snapshot()['decreases']) == (4, 1)
+
+    now[0] += 0.1
+    controller.record_throttled()
+    assert (controller.window, controller.snapshot()['decreases']) == (2, 2)
+
+
+def test_site_limits_never_exceed_the_global_maximum(monkeypatch):
+    monkeypatch.setattr(config, '_settings', {**config.settings, 'crawling': {'max_concurrent_requests': 3}})
+
+    raised = concurrency_controllers.for_site(
+        "concurrency-clamp", {'rate_limit': {'initial_concurrency': 6, 'max_concurrent': 10}})
+    default = concurrency_controllers.for_site("concurrency-default", {'rate_limit': {}})
+    lowered = concurrency_controllers.for_site("concurrency-lowered", {'rate_limit': {'max_concurrent': 2}})
+
+    assert (raised.max_limit, raised.window) == (3, 3)
+    assert default.max_limit == 3
+    assert lowered.max_limit == 2
+
+
+def test_snapshot_reports_the_controller_state():
+    controller = AdaptiveConcurrencyController("shop", initial=3, max_limit=5, cooldown_seconds=0)
+    for _ in range(18):
+        controller.record_success(0.5)
+    controller.record_failure()
+    controller.record_failure()
+
+    assert controller.snapshot() == {
+        'name': "shop", 'window': 5, 'in_flight': 0, 'min_limit': 1, 'max_limit': 5,
+        'p95_latency_seconds': 0.5, 'success_rate': 0.9, 'decreases': 0,
+    }
+
+
+def test_final_windows_are_logged_at_the_end_of_a_run(caplog):
+    controller = concurrency_controllers.for_site("concurrency-report", {'rate_limit': {'max_concurrent': 3}})
+    controller.record_throttled()
+
+    with caplog.at_level(logging.INFO, logger="src.crawlers.concurrency"):
+        report_concurrency()
+
+    assert "Concurrency for concurrency-report: window 1 (limits 1-3), p95 latency n/a, " \
+           "success rate 0%, 1 decreases" in caplog.text
@@ -0,0 +1,177 @@
+"""
+Tests for BaseCrawler.crawl_bulk against a local stub of the Firecrawl batch endpoints.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+import pytest
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.retry import RetryPolicy
+from src.models.product import Product
+from src.utils.firecrawl_cache import FirecrawlCache
+from src.utils.firecrawl_formats import FormatProfile
+
+URLS = [f"https://shop.invalid/product-{i}" for i in range(6)]
+
+
+class StubBatchApp:
+    """
+    Stand-in for the batch scrape endpoints of FirecrawlApp.
+
+    Each status check completes `pages_per_poll` more pages. URLs can be
+    rejected at submission, fail inside the job (reported by the errors
+    endpoint), make status checks raise, or the job can stall after
+    `stall_after` pages without ever finishing.
+    """
+
+    def __init__(self, pages_per_poll: int = 2, invalid: Iterable[str] = (), errors: Optional[Dict[str, str]] = None,
+                 failing_polls: int = 0, final_status: str = 'completed', stall_after: Optional[int] = None):
+        self.pages_per_poll = pages_per_poll
+        self.invalid = set(invalid)
+        self.errors = errors or {}
+        self.failing_polls = failing_polls
+        self.final_status = final_status
+        self.stall_after = stall_after
+        self.jobs: List[List[str]] = []
+        self.polls = 0
+
+    def async_batch_scrape_urls(self, urls: List[str], **kwargs: Any) -> SimpleNamespace:
+        self.jobs.append(list(urls))
+        # Firecrawl reports URLs normalized, e.g. with a trailing slash
+        return SimpleNamespace(success=True, id=f"job-{len(self.jobs) - 1}",
+                               invalidURLs=[f"{url}/" for url in urls if url in self.invalid])
+
+    def check_batch_scrape_status(self, job_id: str) -> SimpleNamespace:
+        if self.failing_polls:
+            self.failing_polls -= 1
+            raise ConnectionError("stub status endpoint unavailable")
+        self.polls += 1
+        urls = [url for url in self.jobs[int(job_id.split('-')[1])]
+                if url not in self.invalid and url not in self.errors]
+        done = urls[:self.polls * self.pages_per_poll]
+        if self.stall_after is not None:
+            done = done[:self.stall_after]
+            status = None
+        elif len(done) == len(urls):
+            status = self.final_status
+        else:
+            status = 'scraping'
+        return SimpleNamespace(status=status, completed=len(done), total=len(urls), data=[
+            SimpleNamespace(markdown='', html='', links=[],
+                            metadata={'title': f"Product {url.rsplit('-', 1)[-1]}", 'sourceURL': f"{url}/"})
+            for url in done
+        ])
+
+    def check_batch_scrape_errors(self, job_id: str) -> SimpleNamespace:
+        return SimpleNamespace(errors=[{'url': url, 'error': error} for url, error in self.errors.items()])
+
+
+class StubCrawler(BaseCrawler):
+    """Crawler wired to the batch stub, remembering the poll each page was extracted at."""
+
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, app: StubBatchApp, cache: Optional[FirecrawlCache] = None):
+        self.app = app
+        self.extracted_at: Dict[str, int] = {}
+        site_config = {
+            'base_url': 'https://shop.invalid',
+            'currency': 'EUR',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__('stub', site_config, use_cache=False,
+                         retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02), replay=False)
+        self.cache = cache
+
+    def _initialize_firecrawl(self):
+        self.firecrawl_app = self.app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        self.extracted_at[url] = self.app.polls
+        metadata = firecrawl_data.get('data', {}).get('metadata', {})
+        return Product(name=metadata.get('title', ''), url=url, site_name=self.site_name, currency=self.currency)
+
+
+def crawl(crawler: StubCrawler, urls: List[str], **kwargs: Any):
+    return asyncio.run(crawler.crawl_bulk(urls, poll_interval=0.01, **kwargs))
+
+
+def test_pages_are_processed_as_the_job_completes_them():
+    app = StubBatchApp(pages_per_poll=2)
+    crawler = StubCrawler(app)
+
+    results = crawl(crawler, URLS)
+
+    assert [result.url for result in results] == URLS
+    assert all(result.success for result in results)
+    assert app.polls == 3
+    # Pages were extracted at the poll that returned them, not after the whole job
+    assert [crawler.extracted_at[url] for url in URLS] == [1, 1, 2, 2, 3, 3]
+
+
+def test_scraped_pages_are_cached(tmp_path):
+    cache = FirecrawlCache(cache_dir=str(tmp_path), memory_entries=0)
+    try:
+        crawl(StubCrawler(StubBatchApp(), cache=cache), URLS)
+        cache.flush()
+
+        app = StubBatchApp()
+        results = crawl(StubCrawler(app, cache=cache), URLS)
+    finally:
+        cache.close()
+
+    assert all(result.success for result in results)
+    assert app.jobs == []
+
+
+def test_invalid_and_missing_urls_fail_with_their_reason():
+    app = StubBatchApp(invalid=[URLS[1]], errors={URLS[2]: "Page load timed out"})
+
+    results = crawl(StubCrawler(app), URLS)
+
+    by_url = {result.url: result for result in results}
+    assert [result.url for result in results] == URLS
+    assert by_url[URLS[1]].error_message == "URL rejected by Firecrawl batch scrape"
+    assert by_url[URLS[2]].error_message == "Page load timed out"
+    assert all(by_url[url].success for url in URLS if url not in (URLS[1], URLS[2]))
+
+
+def test_failed_job_keeps_completed_pages():
+    app = StubBatchApp(errors={URLS[5]: "Job failed"}, final_status='failed')
+
+    results = crawl(StubCrawler(app), URLS)
+
+    assert all(result.success for result in results[:5])
+    assert not results[5].success
+    assert results[5].error_message == "Job failed"
+
+
+def test_unfinished_job_times_out():
+    app = StubBatchApp(stall_after=2)
+
+    results = crawl(StubCrawler(app), URLS, job_timeout=0.1)
+
+    assert all(result.success for result in results[:2])
+    assert all("timed out after" in result.error_message for result in results[2:])
+
+
+def test_failed_status_checks_are_retried():
+    app = StubBatchApp(failing_polls=2)
+
+    results = crawl(StubCrawler(app), URLS)
+
+    assert all(result.success for result in results)
+    assert len(app.jobs) == 1
+
+
+@pytest.mark.parametrize("max_urls_per_job", [2, 4])
+def test_urls_are_split_into_jobs(max_urls_per_job):
+    app = StubBatchApp(pages_per_poll=10)
+
+    results = crawl(StubCrawler(app), URLS, max_urls_per_job=max_urls_per_job)
+
+    assert all(result.success for result in results)
+    assert [url for job in app.jobs for url in job] == URLS
@@ -0,0 +1,143 @@
+"""
+Tests for the crawl journal and resuming an interrupted crawl from it.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from src.crawlers.base_crawler import BaseCrawler, CrawlResult
+from src.crawlers.scheduler import CrawlJob, CrawlScheduler, ScheduledResult
+from src.models.product import Product
+from src.storage.crawl_journal import CrawlJournal
+
+URLS = [f"https://www.24mx.co.uk/product-{i}" for i in range(6)]
+
+
+def fill(journal: CrawlJournal, outcomes: Dict[str, str]) -> None:
+    for url, status in outcomes.items():
+        journal.record("24mx", url, status, error="boom" if status == CrawlJournal.FAILED else None,
+                       data={'url': url})
+
+
+def test_latest_outcome_per_url_wins(tmp_path):
+    journal = CrawlJournal(str(tmp_path / "journal.jsonl"))
+    fill(journal, {URLS[0]: CrawlJournal.SUCCESS, URLS[1]: CrawlJournal.FAILED, URLS[2]: CrawlJournal.SUCCESS})
+    fill(journal, {URLS[1]: CrawlJournal.SUCCESS, URLS[2]: CrawlJournal.FAILED})
+    journal.close()
+
+    records = CrawlJournal(str(tmp_path / "journal.jsonl")).load()
+
+    assert journal.completed_urls() == {URLS[0], URLS[1]}
+    assert records[URLS[2]]['error'] == "boom"
+    assert records[URLS[0]]['data'] == {'url': URLS[0]}
+
+
+def test_torn_last_line_is_ignored_and_terminated(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CrawlJournal(str(path))
+    fill(journal, dict.fromkeys(URLS[:3], CrawlJournal.SUCCESS))
+    journal.close()
+    # Simulate a crash in the middle of writing the last record
+    content = path.read_bytes()
+    path.write_bytes(content[:-25])
+
+    journal = CrawlJournal(str(path))
+    assert journal.completed_urls() == {URLS[0], URLS[1]}
+
+    fill(journal, {URLS[3]: CrawlJournal.SUCCESS})
+    journal.close()
+    assert journal.completed_urls() == {URLS[0], URLS[1], URLS[3]}
+    assert path.read_text().count('\n') == 4
+
+
+def test_reset_discards_every_outcome(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CrawlJournal(str(path))
+    fill(journal, dict.fromkeys(URLS[:3], CrawlJournal.SUCCESS))
+
+    journal.reset()
+
+    assert journal.completed_urls() == set()
+    fill(journal, {URLS[4]: CrawlJournal.SUCCESS})
+    journal.close()
+    assert journal.completed_urls() == {URLS[4]}
+
+
+def test_missing_journal_is_empty(tmp_path):
+    assert CrawlJournal(str(tmp_path / "none.jsonl")).load() == {}
+
+
+class ScriptedCrawler(BaseCrawler):
+    """Crawler that fails the URLs in `failing` and remembers every URL it crawls."""
+
+    crawled: List[str] = []
+    failing: Set[str] = set()
+
+    def __init__(self, site_name: str, site_config: Dict[str, Any]):
+        super().__init__(site_name, site_config, use_cache=False, replay=False)
+
+    def _initialize_firecrawl(self):
+        pass
+
+    async def crawl_product(self, url: str) -> CrawlResult:
+        self.crawled.append(url)
+        await asyncio.sleep(0)
+        if url in self.failing:
+            return CrawlResult(success=False, error_message="Scrape failed", url=url)
+        return CrawlResult(success=True, url=url,
+                           product=Product(name="Pads", url=url, site_name=self.site_name, currency=self.currency))
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        raise NotImplementedError
+
+
+class Crash(Exception):
+    """Stands in for the process being killed mid-crawl."""
+
+
+def crawl(journal: CrawlJournal, jobs: List[CrawlJob], stop_after: Optional[int] = None) -> None:
+    """Crawl jobs, journaling each outcome as extract_eu_products.py does; optionally crash part-way."""
+    scheduler = CrawlScheduler(ScriptedCrawler)
+    scheduler.add_jobs(jobs)
+    recorded = []
+
+    def record(scheduled: ScheduledResult) -> None:
+        if len(recorded) == stop_after:
+            raise Crash
+        result = scheduled.result
+        journal.record(site=scheduled.job.site, url=scheduled.job.url,
+                       status=CrawlJournal.SUCCESS if result.success and result.product else CrawlJournal.FAILED,
+                       error=result.error_message)
+        recorded.append(scheduled.job.url)
+
+    try:
+        asyncio.run(scheduler.run(on_result=record))
+    except Crash:
+        pass
+    finally:
+        journal.close()
+
+
+def test_resume_skips_done_urls_and_retries_failed_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(ScriptedCrawler, 'crawled', [])
+    monkeypatch.setattr(ScriptedCrawler, 'failing', {URLS[0]})
+    jobs = [CrawlJob(site="24mx", url=url) for url in URLS]
+    journal = CrawlJournal(str(tmp_path / "journal.jsonl"))
+
+    # The first run is interrupted after three outcomes, one of them a failure;
+    # URLs being crawled at that moment have no outcome and must be crawled again
+    crawl(journal, jobs, stop_after=3)
+    outcomes = journal.load()
+    assert len(outcomes) == 3
+    assert outcomes[URLS[0]]['status'] == CrawlJournal.FAILED
+    assert len(journal.completed_urls()) == 2
+
+    # --resume: only URLs without a successful outcome are crawled again
+    ScriptedCrawler.crawled.clear()
+    ScriptedCrawler.failing.clear()
+    done_urls = journal.completed_urls()
+    crawl(CrawlJournal(str(tmp_path / "journal.jsonl")), [job for job in jobs if job.url not in done_urls])
+
+    assert URLS[0] in ScriptedCrawler.crawled
+    assert sorted(ScriptedCrawler.crawled) == sorted(set(URLS) - done_urls)
+    assert journal.completed_urls() == set(URLS)
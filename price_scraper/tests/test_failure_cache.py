@@ -0,0 +1,169 @@
+"""
+Tests for the negative cache of URLs that failed to scrape.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from src.utils.failure_cache import PERMANENT, TRANSIENT, FailureCache
+from tests.conftest import StubCrawler, StubScrapeApp
+
+URL = "https://flight.invalid/brake-pads"
+
+
+@pytest.fixture
+def failures(tmp_path):
+    return FailureCache(path=str(tmp_path / "failures.json"), save_interval=3600)
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+def crawler_with(failures: FailureCache, app: StubScrapeApp, site_name: str) -> StubCrawler:
+    crawler = StubCrawler(app, site_name)
+    crawler.failures = failures
+    return crawler
+
+
+def with_status(document, status_code: int):
+    document.metadata = {**document.metadata, 'statusCode': status_code}
+    return document
+
+
+@pytest.mark.parametrize("error, kind", [
+    (http_error(404), PERMANENT),
+    (http_error(410), PERMANENT),
+    (http_error(503), TRANSIENT),
+    (Exception("Page load timed out"), TRANSIENT),
+])
+def test_failures_are_classified(request, failures, error, kind):
+    app = StubScrapeApp(error=error, delay=0)
+    crawler = crawler_with(failures, app, request.node.name)
+
+    result = asyncio.run(crawler.crawl_product(URL))
+
+    assert not result.success
+    entry = failures.get(URL)
+    assert entry.kind == kind
+    assert entry.expires_at - entry.failed_at == failures.ttls[kind]
+    assert entry.status_code == (error.response.status_code if isinstance(error, requests.HTTPError) else None)
+
+
+def test_page_reporting_a_gone_status_is_a_permanent_failure(failures):
+    app = StubScrapeApp(delay=0)
+    original = app.scrape_url
+    app.scrape_url = lambda url, **kwargs: with_status(original(url, **kwargs), 404)
+    crawler = crawler_with(failures, app, "failures-gone-page")
+
+    result = asyncio.run(crawler.crawl_product(URL))
+
+    assert "Page is gone" in result.error_message
+    assert failures.get(URL).kind == PERMANENT
+    assert len(app.calls) == 1  # Not retried
+
+
+def test_throttling_is_not_remembered(failures):
+    crawler = crawler_with(failures, StubScrapeApp(error=http_error(429), delay=0), "failures-throttled")
+
+    asyncio.run(crawler.crawl_product(URL))
+
+    assert failures.get(URL) is None
+
+
+@pytest.mark.parametrize("status_code", [401, 402, 403])
+def test_account_errors_are_not_remembered_and_count_against_the_site(request, failures, status_code):
+    crawler = crawler_with(failures, StubScrapeApp(error=http_error(status_code), delay=0), request.node.name)
+    crawler.circuit_breaker.failure_threshold = 1
+
+    result = asyncio.run(crawler.crawl_product(URL))
+
+    assert not result.success
+    assert failures.get(URL) is None
+    assert crawler.circuit_breaker.state == crawler.circuit_breaker.OPEN
+
+
+def test_known_failures_are_skipped_until_they_expire(tmp_path):
+    failures = FailureCache(path=str(tmp_path / "failures.json"), transient_ttl_minutes=0.2 / 60,
+                            save_interval=3600)
+    app = StubScrapeApp(error=http_error(503), delay=0)
+    crawler = crawler_with(failures, app, "failures-expiry")
+
+    asyncio.run(crawler.crawl_product(URL))
+    attempts = len(app.calls)
+    skipped = asyncio.run(crawler.crawl_product(URL + "?utm_source=mail"))
+
+    assert skipped.error_message.startswith(f"Skipping {URL}")
+    assert len(app.calls) == attempts
+
+    time.sleep(0.3)
+    app.error = None
+    result = asyncio.run(crawler.crawl_product(URL))
+
+    assert result.success
+    assert len(app.calls) == attempts + 1
+    assert failures.get(URL) is None
+    assert failures.get_stats() == {'permanent': 0, 'transient': 0, 'skipped': 1}
+
+
+def test_failures_survive_a_save_and_reload(tmp_path, failures):
+    failures.record(URL, PERMANENT, status_code=404, error="Not found")
+    failures.record("https://flight.invalid/chain", TRANSIENT, error="Timed out")
+    failures.record("https://flight.invalid/chain", TRANSIENT, error="Timed out again")
+    failures.save()
+
+    reloaded = FailureCache(path=str(tmp_path / "failures.json"))
+
+    assert reloaded.get("https://www.flight.invalid/brake-pads/").to_json() == failures.get(URL).to_json()
+    chain = reloaded.get("https://flight.invalid/chain")
+    assert (chain.kind, chain.error, chain.failures) == (TRANSIENT, "Timed out again", 2)
+
+
+def test_expired_entries_are_not_loaded(tmp_path):
+    now = datetime.now()
+    path = tmp_path / "failures.json"
+    path.write_text(json.dumps({'entries': {
+        URL: {'kind': PERMANENT, 'failed_at': (now - timedelta(days=8)).isoformat(),
+              'expires_at': (now - timedelta(days=1)).isoformat(), 'status_code': 404},
+        "https://flight.invalid/chain": {'kind': TRANSIENT, 'failed_at': now.isoformat(),
+                                         'expires_at': (now + timedelta(minutes=5)).isoformat()},
+        "https://flight.invalid/broken": {'kind': TRANSIENT},
+    }}))
+
+    failures = FailureCache(path=str(path))
+
+    assert failures.get(URL) is None
+    assert failures.get("https://flight.invalid/chain").kind == TRANSIENT
+    assert failures.get("https://flight.invalid/broken") is None
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "failures.json"
+    path.write_text("{not json")
+
+    assert FailureCache(path=str(path)).get_stats()['permanent'] == 0
+
+
+def test_saves_merge_with_other_processes(tmp_path):
+    path = str(tmp_path / "failures.json")
+    first = FailureCache(path=path, save_interval=3600)
+    second = FailureCache(path=path, save_interval=3600)
+    first.record(URL, TRANSIENT)
+    first.record("https://flight.invalid/chain", PERMANENT, status_code=410)
+    first.save()
+
+    second.record("https://flight.invalid/helmet", TRANSIENT)
+    second.save()
+    first.forget(URL)
+    first.save()
+
+    entries = json.loads((tmp_path / "failures.json").read_text())['entries']
+    assert sorted(entries) == ["https://flight.invalid/chain", "https://flight.invalid/helmet"]
+    assert second.get("https://flight.invalid/chain").kind == PERMANENT
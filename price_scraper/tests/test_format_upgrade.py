@@ -0,0 +1,150 @@
+"""
+Tests for upgrading cache entries when an extractor needs more formats than are cached.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, FrozenSet, List
+
+import pytest
+
+from src.crawlers import base_crawler
+from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.retry import RetryBudget, RetryPolicy
+from src.models.product import Product
+from src.utils.cache_backends import JsonFileBackend
+from src.utils.failure_cache import FailureCache
+from src.utils.firecrawl_cache import FirecrawlCache
+from src.utils.firecrawl_formats import FormatProfile
+from tests.conftest import StubScrapeApp
+
+URL = "https://shop.invalid/brake-pads"
+
+
+class FormatRecordingApp(StubScrapeApp):
+    """Stub app returning every format and recording the formats each scrape asked for."""
+
+    def __init__(self, delay: float = 0):
+        super().__init__(delay=delay)
+        self.formats: List[List[str]] = []
+
+    def scrape_url(self, url: str, **kwargs: Any) -> SimpleNamespace:
+        self.formats.append(kwargs['formats'])
+        super().scrape_url(url)
+        return SimpleNamespace(success=True, markdown="# Brake pads", html="<h1>Brake pads</h1>",
+                               links=["https://shop.invalid/"], metadata={'title': "Brake pads"})
+
+
+class ProfileCrawler(BaseCrawler):
+    def __init__(self, app: FormatRecordingApp, format_profile: FormatProfile):
+        self.app = app
+        self.format_profile = format_profile
+        site_config = {
+            'base_url': 'https://shop.invalid',
+            'currency': 'EUR',
+            'rate_limit': {'requests_per_second': 1000, 'burst_size': 1000},
+        }
+        super().__init__("upgrade", site_config, use_cache=True, replay=False,
+                         retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02, budget=RetryBudget()))
+
+    def _initialize_firecrawl(self):
+        self.firecrawl_app = self.app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        return Product(name="Brake pads", url=url, site_name=self.site_name, currency=self.currency)
+
+
+class HtmlCrawler(ProfileCrawler):
+    """Extractor reading only the HTML, so its fields are not a superset of the markdown profile's."""
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return frozenset({'metadata', 'html'})
+
+
+async def joining(crawler: ProfileCrawler) -> Any:
+    """Crawl URL once the scrape started by another crawler is in flight."""
+    await asyncio.sleep(0.05)
+    return await crawler.crawl_product(URL)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = FirecrawlCache(cache_dir=str(tmp_path / "cache"))
+    failures = FailureCache(path=str(tmp_path / "failures.json"), save_interval=3600)
+    monkeypatch.setattr(base_crawler, "get_firecrawl_cache", lambda: cache)
+    monkeypatch.setattr(base_crawler, "get_failure_cache", lambda: failures)
+    yield cache
+    cache.close()
+
+
+def test_entries_are_upgraded_to_the_union_of_the_formats_needed(cache):
+    app = FormatRecordingApp()
+    markdown_crawler = ProfileCrawler(app, FormatProfile.MARKDOWN)
+    html_crawler = HtmlCrawler(app, FormatProfile.FULL)
+
+    async def run():
+        first = await markdown_crawler.crawl_product(URL)
+        # The markdown-only entry cannot serve an extractor that needs HTML
+        upgraded = await html_crawler.crawl_product(URL)
+        await cache.aflush()
+        again = [await markdown_crawler.crawl_product(URL), await html_crawler.crawl_product(URL)]
+        return [first, upgraded, *again]
+
+    results = asyncio.run(run())
+
+    assert all(result.success for result in results)
+    # The upgrade keeps the markdown the other extractor relies on, so both hit the cache afterwards
+    assert app.formats == [['markdown'], ['markdown', 'html']]
+    assert sorted(cache.backend.read_fields(cache._get_cache_key(URL))) == ['html', 'markdown', 'metadata']
+    total = cache.metrics.snapshot()['total']
+    # The upgrade's lookup and its re-check just before scraping both find the entry incomplete
+    assert (total['incomplete'], total['hits']) == (2, 2)
+
+
+def test_a_wider_request_in_flight_serves_narrower_ones(cache):
+    app = FormatRecordingApp(delay=0.3)
+    markdown_crawler = ProfileCrawler(app, FormatProfile.MARKDOWN)
+    metadata_crawler = ProfileCrawler(app, FormatProfile.METADATA)
+
+    async def run():
+        return await asyncio.gather(markdown_crawler.crawl_product(URL), joining(metadata_crawler))
+
+    results = asyncio.run(run())
+
+    assert all(result.success for result in results)
+    assert app.formats == [['markdown']]
+
+
+def test_a_narrower_request_in_flight_is_followed_by_one_for_the_union(cache):
+    app = FormatRecordingApp(delay=0.3)
+    metadata_crawler = ProfileCrawler(app, FormatProfile.METADATA)
+    html_crawler = HtmlCrawler(app, FormatProfile.FULL)
+
+    async def run():
+        return await asyncio.gather(metadata_crawler.crawl_product(URL), joining(html_crawler))
+
+    results = asyncio.run(run())
+
+    assert all(result.success for result in results)
+    # The HTML extractor waits for the metadata scrape, then fetches what it lacks once that is cached
+    assert app.formats == [['markdown'], ['html']]
+    cache.flush()
+    assert sorted(cache.backend.read_fields(cache._get_cache_key(URL))) == ['html', 'metadata']
+
+
+def test_fields_to_fetch_include_what_is_already_cached(cache):
+    cache.set(URL, {'success': True, 'data': {'markdown': "# Brake pads", 'metadata': {}}})
+    crawler = HtmlCrawler(FormatRecordingApp(), FormatProfile.FULL)
+
+    fields = asyncio.run(crawler._fields_to_fetch([URL, "https://shop.invalid/uncached"]))
+
+    assert fields == {'metadata', 'markdown', 'html'}
+
+
+def test_missing_and_corrupt_json_entries_have_no_fields(tmp_path):
+    backend = JsonFileBackend(str(tmp_path))
+    (tmp_path / "corrupt.json").write_text("{", encoding='utf-8')
+
+    assert backend.read_fields("missing") is None
+    assert backend.read_fields("corrupt") is None
@@ -0,0 +1,52 @@
+"""
+Tests for streaming crawl results with BaseCrawler.iter_crawl.
+"""
+
+import asyncio
+import time
+
+from tests.conftest import StubCrawler, StubScrapeApp
+
+URLS = [f"https://flight.invalid/product-{i}" for i in range(20)]
+
+
+class StaggeredScrapeApp(StubScrapeApp):
+    """Scrapes the first product quickly and every other one slowly."""
+
+    def scrape_url(self, url, **kwargs):
+        time.sleep(0.01 if url == URLS[0] else 0.3)
+        return super().scrape_url(url, **kwargs)
+
+
+def test_every_url_is_crawled_once():
+    app = StubScrapeApp(delay=0.01)
+    crawler = StubCrawler(app, "iter-all")
+
+    async def run():
+        return [result async for result in crawler.iter_crawl(iter(URLS))]
+
+    results = asyncio.run(run())
+
+    assert sorted(result.url for result in results) == sorted(URLS)
+    assert all(result.success for result in results)
+    assert sorted(app.calls) == sorted(URLS)
+
+
+def test_stopping_early_cancels_and_awaits_the_crawls_in_flight():
+    crawler = StubCrawler(StaggeredScrapeApp(delay=0), "iter-stop")
+
+    async def run():
+        stream = crawler.iter_crawl(URLS)
+        first = await stream.__anext__()
+        in_flight = crawler.concurrency.in_flight
+        await stream.aclose()
+        others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return first, in_flight, others
+
+    first, in_flight, others = asyncio.run(run())
+
+    assert first.success
+    assert in_flight > 0
+    # Cancelled crawls have finished and given their slots back by the time aclose() returns
+    assert others == []
+    assert crawler.concurrency.in_flight == 0
@@ -0,0 +1,135 @@
+"""
+Tests for the token-bucket rate limiter and the per-host limiter registry.
+"""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from src.utils.rate_limiter import DelayRateLimiter, RateLimiter, RateLimiterRegistry
+
+
+def test_burst_is_free_then_reservations_queue_up_in_order():
+    limiter = RateLimiter(requests_per_second=10, burst_size=3)
+
+    waits = [limiter._reserve() for _ in range(6)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Each caller is scheduled one interval after the previous one
+    assert waits[3:] == pytest.approx([0.1, 0.2, 0.3], abs=0.01)
+
+
+def test_tokens_refill_over_time_up_to_the_burst():
+    limiter = RateLimiter(requests_per_second=20, burst_size=2)
+    limiter._reserve()
+    limiter._reserve()
+
+    time.sleep(0.25)
+
+    assert [limiter._reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter._reserve() > 0
+
+
+def test_waiters_are_served_first_in_first_out():
+    limiter = RateLimiter(requests_per_second=20, burst_size=1)
+    served = []
+
+    async def request(number: int) -> None:
+        await limiter.acquire()
+        served.append((number, time.monotonic()))
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(request(number) for number in range(6)))
+        return started
+
+    started = asyncio.run(run())
+
+    assert [number for number, _ in served] == list(range(6))
+    # The burst token serves the first caller at once, then one caller per interval
+    assert served[-1][1] - started == pytest.approx(0.25, abs=0.08)
+    gaps = [later - earlier for (_, earlier), (_, later) in itertools.pairwise(served)]
+    assert min(gaps) >= 0.04
+
+
+def test_cancelled_waiter_refunds_its_token():
+    limiter = RateLimiter(requests_per_second=5, burst_size=1)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+
+    # Only the first request's token is spent: the next caller waits one interval, not two
+    assert limiter._reserve() == pytest.approx(0.2, abs=0.03)
+
+
+def test_refunds_never_exceed_the_burst():
+    limiter = RateLimiter(requests_per_second=5, burst_size=2)
+
+    limiter._refund()
+
+    assert limiter.tokens == 2
+
+
+def test_invalid_rate_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_second=0)
+
+
+def test_delay_limiter_converts_the_delay_to_a_rate():
+    limiter = DelayRateLimiter(requests_per_second=10, delay_between_requests=0.5)
+
+    assert (limiter.requests_per_second, limiter.burst_size) == (2.0, 1)
+
+
+def test_registry_shares_one_limiter_per_host():
+    registry = RateLimiterRegistry()
+
+    limiter = registry.get("https://www.shop.invalid/brake-pads", requests_per_second=3, burst_size=2)
+
+    assert registry.get("WWW.SHOP.INVALID") is limiter
+    assert registry.get("http://www.shop.invalid:8080/chains?page=2") is limiter
+    assert registry.find("www.shop.invalid") is limiter
+    assert registry.get("shop.invalid") is not limiter
+    # The first configuration wins
+    assert (limiter.requests_per_second, limiter.burst_size) == (3, 2)
+
+
+def test_sites_on_one_host_share_a_limiter():
+    registry = RateLimiterRegistry()
+    site_config = {'base_url': "https://www.shop.invalid", 'rate_limit': {'requests_per_second': 4, 'burst_size': 2}}
+
+    shop = registry.for_site("shop", site_config)
+
+    assert registry.for_site("shop-outlet", {**site_config, 'base_url': "https://www.shop.invalid/outlet"}) is shop
+    assert registry.find("https://www.shop.invalid/anything") is shop
+    assert (shop.requests_per_second, shop.burst_size) == (4.0, 2)
+
+
+def test_sites_without_a_host_are_keyed_by_name():
+    registry = RateLimiterRegistry()
+
+    first = registry.for_site("first", {'rate_limit': {'delay_between_requests': 0.25}})
+    second = registry.for_site("second", {'base_url': ""})
+
+    assert first is not second
+    assert registry.find("first") is first
+    assert (first.requests_per_second, first.burst_size) == (4.0, 1)
+    assert second.requests_per_second == 2.0
+
+
+def test_clear_drops_every_limiter():
+    registry = RateLimiterRegistry()
+    registry.get("shop.invalid")
+
+    registry.clear()
+
+    assert registry.find("shop.invalid") is None
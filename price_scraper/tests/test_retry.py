@@ -0,0 +1,172 @@
+"""
+Tests for the retry policy, retry budget, circuit breaker and error classification.
+"""
+
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+import pytest
+import requests
+
+from src.crawlers.errors import (
+    get_retry_after, get_status_code, is_permanent_failure, is_retryable_error, is_throttling_error,
+    is_timeout_error,
+)
+from src.crawlers.retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+
+
+def http_error(status_code: int, headers: Optional[Dict[str, str]] = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+def policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(budget=kwargs.pop('budget', RetryBudget(min_retries=100)), **kwargs)
+
+
+@pytest.mark.parametrize("error, retryable, throttling, timeout, permanent", [
+    (http_error(429), True, True, False, False),
+    (Exception("Rate limit exceeded, please slow down"), True, True, False, False),
+    (http_error(408), True, False, True, False),
+    (http_error(504), True, False, True, False),
+    (TimeoutError(), True, False, True, False),
+    (Exception("Page load timed out after 30000ms"), True, False, True, False),
+    (http_error(404), False, False, False, True),
+    (Exception("Request failed with status code 410"), False, False, False, True),
+    (http_error(403), False, False, False, False),
+    (http_error(502), True, False, False, False),
+    (ConnectionError("Connection reset by peer"), True, False, False, False),
+])
+def test_errors_are_classified(error, retryable, throttling, timeout, permanent):
+    assert is_retryable_error(error) == retryable
+    assert is_throttling_error(error) == throttling
+    assert is_timeout_error(error) == timeout
+    assert is_permanent_failure(error) == permanent
+
+
+def test_status_code_is_read_from_the_response_or_the_message():
+    assert get_status_code(http_error(503)) == 503
+    assert get_status_code(Exception("Unexpected error: Status code 429")) == 429
+    assert get_status_code(Exception("Connection refused")) is None
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert get_retry_after(http_error(429, {'Retry-After': "7"})) == 7.0
+    retry_at = datetime.now(UTC) + timedelta(seconds=30)
+    assert get_retry_after(http_error(503, {'Retry-After': format_datetime(retry_at, usegmt=True)})) == \
+        pytest.approx(30, abs=2)
+    assert get_retry_after(http_error(429, {'Retry-After': "soon"})) is None
+    assert get_retry_after(http_error(429)) is None
+
+
+def test_delays_stay_within_bounds():
+    retry_policy = policy(base_delay=1.0, max_delay=10.0)
+    error = http_error(503)
+
+    delay = 0.0
+    for _ in range(200):
+        previous, delay = delay, retry_policy.next_delay(delay, error)
+        assert 1.0 <= delay <= min(10.0, max(1.0, previous * 3))
+
+
+def test_retry_after_overrides_the_computed_delay():
+    retry_policy = policy(base_delay=1.0, max_delay=10.0, max_retry_after=60.0)
+    error = http_error(429, {'Retry-After': "45"})
+
+    assert retry_policy.should_retry(0, error)
+    assert retry_policy.next_delay(2.0, error) == 45.0
+
+
+def test_retry_after_longer_than_the_cap_is_not_waited_for():
+    retry_policy = policy(max_retry_after=60.0)
+
+    assert not retry_policy.should_retry(0, http_error(429, {'Retry-After': "600"}))
+
+
+def test_attempts_are_limited():
+    retry_policy = policy(max_attempts=3)
+    error = http_error(503)
+
+    assert [retry_policy.should_retry(attempt, error) for attempt in range(3)] == [True, True, False]
+    assert not retry_policy.should_retry(0, http_error(404))
+
+
+def test_exhausted_budget_stops_retries():
+    budget = RetryBudget(ratio=0.5, min_retries=2)
+    retry_policy = policy(max_attempts=10, budget=budget)
+    error = http_error(503)
+    for _ in range(4):
+        budget.record_request()
+
+    # 2 retries always allowed, plus half of the 4 requests sent
+    assert [retry_policy.should_retry(0, error) for _ in range(5)] == [True] * 4 + [False]
+    assert budget.get_stats() == {'requests': 4, 'retries': 4, 'denied': 1}
+
+    budget.record_request()
+    budget.record_request()
+    assert retry_policy.should_retry(0, error)
+
+    budget.reset()
+    assert budget.get_stats() == {'requests': 0, 'retries': 0, 'denied': 0}
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("shop", failure_threshold=3, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.before_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.get_stats() == {'state': "open", 'consecutive_failures': 3, 'rejected': 1}
+
+
+def open_breaker(reset_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker("shop", failure_threshold=1, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    time.sleep(reset_timeout * 1.5)
+    return breaker
+
+
+def test_half_open_breaker_lets_one_probe_through_and_closes_on_success():
+    breaker = open_breaker()
+
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError, match="probe in progress"):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = open_breaker()
+    breaker.before_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_stuck_probe_is_replaced_after_the_reset_timeout():
+    breaker = open_breaker()
+    breaker.before_request()
+
+    time.sleep(0.075)
+
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
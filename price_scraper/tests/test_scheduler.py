@@ -0,0 +1,102 @@
+"""
+Tests for the cross-site crawl scheduler.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.crawlers.retry import RetryBudget, RetryPolicy
+from src.crawlers.scheduler import CrawlJob, CrawlScheduler, ScheduledResult
+from src.models.product import Product
+from src.utils.firecrawl_formats import FormatProfile
+from tests.conftest import StubScrapeApp
+
+# Request budget of each site of sites.yaml in these tests (requests per second, burst 1)
+SITE_RATES = {'24mx': 10.0, 'xlmoto': 5.0}
+URLS_PER_SITE = 6
+
+
+class PacedCrawler(BaseCrawler):
+    """Crawler scraping through a stub app, on a host of its own rate limited at the site's SITE_RATES."""
+
+    format_profile = FormatProfile.METADATA
+
+    def __init__(self, app: StubScrapeApp, site_name: str, site_config: Dict[str, Any]):
+        self.app = app
+        site_config = {
+            **site_config,
+            'base_url': f"https://{site_name}.scheduler.invalid",
+            'rate_limit': {**site_config.get('rate_limit', {}),
+                           'requests_per_second': SITE_RATES[site_name], 'burst_size': 1},
+        }
+        super().__init__(site_name, site_config, use_cache=False, replay=False,
+                         retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02, budget=RetryBudget()))
+
+    def _initialize_firecrawl(self):
+        self.firecrawl_app = self.app
+
+    async def _extract_product_data(self, url: str, firecrawl_data: Dict[str, Any]) -> Product:
+        return Product(name="Brake pads", url=url, site_name=self.site_name, currency=self.currency)
+
+
+def site_jobs(site: str, count: int = URLS_PER_SITE) -> List[CrawlJob]:
+    return [CrawlJob(site=site, url=f"https://{site}.scheduler.invalid/product-{i}") for i in range(count)]
+
+
+def run_jobs(jobs: List[CrawlJob]):
+    """Run jobs through the scheduler, timing when each site's results arrive."""
+    apps: Dict[str, StubScrapeApp] = {}
+
+    def factory(site: str, site_config: Dict[str, Any]) -> PacedCrawler:
+        apps[site] = StubScrapeApp(delay=0)
+        return PacedCrawler(apps[site], site, site_config)
+
+    finished: Dict[str, List[float]] = defaultdict(list)
+    scheduler = CrawlScheduler(factory)
+    scheduler.add_jobs(jobs)
+    started = time.monotonic()
+
+    def on_result(scheduled: ScheduledResult) -> None:
+        finished[scheduled.job.site].append(time.monotonic() - started)
+
+    results = asyncio.run(scheduler.run(on_result=on_result))
+    return results, time.monotonic() - started, finished, apps
+
+
+def test_sites_are_crawled_concurrently_within_their_own_budgets():
+    # Alone, each site takes (URLS_PER_SITE - 1) intervals of its rate: 0.5s and 1.0s
+    slowest = (URLS_PER_SITE - 1) / min(SITE_RATES.values())
+    total = sum((URLS_PER_SITE - 1) / rate for rate in SITE_RATES.values())
+
+    results, elapsed, finished, apps = run_jobs(site_jobs('24mx') + site_jobs('xlmoto'))
+
+    assert all(scheduled.result.success for scheduled in results)
+    assert {site: len(app.calls) for site, app in apps.items()} == dict.fromkeys(SITE_RATES, URLS_PER_SITE)
+    # The run takes as long as the slowest site, not the sum of the sites
+    assert slowest * 0.9 <= elapsed < (slowest + total) / 2
+    # The faster site is done long before the slower one, and neither beats its budget
+    assert max(finished['24mx']) < max(finished['xlmoto']) * 0.7
+    for site, rate in SITE_RATES.items():
+        assert max(finished[site]) >= (URLS_PER_SITE - 1) / rate * 0.9
+
+
+def test_results_keep_the_order_the_jobs_were_added_in():
+    jobs = [job for pair in zip(site_jobs('xlmoto', 3), site_jobs('24mx', 3), strict=True) for job in pair]
+
+    results, _, _, _ = run_jobs(jobs)
+
+    assert [scheduled.job.url for scheduled in results] == [job.url for job in jobs]
+    assert [scheduled.result.url for scheduled in results] == [job.url for job in jobs]
+
+
+def test_jobs_of_unknown_sites_fail_without_holding_up_the_others():
+    jobs = site_jobs('24mx', 2) + [CrawlJob(site="nowhere", url="https://nowhere.invalid/product")]
+
+    results, _, _, apps = run_jobs(jobs)
+
+    assert [scheduled.result.success for scheduled in results] == [True, True, False]
+    assert results[2].result.error_message == "Unknown site: nowhere"
+    assert list(apps) == ['24mx']
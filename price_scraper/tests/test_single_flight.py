@@ -0,0 +1,112 @@
+"""
+Tests for coalescing concurrent scrapes of the same page into one Firecrawl call.
+"""
+
+import asyncio
+
+import pytest
+
+from src.crawlers.base_crawler import firecrawl_requests
+from src.utils.single_flight import SingleFlight
+from tests.conftest import StubCrawler, StubScrapeApp
+
+# Variants of one page: tracking parameters, fragment, trailing slash, host case and www
+VARIANTS = [
+    "https://www.flight.invalid/brake-pads",
+    "https://flight.invalid/brake-pads/",
+    "http://FLIGHT.invalid/brake-pads?utm_source=newsletter",
+    "https://www.flight.invalid/brake-pads#reviews",
+    "https://flight.invalid/brake-pads?gclid=abc&fbclid=def",
+]
+
+
+async def crawl_variants(crawler: StubCrawler):
+    before = firecrawl_requests.get_stats()
+    results = await asyncio.gather(*(crawler.crawl_product(url) for url in VARIANTS))
+    after = firecrawl_requests.get_stats()
+    return results, after['executed'] - before['executed'], after['coalesced'] - before['coalesced']
+
+
+def test_concurrent_variants_of_a_page_share_one_scrape():
+    app = StubScrapeApp()
+
+    results, executed, coalesced = asyncio.run(crawl_variants(StubCrawler(app, "flight-ok")))
+
+    assert len(app.calls) == 1
+    assert (executed, coalesced) == (1, len(VARIANTS) - 1)
+    assert all(result.success for result in results)
+    # Each caller gets a result for the URL it asked for
+    assert [result.url for result in results] == VARIANTS
+    assert [result.product.url for result in results] == VARIANTS
+    assert firecrawl_requests.in_flight() == 0
+
+
+def test_a_failed_scrape_reaches_every_waiter():
+    app = StubScrapeApp(error=Exception("Request failed with status code 404"))
+
+    results, executed, coalesced = asyncio.run(crawl_variants(StubCrawler(app, "flight-gone")))
+
+    assert len(app.calls) == 1
+    assert (executed, coalesced) == (1, len(VARIANTS) - 1)
+    assert not any(result.success for result in results)
+    assert all("status code 404" in result.error_message for result in results)
+    assert len({result.error_message for result in results}) == 1
+
+
+def test_later_calls_run_again_once_a_flight_has_finished():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    async def run():
+        first = await flight.do("key", work)
+        second = await flight.do("key", work)
+        return first, second
+
+    assert asyncio.run(run()) == (1, 2)
+    assert flight.get_stats() == {'executed': 2, 'coalesced': 0, 'in_flight': 0}
+
+
+def test_waiters_of_a_cancelled_leader_run_the_call_again():
+    flight = SingleFlight("test")
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+
+    # One waiter takes over the call and the other joins it
+    assert asyncio.run(run()) == [2, 2]
+    assert flight.get_stats() == {'executed': 2, 'coalesced': 1, 'in_flight': 0}
+
+
+def test_a_cancelled_waiter_leaves_the_call_running():
+    flight = SingleFlight("test")
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0.05, result="done")))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0.05, result="again")))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+    assert flight.get_stats()['executed'] == 1
@@ -0,0 +1,238 @@
+"""
+Tests for streaming sitemap parsing.
+"""
+
+import gzip
+import io
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from src.processors.sitemap_parser import EntityFixingReader, ParseProgress, SitemapParser
+
+CATEGORIES = {
+    'helmets': {'keywords': ["helmet"], 'limit': 2},
+    'oils': {'keywords': ["oil"], 'limit': 2},
+}
+
+PRODUCTS = ["Helmets", "Oils", "Gloves"]
+
+
+def url_element(number: int) -> str:
+    product = PRODUCTS[number % len(PRODUCTS)]
+    return (f"<url><loc>https://www.shop.invalid/product-{number}</loc><lastmod>2026-01-{1 + number % 28:02d}</lastmod>"
+            f"<breadCrumb_eng>Home &gtgt; {product}</breadCrumb_eng>"
+            f"<breadCrumb_local>Accueil &gtgt; {product}</breadCrumb_local></url>\n")
+
+
+def write_sitemap(path: Path, numbers, compress: bool = False, tail: str = "</urlset>\n") -> str:
+    content = ("\n  <?xml version='1.0' encoding='UTF-8'?>\n"
+               "<urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">\n"
+               + ''.join(url_element(number) for number in numbers) + tail).encode('utf-8')
+    path.write_bytes(gzip.compress(content) if compress else content)
+    return str(path)
+
+
+def read_all(reader: EntityFixingReader, size: Optional[int] = None) -> bytes:
+    data = b''
+    while True:
+        chunk = reader.read(size)
+        if not chunk:
+            return data
+        data += chunk
+
+
+@pytest.fixture
+def parser():
+    return SitemapParser(categories=CATEGORIES)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_entities_split_across_chunks_are_fixed(chunk_size):
+    text = b"a &gtgt; b &ltlt; c&gtgt;&gtgt;d &gt; e &gtgt"
+
+    fixed = read_all(EntityFixingReader(io.BytesIO(b"  \n" + text), chunk_size=chunk_size), size=1)
+
+    assert fixed == b"a &gt; b &lt; c&gt;&gt;d &gt; e &gtgt"
+
+
+def test_reading_the_default_size_returns_every_byte():
+    text = b"<a>" + b"&gtgt;x" * 10000 + b"</a>"
+
+    assert read_all(EntityFixingReader(io.BytesIO(text), chunk_size=4096)) == b"<a>" + b"&gt;x" * 10000 + b"</a>"
+
+
+def test_entries_are_streamed_with_fixed_breadcrumbs(parser, tmp_path):
+    path = write_sitemap(tmp_path / "sitemap.xml", range(3))
+    progress = ParseProgress()
+
+    entries = list(parser.iter_entries(path, progress))
+
+    assert [entry.url for entry in entries] == [f"https://www.shop.invalid/product-{i}" for i in range(3)]
+    assert (entries[0].breadcrumb_eng, entries[0].breadcrumb_local) == ("Home > Helmets", "Accueil > Helmets")
+    assert entries[2].lastmod == "2026-01-03"
+    assert progress.entries == 3 and progress.failures == []
+    assert progress.bytes_read <= progress.total_bytes == Path(path).stat().st_size
+
+
+def test_a_parse_error_keeps_the_entries_before_it(parser, tmp_path):
+    path = write_sitemap(tmp_path / "sitemap.xml", range(4), tail="<url><loc>https://www.shop.invalid/broken")
+    progress = ParseProgress()
+
+    entries = list(parser.iter_entries(path, progress))
+
+    assert len(entries) == 4
+    assert progress.failures == [path]
+
+
+def test_entries_without_a_location_are_skipped(parser, tmp_path):
+    path = write_sitemap(tmp_path / "sitemap.xml", [0], tail="<url><lastmod>2026-01-01</lastmod></url></urlset>")
+
+    assert len(parser.parse_xml_file(path)) == 1
+
+
+def test_missing_sitemap_is_a_failure(parser, tmp_path):
+    progress = ParseProgress()
+
+    assert list(parser.iter_entries(str(tmp_path / "missing.xml"), progress)) == []
+    assert progress.failures == [str(tmp_path / "missing.xml")]
+
+
+class CountingStream:
+    """Entry stream that counts how many entries were taken from it."""
+
+    def __init__(self, entries):
+        self._entries = iter(entries)
+        self.taken = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        entry = next(self._entries)
+        self.taken += 1
+        return entry
+
+
+def test_filtering_stops_once_every_category_is_full(parser, tmp_path):
+    path = write_sitemap(tmp_path / "sitemap.xml", range(30))
+    progress = ParseProgress()
+    stream = CountingStream(parser.iter_entries(path, progress))
+
+    categorized = parser.filter_by_categories(stream, progress)
+
+    # Helmets are products 0 and 3, oils 1 and 4: nothing after product 4 is read
+    assert {category: [entry.url[-1] for entry in entries] for category, entries in categorized.items()} == \
+        {'helmets': ["0", "3"], 'oils': ["1", "4"]}
+    assert stream.taken == 5
+    assert progress.stopped_early
+    assert progress.entries == 5
+    assert all(entry.category == category for category, entries in categorized.items() for entry in entries)
+
+
+def test_filtering_reads_everything_while_a_category_is_short(tmp_path):
+    parser = SitemapParser(categories={**CATEGORIES, 'gloves': {'keywords': ["glove"], 'limit': 20}})
+    progress = ParseProgress()
+    stream = CountingStream(parser.iter_entries(write_sitemap(tmp_path / "sitemap.xml", range(30)), progress))
+
+    categorized = parser.filter_by_categories(stream, progress)
+
+    assert stream.taken == 30
+    assert not progress.stopped_early
+    assert [len(categorized[name]) for name in ('helmets', 'oils', 'gloves')] == [2, 2, 10]
+
+
+def test_categories_that_cannot_fill_do_not_prevent_stopping(tmp_path):
+    parser = SitemapParser(categories={**CATEGORIES, 'tires': {'keywords': [], 'limit': 5},
+                                       'chains': {'keywords': ["chain"], 'limit': 0}})
+    stream = CountingStream(parser.parse_xml_file(write_sitemap(tmp_path / "sitemap.xml", range(30))))
+
+    parser.filter_by_categories(stream)
+
+    assert stream.taken == 5
+
+
+def test_process_sitemap_reports_the_early_stop(parser, tmp_path, monkeypatch):
+    monkeypatch.setattr(parser, 'generate_csv_output', lambda categorized_entries, site_name: None)
+
+    stats = parser.process_sitemap(write_sitemap(tmp_path / "sitemap.xml", range(30)), "shop")
+
+    assert stats['total_entries'] == 4
+    assert stats['scan']['stopped_early'] and stats['scan']['entries_scanned'] == 5
+
+
+def write_index(path: Path, locations: List[str], compress: bool = False) -> str:
+    content = ("<?xml version='1.0' encoding='UTF-8'?>\n"
+               "<sitemapindex xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">\n"
+               + ''.join(f"<sitemap><loc>{location}</loc><lastmod>2026-01-01</lastmod></sitemap>\n"
+                         for location in locations)
+               + "</sitemapindex>\n").encode('utf-8')
+    path.write_bytes(gzip.compress(content) if compress else content)
+    return str(path)
+
+
+@pytest.fixture
+def sharded_sitemap(tmp_path) -> str:
+    """Gzipped index of four shards of 30 entries (gzipped or not, whatever their name), one nested."""
+    write_sitemap(tmp_path / "shard-0.xml.gz", range(0, 30), compress=True)
+    write_sitemap(tmp_path / "shard-1.xml", range(30, 60), compress=True)
+    write_sitemap(tmp_path / "shard-2.xml", range(60, 90))
+    write_sitemap(tmp_path / "shard-3.xml.gz", range(90, 120), compress=True)
+    write_index(tmp_path / "nested_index.xml", ["shard-2.xml", "shard-3.xml.gz"])
+    return write_index(tmp_path / "sitemap_index.xml.gz", ["shard-0.xml.gz", "shard-1.xml", "nested_index.xml"],
+                       compress=True)
+
+
+def test_index_is_expanded_into_its_shards(parser, sharded_sitemap, tmp_path):
+    assert parser.sitemap_files(sharded_sitemap) == [str(tmp_path / f"shard-{i}{suffix}") for i, suffix in
+                                                     enumerate([".xml.gz", ".xml", ".xml", ".xml.gz"])]
+
+
+def test_shards_are_streamed_in_index_order(parser, sharded_sitemap):
+    progress = ParseProgress()
+
+    entries = list(parser.iter_entries(sharded_sitemap, progress))
+
+    assert [entry.url for entry in entries] == [f"https://www.shop.invalid/product-{i}" for i in range(120)]
+    assert entries[100].breadcrumb_eng == "Home > Oils"
+    assert progress.failures == []
+
+
+def test_missing_shards_are_failures(parser, tmp_path):
+    write_sitemap(tmp_path / "shard-0.xml", range(3))
+    index = write_index(tmp_path / "sitemap_index.xml", ["shard-0.xml", "shard-1.xml"])
+    progress = ParseProgress()
+
+    assert len(list(parser.iter_entries(index, progress))) == 3
+    assert progress.failures == [str(tmp_path / "shard-1.xml")]
+
+
+def test_parallel_categorization_matches_a_sequential_run(parser, sharded_sitemap):
+    sequential = [(entry.url, entry.category, entry.lastmod)
+                  for entry in parser.iter_categorized_entries(sharded_sitemap)]
+    progress = ParseProgress()
+
+    parallel = [(entry.url, entry.category, entry.lastmod)
+                for entry in parser.iter_categorized_entries(sharded_sitemap, workers=2, progress=progress)]
+
+    assert parallel == sequential
+    # Gloves are in no category, so workers only send back helmets and oils (limits do not apply)
+    assert len(parallel) == 80
+    assert {category for _, category, _ in parallel} == {'helmets', 'oils'}
+    assert progress.entries == 120
+
+
+def test_parallel_filtering_matches_a_sequential_run(tmp_path, sharded_sitemap):
+    # Limits large enough that the first shard cannot fill them on its own
+    parser = SitemapParser(categories={'helmets': {'keywords': ["helmet"], 'limit': 15},
+                                       'oils': {'keywords': ["oil"], 'limit': 25}})
+    shards = parser.sitemap_files(sharded_sitemap)
+
+    sequential = parser.filter_by_categories(parser._iter_shards(shards, ParseProgress()))
+    parallel, progress = parser._filter_shards_parallel(shards, workers=3)
+
+    assert {category: [entry.url for entry in entries] for category, entries in parallel.items()} == \
+        {category: [entry.url for entry in entries] for category, entries in sequential.items()}
+    assert [len(parallel['helmets']), len(parallel['oils'])] == [15, 25]
+    assert progress.entries == 120 and progress.failures == []
@@ -0,0 +1,151 @@
+"""
+Tests for diffing sitemaps against the stored sitemap state.
+"""
+
+import csv
+from typing import Iterator, List
+
+import pytest
+
+from src.processors.sitemap_parser import SitemapEntry
+from src.processors.sitemap_state import ADDED, MODIFIED, REMOVED, IncompleteSitemapError, SitemapState
+
+SITE = "shop"
+
+
+def entry(number: int, lastmod: str = "2026-01-01") -> SitemapEntry:
+    return SitemapEntry(url=f"https://www.shop.invalid/product-{number}", breadcrumb_eng="Home > Brakes",
+                        breadcrumb_local="Accueil > Freins", category="brakes", lastmod=lastmod)
+
+
+def catalog(numbers, lastmod: str = "2026-01-01") -> List[SitemapEntry]:
+    return [entry(number, lastmod) for number in numbers]
+
+
+def truncated(entries: List[SitemapEntry]) -> Iterator[SitemapEntry]:
+    """Entry stream of a sitemap whose last file failed to download."""
+    yield from entries
+    raise IncompleteSitemapError(["https://www.shop.invalid/sitemap-2.xml.gz"])
+
+
+def read_delta(path) -> List[tuple]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return [(row['product_url'].rsplit('/', 1)[-1], row['change']) for row in csv.DictReader(f)]
+
+
+def stored(state: SitemapState) -> List[tuple]:
+    return state._conn.execute("SELECT * FROM entries ORDER BY url").fetchall()
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = SitemapState(str(tmp_path / "state.sqlite3"), batch_size=3)
+    yield state
+    state.close()
+
+
+def test_first_run_is_a_baseline(state, tmp_path):
+    diff = state.diff(SITE, catalog(range(5)), delta_path=str(tmp_path / "delta.csv"))
+
+    assert diff.baseline and diff.saved
+    assert (diff.added, diff.modified, diff.removed, diff.unchanged) == (5, 0, 0, 0)
+    assert state.known_entries(SITE) == 5
+    assert len(read_delta(tmp_path / "delta.csv")) == 5
+
+
+def test_added_modified_and_removed_entries(state, tmp_path):
+    state.diff(SITE, catalog(range(5)))
+    # Product 0 is gone, 1 has a new lastmod, 5 is new; the rest are unchanged
+    current = [entry(1, lastmod="2026-02-01")] + catalog(range(2, 6))
+
+    diff = state.diff(SITE, current, delta_path=str(tmp_path / "delta.csv"))
+
+    assert not diff.baseline
+    assert (diff.added, diff.modified, diff.removed, diff.unchanged) == (1, 1, 1, 3)
+    assert read_delta(tmp_path / "delta.csv") == [("product-5", ADDED), ("product-1", MODIFIED),
+                                                  ("product-0", REMOVED)]
+    assert state.known_entries(SITE) == 5
+
+
+def test_breadcrumb_changes_count_as_modified(state):
+    state.diff(SITE, catalog(range(3)))
+    moved = entry(2)
+    moved.breadcrumb_eng = "Home > Brakes > Discs"
+
+    diff = state.diff(SITE, catalog(range(2)) + [moved])
+
+    assert (diff.modified, diff.unchanged) == (1, 2)
+
+
+def test_url_variants_are_one_entry(state):
+    state.diff(SITE, catalog(range(3)))
+    variants = [SitemapEntry(url=e.url.replace("https://www.", "http://") + "/", breadcrumb_eng=e.breadcrumb_eng,
+                             breadcrumb_local=e.breadcrumb_local, category=e.category, lastmod=e.lastmod)
+                for e in catalog(range(3))]
+
+    diff = state.diff(SITE, variants + catalog(range(3)))
+
+    assert (diff.added, diff.removed, diff.unchanged) == (0, 0, 3)
+
+
+def test_sites_are_diffed_independently(state):
+    state.diff(SITE, catalog(range(5)))
+
+    diff = state.diff("other", catalog(range(2)))
+
+    assert diff.baseline
+    assert state.known_entries(SITE) == 5
+
+
+def test_diff_without_save_leaves_state_unchanged(state):
+    state.diff(SITE, catalog(range(5)))
+    before = stored(state)
+
+    diff = state.diff(SITE, catalog(range(1, 6)), save=False)
+
+    assert (diff.added, diff.removed, diff.saved) == (1, 1, False)
+    assert stored(state) == before
+
+
+def test_incomplete_sitemap_aborts_the_diff(state, tmp_path):
+    state.diff(SITE, catalog(range(6)))
+    before = stored(state)
+
+    diff = state.diff(SITE, truncated(catalog(range(3))), delta_path=str(tmp_path / "delta.csv"))
+
+    assert "could not be fetched" in diff.aborted
+    assert not diff.saved and diff.delta_path is None
+    assert not (tmp_path / "delta.csv").exists()
+    assert stored(state) == before
+    # The next complete sitemap is diffed against the last good state
+    assert state.diff(SITE, catalog(range(6))).unchanged == 6
+
+
+def test_removing_too_many_entries_aborts_the_diff(state, tmp_path):
+    state.diff(SITE, catalog(range(10)))
+    before = stored(state)
+
+    diff = state.diff(SITE, catalog(range(4)), delta_path=str(tmp_path / "delta.csv"))
+
+    assert diff.removed == 6
+    assert "6 of 10 known entries would be removed" in diff.aborted
+    assert not diff.saved and diff.delta_path is None
+    assert stored(state) == before
+
+
+def test_removing_up_to_the_limit_is_accepted(state):
+    state.diff(SITE, catalog(range(10)))
+
+    diff = state.diff(SITE, catalog(range(5)))
+
+    assert diff.aborted is None and diff.saved
+    assert state.known_entries(SITE) == 5
+
+
+def test_empty_sitemap_aborts_the_diff(state):
+    state.diff(SITE, catalog(range(3)))
+
+    diff = state.diff(SITE, [])
+
+    assert diff.aborted == "the sitemap has no entries"
+    assert state.known_entries(SITE) == 3
@@ -0,0 +1,174 @@
+"""
+Tests for the SQLite cache backend: compression, host dictionaries and schema upgrades.
+"""
+
+import json
+import sqlite3
+import zlib
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict
+
+import pytest
+
+from src.utils.cache_backends import CacheRecord, CorruptEntryError, SQLiteBackend
+
+NAVIGATION = "".join(f"* [Category {i}](https://shop.invalid/category-{i})\n" for i in range(120))
+FOOTER = "".join(f"Footer link {i}: shipping, returns and warranty terms {i}\n" for i in range(80))
+
+
+def page(i: int, chrome: bool = True) -> Dict[str, Any]:
+    body = "".join(f"Product {i} detail line {j}: brake pads for model {i * 31 + j}\n" for j in range(60))
+    markdown = NAVIGATION + body + FOOTER if chrome else body * 3
+    return {'success': True, 'data': {'markdown': markdown, 'metadata': {'title': f"Product {i}"}}}
+
+
+def record(i: int, chrome: bool = True) -> CacheRecord:
+    result = page(i, chrome)
+    return CacheRecord(key=f"key-{i}", url=f"https://shop.invalid/product-{i}",
+                       cached_at=datetime(2026, 1, 1, 12, 0, i), fields=sorted(result['data']),
+                       firecrawl_result=result)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "cache.sqlite3"
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+@pytest.mark.parametrize("dictionary", [False, True])
+def test_records_round_trip(db_path, compression, dictionary):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    backend = SQLiteBackend(str(db_path), compression=compression, dictionary=dictionary)
+    try:
+        for i in range(3):
+            backend.write(record(i))
+
+        for i in range(3):
+            stored = backend.read(f"key-{i}")
+            assert stored.firecrawl_result == page(i)
+            assert stored.url == f"https://shop.invalid/product-{i}"
+            assert stored.fields == ['markdown', 'metadata']
+        stats = backend.stats()
+    finally:
+        backend.close()
+
+    if compression != "none":
+        assert stats['compression_ratio'] > 1
+
+
+def test_entries_of_a_host_share_its_dictionary(db_path):
+    backend = SQLiteBackend(str(db_path), compression="zlib")
+    try:
+        for i in range(3):
+            backend.write(record(i))
+        backend.write(replace(record(3), key="outlet", url="https://outlet.invalid/product-3"))
+        with sqlite3.connect(str(db_path)) as conn:
+            dictionaries = dict(conn.execute("SELECT key, dictionary FROM entries"))
+            hosts = [row[0] for row in conn.execute("SELECT host FROM dictionaries ORDER BY host")]
+        conn.close()
+
+        assert hosts == ["outlet.invalid", "shop.invalid"]
+        assert len({dictionaries[f"key-{i}"] for i in range(3)}) == 1
+        assert dictionaries["outlet"] != dictionaries["key-0"]
+    finally:
+        backend.close()
+
+
+V1_SCHEMA = """
+    CREATE TABLE entries (
+        key TEXT PRIMARY KEY, url TEXT NOT NULL, cached_at REAL NOT NULL,
+        fields TEXT NOT NULL, payload TEXT NOT NULL, size INTEGER NOT NULL
+    );
+    CREATE INDEX idx_entries_url ON entries (url);
+    CREATE INDEX idx_entries_cached_at ON entries (cached_at);
+"""
+
+V2_SCHEMA = """
+    CREATE TABLE entries (
+        key TEXT PRIMARY KEY, url TEXT NOT NULL, cached_at REAL NOT NULL,
+        fields TEXT NOT NULL, payload BLOB NOT NULL, size INTEGER NOT NULL,
+        codec TEXT NOT NULL DEFAULT 'json', raw_size INTEGER NOT NULL DEFAULT 0,
+        blocks BLOB, dictionary INTEGER
+    );
+    CREATE TABLE blocks (
+        id INTEGER PRIMARY KEY, hash TEXT NOT NULL, codec TEXT NOT NULL,
+        data BLOB NOT NULL, size INTEGER NOT NULL, refs INTEGER NOT NULL
+    );
+    CREATE TABLE chunk_seen (id INTEGER PRIMARY KEY, seen_at REAL NOT NULL);
+    CREATE TABLE dictionaries (id INTEGER PRIMARY KEY, host TEXT NOT NULL UNIQUE, data BLOB NOT NULL);
+    PRAGMA user_version = 2;
+"""
+
+V3_SCHEMA = V2_SCHEMA.replace("blocks BLOB, dictionary INTEGER", "blocks BLOB, dictionary INTEGER, "
+                              "last_accessed REAL NOT NULL DEFAULT 0").replace("user_version = 2", "user_version = 3")
+
+
+@pytest.mark.parametrize("schema", [V1_SCHEMA, V2_SCHEMA], ids=["v1", "v2"])
+def test_older_databases_are_upgraded_in_place(db_path, schema):
+    old = record(0)
+    payload = json.dumps(old.firecrawl_result)
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.executescript(schema)
+        conn.execute("INSERT INTO entries (key, url, cached_at, fields, payload, size) VALUES (?, ?, ?, ?, ?, ?)",
+                     (old.key, old.url, old.cached_at.timestamp(), json.dumps(old.fields), payload, len(payload)))
+        if schema is V2_SCHEMA:
+            conn.execute("UPDATE entries SET raw_size = size")
+    conn.close()
+
+    backend = SQLiteBackend(str(db_path), compression="zlib")
+    try:
+        upgraded = backend.read(old.key)
+        backend.write(record(1))
+        backend.write(record(2))
+
+        assert upgraded.firecrawl_result == old.firecrawl_result
+        assert upgraded.cached_at == old.cached_at
+        assert upgraded.size == len(payload)
+        assert backend.read("key-2").firecrawl_result == page(2)
+        assert backend.stats()['total_entries'] == 3
+    finally:
+        backend.close()
+
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SQLiteBackend.SCHEMA_VERSION
+        # The old row is read as it is, not rewritten
+        assert conn.execute("SELECT codec FROM entries WHERE key = 'key-0'").fetchone()[0] == SQLiteBackend.LEGACY_CODEC
+    conn.close()
+
+
+def test_entries_stored_as_shared_blocks_are_dropped_on_upgrade(db_path):
+    """Databases written with the former block dedupe option lose the entries that relied on it."""
+    entries = {
+        'key-0': page(0),
+        'key-1': {'success': True, 'data': {'markdown': {'$blocks': [17, ["Product 1\n"]]}, 'metadata': {}}},
+    }
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.executescript(V3_SCHEMA)
+        for key, result in entries.items():
+            payload = zlib.compress(json.dumps(result).encode('utf-8'))
+            conn.execute(
+                "INSERT INTO entries (key, url, cached_at, fields, payload, size, codec, raw_size, blocks) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'zlib', ?, ?)",
+                (key, f"https://shop.invalid/{key}", 1.0, '["markdown", "metadata"]', payload, len(payload),
+                 len(payload), b'\x11' if key == 'key-1' else None),
+            )
+        conn.execute("INSERT INTO blocks VALUES (17, 'hash', 'zlib', ?, 10, 1)", (zlib.compress(b"Header\n"),))
+        conn.execute("INSERT INTO chunk_seen VALUES (18, 1.0)")
+    conn.close()
+
+    backend = SQLiteBackend(str(db_path), compression="zlib")
+    try:
+        assert backend.read('key-0').firecrawl_result == page(0)
+        assert backend.read('key-1') is None
+        assert backend.stats()['total_entries'] == 1
+    finally:
+        backend.close()
+
+    with sqlite3.connect(str(db_path)) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+    conn.close()
+    assert not tables & {'blocks', 'chunk_seen'}
+    assert 'blocks' not in columns
@@ -0,0 +1,85 @@
+"""
+Tests for URL canonicalization.
+"""
+
+import pytest
+
+from src.utils.url_canonical import CanonicalRule, UrlCanonicalizer, canonicalize_url
+
+
+@pytest.mark.parametrize("url, canonical", [
+    # Host case, www, scheme and default ports
+    ("https://shop.invalid/pads", "https://shop.invalid/pads"),
+    ("https://WWW.Shop.Invalid/pads", "https://shop.invalid/pads"),
+    ("http://shop.invalid/pads", "https://shop.invalid/pads"),
+    ("https://shop.invalid:443/pads", "https://shop.invalid/pads"),
+    ("http://shop.invalid:80/pads", "https://shop.invalid/pads"),
+    ("https://shop.invalid:8443/pads", "https://shop.invalid:8443/pads"),
+    ("https://shop.invalid./pads", "https://shop.invalid/pads"),
+    # Trailing slash and fragment
+    ("https://shop.invalid/pads/", "https://shop.invalid/pads"),
+    ("https://shop.invalid/pads#reviews", "https://shop.invalid/pads"),
+    ("https://shop.invalid/", "https://shop.invalid/"),
+    ("https://shop.invalid", "https://shop.invalid/"),
+    # Path case is significant
+    ("https://shop.invalid/Pads", "https://shop.invalid/Pads"),
+    # Tracking parameters are dropped, whatever their case
+    ("https://shop.invalid/pads?utm_source=mail&utm_medium=email", "https://shop.invalid/pads"),
+    ("https://shop.invalid/pads?UTM_Campaign=spring", "https://shop.invalid/pads"),
+    ("https://shop.invalid/pads?gclid=1&fbclid=2&msclkid=3&_ga=4&ref=home", "https://shop.invalid/pads"),
+    # Other parameters are kept, sorted
+    ("https://shop.invalid/pads?page=2", "https://shop.invalid/pads?page=2"),
+    ("https://shop.invalid/pads?page=2&utm_source=mail", "https://shop.invalid/pads?page=2"),
+    ("https://shop.invalid/pads?size=L&color=red", "https://shop.invalid/pads?color=red&size=L"),
+    ("https://shop.invalid/pads?variant=123#specs", "https://shop.invalid/pads?variant=123"),
+    ("https://shop.invalid/pads?gift=", "https://shop.invalid/pads?gift="),
+    # Not absolute http(s) URLs: returned stripped
+    ("  /relative/path ", "/relative/path"),
+    ("mailto:shop@shop.invalid", "mailto:shop@shop.invalid"),
+    ("https://shop.invalid:notaport/pads", "https://shop.invalid:notaport/pads"),
+])
+def test_generic_rules(url, canonical):
+    assert UrlCanonicalizer().canonicalize(url) == canonical
+
+
+PID_RULE = CanonicalRule(product_id_pattern=r"_pid-(P[PM]-\d+)", keep_query_params=[])
+
+
+@pytest.mark.parametrize("url, canonical", [
+    # Product pages are keyed on their id, whatever the slug or query
+    ("https://www.24mx.co.uk/product/brake-pads_pid-PP-1234", "https://24mx.co.uk/_pid-PP-1234"),
+    ("https://24mx.co.uk/product/renamed-brake-pads_pid-PP-1234/?variant=5", "https://24mx.co.uk/_pid-PP-1234"),
+    ("http://www.24mx.co.uk/product/helmet_pid-PM-99#sizes", "https://24mx.co.uk/_pid-PM-99"),
+    # Other pages of the site keep no query parameters at all
+    ("https://www.24mx.co.uk/brake-pads?page=2&utm_source=mail", "https://24mx.co.uk/brake-pads"),
+    ("https://www.24mx.co.uk/product/brake-pads_pid-XX-1", "https://24mx.co.uk/product/brake-pads_pid-XX-1"),
+    # Sites without a rule are untouched by it
+    ("https://www.shop.invalid/pads_pid-PP-1234?page=2", "https://shop.invalid/pads_pid-PP-1234?page=2"),
+])
+def test_site_rules(url, canonical):
+    canonicalizer = UrlCanonicalizer({"https://www.24mx.co.uk": PID_RULE})
+
+    assert canonicalizer.canonicalize(url) == canonical
+
+
+def test_keep_query_params_keeps_only_those_listed():
+    canonicalizer = UrlCanonicalizer({"shop.invalid": CanonicalRule(keep_query_params=["variant"])})
+
+    assert canonicalizer.canonicalize("https://shop.invalid/pads?page=2&variant=7&sort=price") == \
+        "https://shop.invalid/pads?variant=7"
+
+
+def test_rules_are_read_from_sites_yaml():
+    assert canonicalize_url("https://www.xlmoto.co.uk/en/p/brake-pads_pid-PP-555?utm_source=x") == \
+        "https://xlmoto.co.uk/_pid-PP-555"
+    assert canonicalize_url("https://www.24mx.co.uk/en/p/brake-pads_pid-PM-8") == \
+        "https://24mx.co.uk/_pid-PM-8"
+
+
+def test_canonicalization_is_idempotent():
+    canonicalizer = UrlCanonicalizer({"24mx.co.uk": PID_RULE})
+
+    for url in ("http://WWW.shop.invalid/pads/?b=2&a=1&utm_source=x#top",
+                "https://www.24mx.co.uk/product/pads_pid-PP-1"):
+        canonical = canonicalizer.canonicalize(url)
+        assert canonicalizer.canonicalize(canonical) == canonical